@@ -14,7 +14,7 @@ class ParameterRequest(BaseModel):
     name: str
     account: str
     exec_command: list[str] | str
-    cores: int = int | None
+    cores: int = 1
     gpu: int | None = None
     mode: str = "default"
     nodes: int | None = None
@@ -25,6 +25,7 @@ class ParameterRequest(BaseModel):
     module_names: list[str] | None = None
     logs_default: str | None = None
     logs_error: str | None = None
+    array: str | None = None
 
     def __str__(self):
         return f"Current Configuration: {self.name}, {self.account}, {self.exec_command}, {self.cores}, {self.gpu}, {self.mode}, {self.nodes}, {self.time}, {self.ntasks}, {self.partition}, {self.environment_commands}, {self.module_names}, {self.logs_default}, {self.logs_error}"
@@ -37,6 +38,10 @@ class ValidationResult(BaseModel):
     valid: bool
     result: str
     report: Optional[str] = None
+    # True if the job has critical errors, None when no report was made
+    critical: Optional[bool] = None
+    # Stage timings of the job, only sent when the request asks for timings
+    timings: Optional[List[dict]] = None
 
 
 class ValidationResponse(BaseModel):
@@ -45,3 +50,23 @@ class ValidationResponse(BaseModel):
     valid: bool
     results: List[ValidationResult]
     error: Optional[str] = None
+    # Timings of loading the config, only sent when the request asks for timings
+    timings: Optional[List[dict]] = None
+
+
+class BatchRequest(BaseModel):
+    """Request model for validating several configurations in one call
+
+    Configs and parameter requests can be mixed, results are returned in the
+    order configs first then parameters.
+    """
+
+    configs: List[ConfigRequest] = []
+    parameters: List[ParameterRequest] = []
+
+
+class BatchValidationResponse(BaseModel):
+    """Response model for batch validation, one ValidationResponse per item"""
+
+    valid: bool
+    responses: List[ValidationResponse]
@@ -0,0 +1,88 @@
+import logging
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Writes the API audit logs (submitted configs and reports) from a background thread.
+
+    Request handlers only put entries on a queue, the disk writes are done by a
+    daemon thread so the event loop never blocks on the filesystem.
+
+    Layout on disk (unchanged from the old create_log_api):
+        <path>/<log_id>/<log_id>.<extension>
+        <path>/<log_id>/<report_name>.<extension>
+    """
+
+    def __init__(self, path: str = "api/logs", max_queue_size: int = 10000):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the writer thread (does nothing if it is already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="slurmify-audit-log", daemon=True
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        log_id: str,
+        extension: str,
+        content: str,
+        report_name: str | None = None,
+    ) -> None:
+        """Queue a log file to be written, never blocks the caller
+
+        Args:
+            log_id (str): Id of the request, used as folder name
+            extension (str): File extension
+            content (str): Content of the file
+            report_name (str, optional): File name, defaults to log_id
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((log_id, extension, content, report_name))
+        except queue.Full:
+            logger.error(f"Audit log queue is full, dropping log for {log_id}")
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Write everything still queued and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None:
+            return
+
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            self._write(*entry)
+
+    def _write(
+        self, log_id: str, extension: str, content: str, report_name: str | None
+    ) -> None:
+        try:
+            path_to_save = os.path.join(self.path, log_id)
+            os.makedirs(path_to_save, exist_ok=True)
+
+            file_name = f"{report_name or log_id}.{extension}"
+
+            with open(os.path.join(path_to_save, file_name), "w") as f:
+                f.write(content)
+        except Exception as e:
+            logger.error(f"Failed to write audit log: {str(e)}")
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class ValidationCache:
+    """Size bounded LRU cache with a time to live for serialized validation responses.
+
+    Entries are content addressed: the key is a hash of the submitted config
+    source together with the versions of everything the result depends on
+    (conf.yaml, module list, ...), so a changed system config never serves a
+    stale result.
+
+    Attributes:
+        max_size (int): Maximum number of entries, the least recently used is evicted first
+        ttl (float): Seconds an entry stays valid
+        hits (int): Number of lookups answered from the cache
+        misses (int): Number of lookups not in the cache (or expired)
+        evictions (int): Number of entries removed because the cache was full
+        expirations (int): Number of entries removed because they were too old
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source: str, *versions) -> str:
+        """Build the cache key for a config source and the versions it was validated against"""
+        digest = hashlib.sha256(source.encode())
+        for version in versions:
+            digest.update(b"\0")
+            digest.update(repr(version).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Get the serialized response for a key or None if it's missing or expired"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, payload = entry
+            if now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: str) -> None:
+        """Store a serialized response, evicting the least recently used entries if full"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), payload)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters of the cache, hit_rate is 0 when nothing was looked up yet"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the worker pool has no free worker and its queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Validation worker pool is saturated")
+        self.retry_after = retry_after
+
+
+class ValidationWorkerPool:
+    """Bounded pool that runs the blocking validation work off the asyncio loop.
+
+    At most max_workers calls run at the same time and at most max_queue more
+    wait for a worker. Anything beyond that is rejected right away with
+    PoolSaturatedError so the API can answer 429 instead of piling up requests.
+
+    Attributes:
+        kind (str): "thread" or "process"
+        max_workers (int): Number of workers
+        max_queue (int): Number of calls allowed to wait for a worker
+        retry_after (int): Seconds suggested to rejected clients
+        rejected (int): Number of calls rejected since start
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 32,
+        kind: str = "thread",
+        retry_after: int = 1,
+        initializer: Callable[[], Any] | None = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind '{kind}', use thread or process")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.initializer = initializer
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Executor | None = None
+
+    @property
+    def pending(self) -> int:
+        """Calls currently running or waiting for a worker"""
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a worker"""
+        return max(0, self._pending - self.max_workers)
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=self.initializer
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="slurmify-validation",
+                initializer=self.initializer,
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _admit(self, amount: int = 1) -> None:
+        with self._lock:
+            if self._pending + amount > self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(self.retry_after)
+            self._pending += amount
+
+    def _release(self, amount: int = 1) -> None:
+        with self._lock:
+            self._pending -= amount
+
+    async def _execute(self, fn: Callable, *args) -> Any:
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) in the pool
+
+        Raises:
+            PoolSaturatedError: If every worker is busy and the queue is full
+        """
+        self._admit()
+        try:
+            return await self._execute(fn, *args)
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def batch(self):
+        """Admit a batch of calls as one unit of queue space
+
+        Yields a run(fn, *args) coroutine function that never has more than
+        max_workers calls of the batch in the pool at once, so a large batch
+        does not flood the executor queue.
+
+        Raises:
+            PoolSaturatedError: If the pool is saturated when the batch arrives
+        """
+        self._admit()
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def run(fn: Callable, *args) -> Any:
+            async with limit:
+                return await self._execute(fn, *args)
+
+        try:
+            yield run
+        finally:
+            self._release()
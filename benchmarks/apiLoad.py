@@ -0,0 +1,466 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+import yaml
+
+"""
+Load generator for the FastAPI server (main_api.py).
+
+    python -m benchmarks.apiLoad                              # in-process app
+    python -m benchmarks.apiLoad --url http://127.0.0.1:8000  # running uvicorn
+    python -m benchmarks.apiLoad -c 1,8,32 -n 300 -o load.json
+
+Requests are drawn at random (seeded) from:
+
+    /validate                   TestConfigs files, split into valid, invalid
+                                and syntax-error configs using TestInfo.yaml
+    /GenerateConfigParameters   GET with valid and invalid parameter sets
+    /module_search              existing, partial and unknown module names
+    --replay FILE.jsonl         recorded requests, one JSON object per line:
+                                {"method": "POST", "path": "/validate", "json": {...}}
+                                or {"method": "GET", "path": "...", "params": {...}}
+
+For every concurrency level a closed loop of that many clients sends the
+requests. The report has the throughput, a latency histogram and
+percentiles, and the error and 429 rates, overall and per route. In-process
+runs also measure the event-loop lag: a blocking call in an async handler
+shows up there first.
+
+Identical configs are answered from the API's validation cache. Use --unique
+to make every /validate body different so each one really executes.
+
+Needs httpx (installed with FastAPI's test extras: pip install httpx).
+"""
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bounds in ms, the last bucket is everything slower
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+PARAMETER_SETS = {
+    "valid": [
+        {"name": "LoadCpu", "account": "lxp", "exec_command": "srun hostname"},
+        {
+            "name": "LoadGpu",
+            "account": "lxp",
+            "exec_command": "srun nvidia-smi",
+            "partition": "gpu",
+            "gpu": 4,
+            "cores": 8,
+            "time": "02:00:00",
+        },
+        {
+            "name": "LoadModules",
+            "account": "lxp",
+            "exec_command": "srun python run.py",
+            "module_names": "Python/3.11.3-GCCcore-12.3.0,GCC/12.3.0",
+        },
+    ],
+    "invalid": [
+        {"name": "LoadBadQos", "account": "lxp", "exec_command": "srun x", "mode": "nope"},
+        {
+            "name": "LoadTooLong",
+            "account": "lxp",
+            "exec_command": "srun x",
+            "mode": "test",
+            "time": "10:00:00",
+        },
+        {
+            "name": "LoadBadModule",
+            "account": "lxp",
+            "exec_command": "srun x",
+            "module_names": "Pyhton/3.11",
+        },
+    ],
+}
+
+MODULE_SEARCH_TERMS = ["Python", "pyth", "CUDA", "gcc", "Torch", "R", "zz-no-such-module"]
+
+
+def parse_weights(text: str) -> dict[str, float]:
+    """Parse 'a=0.5,b=0.5' into {'a': 0.5, 'b': 0.5}"""
+    weights = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def load_config_corpus() -> dict[str, list[str]]:
+    """TestConfigs sources by category: valid, invalid and syntax"""
+    with open(os.path.join(REPO_DIR, "TestConfigs", "TestInfo.yaml"), "r") as file:
+        tests_info = (yaml.safe_load(file) or {}).get("TestConfigs", {})
+
+    corpus: dict[str, list[str]] = {"valid": [], "invalid": [], "syntax": []}
+
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "TestConfigs", "*", "*.py"))):
+        folder = os.path.basename(os.path.dirname(path))
+        info = tests_info.get(folder, {}).get("tests", {}).get(os.path.basename(path))
+
+        if folder == "SyntaxProblems":
+            category = "syntax"
+        elif info and info.get("expected_result") in ("valid", "invalid"):
+            category = info["expected_result"]
+        else:
+            continue  # no expectation, the mix would not be controlled
+
+        with open(path, "r") as file:
+            corpus[category].append(file.read())
+
+    return corpus
+
+
+def load_replay(path: str) -> list[dict]:
+    """Recorded requests from a JSONL file, lines that are not API requests are skipped"""
+    requests = []
+    skipped = 0
+
+    with open(path, "r") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+
+            if not isinstance(entry, dict) or not str(entry.get("path", "")).startswith("/"):
+                skipped += 1
+                continue
+
+            requests.append(
+                {
+                    "route": entry.get("route", entry["path"]),
+                    "method": entry.get("method", "GET").upper(),
+                    "path": entry["path"],
+                    "json": entry.get("json"),
+                    "params": entry.get("params"),
+                }
+            )
+
+    if skipped:
+        print(f"Replay: {len(requests)} requests from {path}, {skipped} lines skipped")
+
+    return requests
+
+
+class TrafficMix:
+    """Draws requests following the route and config mix"""
+
+    def __init__(
+        self,
+        route_weights: dict[str, float],
+        config_weights: dict[str, float],
+        replay: list[dict],
+        unique: bool,
+        seed: int,
+    ):
+        self.random = random.Random(seed)
+        self.corpus = load_config_corpus()
+        self.replay = replay
+        self.unique = unique
+        self.counter = 0
+
+        self.routes = [
+            route
+            for route in route_weights
+            if route != "replay" or replay
+        ]
+        self.route_weights = [route_weights[route] for route in self.routes]
+
+        self.config_categories = [
+            category for category in config_weights if self.corpus.get(category)
+        ]
+        self.config_weights = [config_weights[c] for c in self.config_categories]
+
+    def next(self) -> dict:
+        route = self.random.choices(self.routes, self.route_weights)[0]
+        self.counter += 1
+
+        if route == "validate":
+            category = self.random.choices(self.config_categories, self.config_weights)[0]
+            code = self.random.choice(self.corpus[category])
+            if self.unique:
+                code += f"\n# load request {self.counter}\n"
+            return {
+                "route": f"validate:{category}",
+                "method": "POST",
+                "path": "/validate",
+                "json": {"code": code},
+            }
+
+        if route == "params":
+            category = self.random.choice(["valid", "invalid"])
+            return {
+                "route": f"params:{category}",
+                "method": "GET",
+                "path": "/GenerateConfigParameters",
+                "params": self.random.choice(PARAMETER_SETS[category]),
+            }
+
+        if route == "search":
+            return {
+                "route": "search",
+                "method": "GET",
+                "path": "/module_search",
+                "params": {"search": self.random.choice(MODULE_SEARCH_TERMS)},
+            }
+
+        return self.random.choice(self.replay)
+
+
+class LevelStats:
+    """Latencies and outcomes of one concurrency level"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.rejected: dict[str, int] = {}
+        self.loop_lag: list[float] = []
+
+    def record(self, route: str, latency: float, status: int | None) -> None:
+        self.latencies.setdefault(route, []).append(latency)
+        if status == 429:
+            self.rejected[route] = self.rejected.get(route, 0) + 1
+        elif status is None or status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def summarize(latencies: list[float], errors: int, rejected: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+
+    histogram = {f"<={bucket}ms": 0 for bucket in HISTOGRAM_BUCKETS_MS}
+    histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] = 0
+    for latency in latencies:
+        ms = latency * 1000
+        for bucket in HISTOGRAM_BUCKETS_MS:
+            if ms <= bucket:
+                histogram[f"<={bucket}ms"] += 1
+                break
+        else:
+            histogram[f">{HISTOGRAM_BUCKETS_MS[-1]}ms"] += 1
+
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "rejected_rate": round(rejected / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if count else 0.0,
+        "histogram": histogram,
+    }
+
+
+async def send(client, request: dict) -> int | None:
+    try:
+        response = await client.request(
+            request["method"],
+            request["path"],
+            json=request.get("json"),
+            params=request.get("params"),
+        )
+        return response.status_code
+    except Exception:
+        return None
+
+
+async def measure_loop_lag(stats: LevelStats, stop: asyncio.Event, interval: float = 0.01):
+    """Record how late a 10ms sleep wakes up while the load runs"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stats.loop_lag.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_level(client, mix: TrafficMix, concurrency: int, total: int, in_process: bool) -> dict:
+    stats = LevelStats()
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            request = mix.next()
+            start = time.perf_counter()
+            status = await send(client, request)
+            stats.record(request["route"], time.perf_counter() - start, status)
+
+    stop = asyncio.Event()
+    lag_probe = asyncio.create_task(measure_loop_lag(stats, stop)) if in_process else None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    if lag_probe is not None:
+        await lag_probe
+
+    all_latencies = [latency for values in stats.latencies.values() for latency in values]
+    result = {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        **summarize(
+            all_latencies,
+            sum(stats.errors.values()),
+            sum(stats.rejected.values()),
+            elapsed,
+        ),
+        "routes": {
+            route: summarize(
+                latencies,
+                stats.errors.get(route, 0),
+                stats.rejected.get(route, 0),
+                elapsed,
+            )
+            for route, latencies in sorted(stats.latencies.items())
+        },
+    }
+
+    if in_process:
+        lag = sorted(stats.loop_lag)
+        result["loop_lag_ms"] = {
+            "p99": round(percentile(lag, 0.99) * 1000, 3),
+            "max": round(lag[-1] * 1000, 3) if lag else 0.0,
+        }
+
+    return result
+
+
+async def run_load(args, mix: TrafficMix) -> list[dict]:
+    try:
+        import httpx
+    except ImportError:
+        raise SystemExit("The load generator needs httpx: pip install httpx")
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return [await run_level(client, mix, level, args.requests, False) for level in levels]
+
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(REPO_DIR)
+    import main_api
+
+    # ASGITransport does not run the lifespan, start the pools like uvicorn would
+    async with main_api.lifespan(main_api.app):
+        transport = httpx.ASGITransport(app=main_api.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://slurmify", timeout=timeout
+        ) as client:
+            # One request per route first so imports and caches are not measured
+            for _ in range(len(mix.routes) * 2):
+                await send(client, mix.next())
+            return [await run_level(client, mix, level, args.requests, True) for level in levels]
+
+
+def print_report(levels: list[dict]) -> None:
+    print(
+        f"\n{'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'max ms':>9} {'errors':>7} {'429':>7} {'loop lag max':>13}"
+    )
+    for level in levels:
+        lag = level.get("loop_lag_ms", {}).get("max")
+        print(
+            f"{level['concurrency']:>5} {level['throughput_rps']:>9.1f} {level['p50_ms']:>9.2f} "
+            f"{level['p95_ms']:>9.2f} {level['p99_ms']:>9.2f} {level['max_ms']:>9.2f} "
+            f"{level['error_rate']:>7.1%} {level['rejected_rate']:>7.1%} "
+            f"{'-' if lag is None else f'{lag:.2f} ms':>13}"
+        )
+
+    last = levels[-1]
+    print(f"\nPer route at concurrency {last['concurrency']}:")
+    for route, stats in last["routes"].items():
+        print(
+            f"  {route:<22} {stats['requests']:>6} req  p50 {stats['p50_ms']:>8.2f} ms  "
+            f"p99 {stats['p99_ms']:>8.2f} ms  errors {stats['error_rate']:.1%}"
+        )
+
+    print(f"\nLatency histogram at concurrency {last['concurrency']}:")
+    for bucket, count in last["histogram"].items():
+        if count:
+            print(f"  {bucket:>9} {count:>6}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Slurmify API")
+    parser.add_argument("--url", type=str, help="Base URL of a running server (default: in-process)")
+    parser.add_argument(
+        "-c", "--concurrency", type=str, default="1,4,16,64", help="Concurrency levels, comma separated"
+    )
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Requests per level")
+    parser.add_argument(
+        "--mix",
+        type=str,
+        default="validate=0.6,params=0.25,search=0.15,replay=0",
+        help="Route weights (validate, params, search, replay)",
+    )
+    parser.add_argument(
+        "--config-mix",
+        type=str,
+        default="valid=0.6,invalid=0.3,syntax=0.1",
+        help="Weights of valid, invalid and syntax-error configs for /validate",
+    )
+    parser.add_argument("--replay", type=str, help="JSONL file of recorded requests")
+    parser.add_argument(
+        "--unique", action="store_true", help="Make every /validate body unique (no cache hits)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the traffic mix")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("-o", "--output", type=str, help="Write the report JSON to this file")
+    args = parser.parse_args(argv)
+
+    route_weights = parse_weights(args.mix)
+    replay = load_replay(args.replay) if args.replay else []
+    if replay and not route_weights.get("replay"):
+        route_weights["replay"] = 0.25
+
+    mix = TrafficMix(
+        route_weights,
+        parse_weights(args.config_mix),
+        replay,
+        args.unique,
+        args.seed,
+    )
+
+    levels = asyncio.run(run_load(args, mix))
+    print_report(levels)
+
+    if args.output:
+        report = {
+            "target": args.url or "in-process",
+            "requests_per_level": args.requests,
+            "mix": route_weights,
+            "config_mix": parse_weights(args.config_mix),
+            "unique": args.unique,
+            "levels": levels,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+            file.write("\n")
+        print(f"\nReport written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+"""
+Benchmark of the validation pipeline, stage by stage.
+
+    python -m benchmarks.pipeline                      # run and print
+    python -m benchmarks.pipeline -o result.json       # also write JSON
+    python -m benchmarks.pipeline --baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline --save-baseline benchmarks/baseline.json
+
+Every config of TestConfigs and a few generated configs with many jobs go
+through the same stages as `main.py -f`:
+
+    load_python_conf_file         per config file (includes its own type check)
+    check_class_parameter_types   per config file, on the loaded module
+    validate_system               per job
+    validate_modules              per job
+    generate_slurm_script         per valid job, without writing the file
+
+Warm mode keeps conf.yaml and the module list cached like the API does. Cold
+mode clears both caches before every config, like a fresh CLI run (imports
+stay loaded, see `main.py --profile-startup` for those). Timings are taken
+without tracemalloc. The allocations come from one extra traced pass.
+
+With --baseline, the p50 and p95 of every stage are compared with a stored
+result. The command exits with 1 if a stage got slower than the tolerance.
+"""
+
+SCHEMA_VERSION = 1
+STAGES = [
+    "load_python_conf_file",
+    "check_class_parameter_types",
+    "validate_system",
+    "validate_modules",
+    "generate_slurm_script",
+]
+MODES = ["warm", "cold"]
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SYNTHETIC_JOB = """
+Jobs.add_job(
+    Job(
+        name="SyntheticJob{index}",
+        system=System(
+            name="SyntheticSystem",
+            resources=Resources(
+                account="lxp",
+                cores={cores},
+                gpu={gpu},
+                mode="{mode}",
+                nodes={nodes},
+                time="{time}",
+                partitions="{partition}",
+                ntasks={ntasks},
+            ),
+        ),
+        modules=Modules(
+            list_of_modules=[
+                Module(name="{module}"),
+                Module(name="Python/3.11.3-GCCcore-12.3.0"),
+            ]
+        ),
+        environments=[
+            Environment(name="Threads", commands=["export OMP_NUM_THREADS={cores}"])
+        ],
+        exec_command=["srun python job_{index}.py"],
+    )
+)
+"""
+
+SYNTHETIC_VARIANTS = [
+    # partition, mode, nodes, cores, gpu, ntasks, time, module
+    ("cpu", "default", 2, 64, None, 2, "02:00:00", "GCC/12.3.0"),
+    ("gpu", "default", 1, 8, 4, 4, "04:00:00", "CUDA/12.2.0"),
+    ("cpu", "short", 1, 16, None, 1, "00:30:00", "OpenMPI/4.1.5-GCC-12.3.0"),
+    ("largemem", "default", 1, 128, None, 1, "12:00:00", "R/4.3.2-gfbf-2023a"),
+    # Invalid on purpose: too many nodes for the QoS
+    ("cpu", "test", 500, 2, None, 500, "00:10:00", "GCC/12.3.0"),
+]
+
+
+def synthetic_config_source(job_count: int) -> str:
+    """Source of a config file with job_count jobs cycling through SYNTHETIC_VARIANTS"""
+    source = [
+        "from utils.config_info import Environment, Jobs, Job, System, Resources, Modules, Module",
+        "",
+        "Jobs = Jobs()",
+    ]
+    for index in range(job_count):
+        partition, mode, nodes, cores, gpu, ntasks, time_limit, module = (
+            SYNTHETIC_VARIANTS[index % len(SYNTHETIC_VARIANTS)]
+        )
+        source.append(
+            SYNTHETIC_JOB.format(
+                index=index,
+                partition=partition,
+                mode=mode,
+                nodes=nodes,
+                cores=cores,
+                gpu=gpu,
+                ntasks=ntasks,
+                time=time_limit,
+                module=module,
+            )
+        )
+    return "\n".join(source)
+
+
+def collect_corpus(synthetic_sizes: list[int], workdir: str) -> list[str]:
+    """TestConfigs files plus generated configs written to workdir"""
+    corpus = sorted(glob.glob(os.path.join(REPO_DIR, "TestConfigs", "*", "*.py")))
+
+    for size in synthetic_sizes:
+        path = os.path.join(workdir, f"synthetic_{size}_jobs.py")
+        with open(path, "w") as file:
+            file.write(synthetic_config_source(size))
+        corpus.append(path)
+
+    return corpus
+
+
+def clear_caches() -> None:
+    """Forget conf.yaml and the module list, like a new CLI process"""
+    from utils.moduleListHandler import clear_module_list_cache
+    from utils.system_config import clear_system_config_cache
+
+    clear_system_config_cache()
+    clear_module_list_cache()
+
+
+class StageRecorder:
+    """Collects the samples of every stage, either timings or allocations"""
+
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        self.samples: dict[str, list[float]] = {stage: [] for stage in STAGES}
+
+    def run(self, stage: str, fn, *args):
+        if not self.trace_allocations:
+            start = time.perf_counter()
+            result = fn(*args)
+            self.samples[stage].append(time.perf_counter() - start)
+            return result
+
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        self.samples[stage].append(max(0, peak - before))
+        return result
+
+
+def run_config(path: str, recorder: StageRecorder, cold: bool) -> None:
+    """Push one config file through all stages"""
+    import utils.func
+    from utils.func import generate_slurm_script, get_slurmify_jobs
+    from utils.slurmifyLoader import load_python_conf_file
+    from utils.slurmifyValidationReport import SlurmifyValidationReport
+    from utils.system_config import get_system_config
+    from utils.typeValidators import check_class_parameter_types
+    from utils.validators import validate_modules, validate_system
+
+    if cold:
+        clear_caches()
+
+    module, error_report = recorder.run("load_python_conf_file", load_python_conf_file, path)
+    if module is None:
+        return
+
+    recorder.run(
+        "check_class_parameter_types",
+        check_class_parameter_types,
+        module,
+        SlurmifyValidationReport("ConfigValidation"),
+    )
+
+    jobs = get_slurmify_jobs(module, error_report)
+    if not jobs:
+        return
+
+    def system_stage(job, report):
+        # Looked up per job like validate_job does, in cold mode the first job pays the parse
+        system_config = get_system_config()
+        validation_info = {
+            "constraints": system_config.raw["constraints"],
+            "system_constraints": system_config.raw["system_constraints"],
+            "constraint_table": system_config.constraint_table,
+        }
+        return validate_system(job, validation_info, report)
+
+    for job in jobs:
+        report = SlurmifyValidationReport(job.name, job)
+        system_valid = recorder.run("validate_system", system_stage, job, report)
+        modules_valid = recorder.run("validate_modules", validate_modules, job, report)
+
+        if system_valid and (modules_valid or utils.func.skip_modules):
+            recorder.run(
+                "generate_slurm_script",
+                generate_slurm_script,
+                job,
+                None,
+                False,
+            )
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[rank]
+
+
+def summarize(timings: list[float], allocations: list[float]) -> dict:
+    timings = sorted(timings)
+    count = len(timings)
+    return {
+        "count": count,
+        "mean_ms": round(sum(timings) / count * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 4),
+        "max_ms": round(timings[-1] * 1000, 4) if count else 0.0,
+        "alloc_peak_kib_mean": (
+            round(sum(allocations) / len(allocations) / 1024, 2) if allocations else 0.0
+        ),
+        "alloc_peak_kib_max": round(max(allocations) / 1024, 2) if allocations else 0.0,
+    }
+
+
+def run_mode(corpus: list[str], mode: str, repeat: int) -> dict:
+    cold = mode == "cold"
+
+    # One untimed pass so imports and (in warm mode) the caches are loaded
+    for path in corpus:
+        run_config(path, StageRecorder(), cold)
+
+    timings = StageRecorder()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for path in corpus:
+                run_config(path, timings, cold)
+    finally:
+        gc.enable()
+
+    allocations = StageRecorder(trace_allocations=True)
+    tracemalloc.start()
+    try:
+        for path in corpus:
+            run_config(path, allocations, cold)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: summarize(timings.samples[stage], allocations.samples[stage])
+        for stage in STAGES
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Stages whose p50 or p95 got slower than the baseline allows"""
+    regressions = []
+
+    for mode, stages in result["modes"].items():
+        for stage, stats in stages.items():
+            base = baseline.get("modes", {}).get(mode, {}).get(stage)
+            if not base:
+                continue
+
+            for key in ("p50_ms", "p95_ms"):
+                limit = base[key] * (1 + tolerance)
+                if stats[key] > limit and stats[key] - base[key] > min_delta_ms:
+                    regressions.append(
+                        f"{mode}/{stage} {key}: {stats[key]:.4f} ms "
+                        f"(baseline {base[key]:.4f} ms, +{(stats[key] / base[key] - 1) * 100:.0f}%)"
+                    )
+
+    return regressions
+
+
+def print_result(result: dict) -> None:
+    for mode, stages in result["modes"].items():
+        print(f"\n{mode} ({result['meta']['repeat']} repeats, {result['meta']['configs']} configs)")
+        print(
+            f"{'Stage':<30} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}"
+        )
+        for stage, stats in stages.items():
+            print(
+                f"{stage:<30} {stats['count']:>7} {stats['p50_ms']:>9.3f} "
+                f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['alloc_peak_kib_mean']:>9.1f}"
+            )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Slurmify validation pipeline")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Timed passes over the corpus")
+    parser.add_argument(
+        "--mode", choices=[*MODES, "both"], default="both", help="Cache mode to run"
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=str,
+        default="50,500",
+        help="Job counts of the generated configs, comma separated ('' for none)",
+    )
+    parser.add_argument("-o", "--output", type=str, help="Write the result JSON to this file")
+    parser.add_argument("--baseline", type=str, help="Fail if slower than this result JSON")
+    parser.add_argument("--save-baseline", type=str, help="Write the result as new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.05,
+        help="Ignore slowdowns smaller than this, they are noise",
+    )
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(REPO_DIR)
+
+    sizes = [int(size) for size in args.synthetic.split(",") if size.strip()]
+    modes = MODES if args.mode == "both" else [args.mode]
+
+    with tempfile.TemporaryDirectory(prefix="slurmify-bench-") as workdir:
+        corpus = collect_corpus(sizes, workdir)
+        result = {
+            "schema": SCHEMA_VERSION,
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "configs": len(corpus),
+                "synthetic_jobs": sizes,
+            },
+            "modes": {mode: run_mode(corpus, mode, args.repeat) for mode in modes},
+        }
+
+    print_result(result)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as file:
+            json.dump(result, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"\nResult written to {path}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+
+    if baseline.get("schema") != SCHEMA_VERSION:
+        print(f"\nBaseline {args.baseline} has another schema version, not compared")
+        return 1
+
+    regressions = compare(result, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSION against {args.baseline}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print(f"\nNo regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
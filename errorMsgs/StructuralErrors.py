@@ -349,3 +349,91 @@ def unexpectedKeywordMsg() -> ErrorEntry:
             "Check documentation for correct parameters",
         ],
     )
+
+
+def sandboxTimeoutMsg(wall_time: float) -> ErrorEntry:
+    """
+    Handle a configuration that did not finish within the wall time limit.
+
+    Args:
+        wall_time (float): The wall time limit in seconds.
+
+    Returns:
+        ErrorEntry: An error entry with the details of the timeout.
+    """
+    return ErrorEntry(
+        critical=True,
+        msgFunctionName="sandboxTimeoutMsg",
+        errormsg=[f"Configuration did not finish within {wall_time} seconds"],
+        info=[
+            "The configuration file is executed to build the jobs",
+            "It should only create Slurmify objects and not do any real work",
+            "Check for infinite loops, sleeps or long running code",
+        ],
+    )
+
+
+def sandboxTerminatedMsg(reason: str) -> ErrorEntry:
+    """
+    Handle a configuration whose execution was stopped (CPU or memory limit, crash).
+
+    Args:
+        reason (str): Why the execution was stopped.
+
+    Returns:
+        ErrorEntry: An error entry with the details of the termination.
+    """
+    return ErrorEntry(
+        critical=True,
+        msgFunctionName="sandboxTerminatedMsg",
+        errormsg=[f"Configuration execution was stopped: {reason}"],
+        info=[
+            "The configuration file is executed to build the jobs",
+            "It should only create Slurmify objects and not do any real work",
+            "Check for loops, large allocations or code that crashes the interpreter",
+        ],
+    )
+
+
+def sandboxBusyMsg(timeout: float) -> ErrorEntry:
+    """
+    Handle a configuration that found no free sandbox worker.
+
+    Args:
+        timeout (float): Seconds the configuration waited for a worker.
+
+    Returns:
+        ErrorEntry: An error entry with the details of the wait.
+    """
+    return ErrorEntry(
+        critical=True,
+        msgFunctionName="sandboxBusyMsg",
+        errormsg=[f"No sandbox worker was free within {timeout} seconds"],
+        info=[
+            "The server is busy executing other configurations",
+            "Retry the validation later",
+        ],
+    )
+
+
+def unsupportedJobObjectsMsg(e: Exception) -> ErrorEntry:
+    """
+    Handle jobs that cannot be sent back from the sandbox.
+
+    Args:
+        e (Exception): What is not supported.
+
+    Returns:
+        ErrorEntry: An error entry with the details of the unsupported objects.
+    """
+    return ErrorEntry(
+        critical=True,
+        msgFunctionName="unsupportedJobObjectsMsg",
+        errormsg=["Jobs contain objects that are not Slurmify classes"],
+        info=[
+            "Only use the classes from utils.config_info and plain values",
+            "(str, int, list, ...) inside of your jobs",
+            "Subclasses or functions defined in the configuration are not supported",
+            f"Error details: {str(e)}",
+        ],
+    )
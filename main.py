@@ -1,25 +1,23 @@
+from __future__ import annotations
+
 import re
 import os
+import sys
 import time
-import yaml
-from utils import arg_handler
-from utils.config_info import Job, Jobs
-from utils.func import (
-    generate_slurm_script_from_config,
-    get_slurmify_jobs,
-    search_module,
-    set_skip_modules,
-    start_validation,
-    generate_slurm_script,
-)
-from utils.printers import print_error, print_success, print_info, enable_printing
-import subprocess
 import argparse
-from utils.slurmifyLoader import load_python_conf_file
-from utils.slurmifyValidationReport import SlurmifyValidationReport
+from typing import TYPE_CHECKING
+from utils.printers import print_error, print_success, print_info, enable_printing
 from utils.arg_handler import arg_handler
 import utils.colors as COLOR_MAP
 
+# The validators, the config loader and the module list are only imported by
+# the commands that need them, so --init, --help and --module_search start fast
+if TYPE_CHECKING:
+    from utils.config_info import Job
+    from utils.slurmifyValidationReport import SlurmifyValidationReport
+    from utils.testReport import ConfigTestResult
+    from utils.validationTrace import ValidationTrace
+
 
 testing_mode = False
 auto_run_slurm = False
@@ -29,21 +27,26 @@ strict_mode = True
 
 
 def validate_slurmify_config(
-    path: str, generate_slurm: bool = False
+    path: str, generate_slurm: bool = False, trace: ValidationTrace | None = None
 ) -> tuple[bool, list[SlurmifyValidationReport]]:
     """Validate the SLURM configuration file:
     Each Job will have its own validation report
 
     Args:
         path (str): Path to the SLURM configuration file
+        trace (ValidationTrace, optional): Records the loading and type check
+            timings, the job timings are on the job reports
     """
 
+    from utils.func import get_slurmify_jobs, start_validation
+    from utils.slurmifyLoader import load_python_conf_file
+
     print_info(f"Validating SLURM configuration file: {path}")
 
     reports: list[SlurmifyValidationReport] = []
 
     # Load the Python configuration file
-    module, error_report = load_python_conf_file(path)
+    module, error_report = load_python_conf_file(path, trace=trace)
 
     if module is None:
         reports.append(error_report)
@@ -76,7 +79,130 @@ def validate_slurmify_config(
     return True, reports
 
 
-def testing_configs(prefix: str, auto_run_slurm: bool = False) -> None:
+def write_validation_trace(
+    path: str, config_trace: ValidationTrace, reports: list[SlurmifyValidationReport]
+) -> None:
+    """Write the stage timings as Chrome trace JSON, one row for loading and one per job"""
+    from utils.validationTrace import write_chrome_trace
+
+    traces = [("ConfigValidation", config_trace)]
+    traces += [
+        (report.job_name, report.trace)
+        for report in reports
+        if report.trace is not config_trace
+    ]
+
+    write_chrome_trace(traces, path)
+    print_info(f"Validation trace written to {path}", debug=True)
+
+
+def run_test_config(
+    folder: str,
+    file: str,
+    path: str,
+    run_slurm: bool,
+    slurm_available: bool,
+    tmp_test_path: str,
+) -> ConfigTestResult:
+    """
+    Validate one test config and, if requested, check its generated scripts with
+    sbatch --test-only. Runs in a test worker when --test uses more than one job.
+
+    args:
+        folder: Test folder of the config
+        file: File name of the config
+        path: Path of the config
+        run_slurm: If True the generated scripts of a valid config are checked with sbatch
+        slurm_available: Result of the sinfo check done once before the tests
+        tmp_test_path: Folder for the generated scripts
+    """
+    import subprocess
+    from utils.func import generate_slurm_script_from_config
+    from utils.testReport import ConfigTestResult
+
+    result = ConfigTestResult(folder=folder, file=file)
+    start = time.perf_counter()
+
+    try:
+        valid, error_reports = validate_slurmify_config(path)
+        result.valid = valid
+
+        if run_slurm and valid:
+            if not slurm_available:
+                result.slurm_message = (
+                    f"{COLOR_MAP.RED}| Slurm [UNAVAILABE]{COLOR_MAP.RESET}"
+                )
+                print_error("Slurm is not available")
+            else:
+                # List of jobs inside of the file, it is possible to have multiple jobs in the same file
+                tested_jobs: list[Job] = [report.job for report in error_reports]
+
+                # TODO: And need to remove the fila after the test
+                # Generate a TEMP SLURM script file to be executed by SLURM --test-onlyy
+                # Every config gets its own folder so parallel workers do not collide
+                sbatch_paths = generate_slurm_script_from_config(
+                    tested_jobs,
+                    valid=valid,
+                    output_path=os.path.join(
+                        tmp_test_path, folder, os.path.splitext(file)[0]
+                    ),
+                )
+
+                for sbatch in sbatch_paths or []:
+                    # Run the slurm script and check if it runs correctly
+                    if not sbatch.endswith(".sh"):
+                        continue
+
+                    output = subprocess.run(
+                        ["sbatch", "--test-only", sbatch],
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                    )
+
+                    job_id = None
+
+                    if output.stderr:
+                        print_error(f"output: {output.stderr.decode('utf-8')}")
+
+                        match = re.search(r"Job (\d+)", output.stderr.decode("utf-8"))
+
+                        if match:
+                            job_id = match.group(1)
+
+                    if job_id is None:
+                        result.slurm_message += (
+                            f"{COLOR_MAP.RED}| Slurm [FAILED] {COLOR_MAP.RESET}"
+                        )
+                        print_error("Slurm script failed to run")
+                        result.slurm_failures += 1
+                        continue
+
+                    result.slurm_message += (
+                        f"{COLOR_MAP.GREEN}| Slurm [PASSED] {COLOR_MAP.RESET}"
+                    )
+                    print_success("Slurm script passed to run")
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _init_test_worker(verbose: bool, skip_modules: bool) -> None:
+    """Give a test worker process the printing and module check settings of the CLI"""
+    from utils.func import set_skip_modules
+
+    enable_printing(verbose)
+    if skip_modules:
+        set_skip_modules(True)
+
+
+def testing_configs(
+    prefix: str,
+    auto_run_slurm: bool = False,
+    jobs: int = 1,
+    junit_xml: str | None = None,
+) -> None:
     """
     This function is used to test a mutitude of configurations to testt if the tests are
     working correctly and if the slurm scripts are generated correctly.
@@ -87,10 +213,22 @@ def testing_configs(prefix: str, auto_run_slurm: bool = False) -> None:
         - TypeOfTest2
             - Test1-n.py
 
+    With jobs > 1 the configs are validated by a pool of worker processes, one
+    config per task. The results are printed in the same order and with the
+    same summary as a serial run, each as soon as it and the ones before it
+    are done.
+
     args:
         prefix: The prefix of the folder to test. This is used to find the folder to test.
         auto_run_slurm: If True it will run the slurm script and check if it runs correctly.
+        jobs: Number of worker processes, 0 uses one per CPU.
+        junit_xml: If set, the results are also written to this file as JUnit XML.
     """
+    import subprocess
+    import yaml
+    import utils.func
+    import utils.printers
+    from utils.testReport import ConfigTestCase, ConfigTestResult, write_junit_xml
 
     print_info("Starting testing configs")
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -102,161 +240,172 @@ def testing_configs(prefix: str, auto_run_slurm: bool = False) -> None:
 
     print_info(f"Tests information: {tests_info}")
 
-    top_layer_folders = os.listdir(tests_path)
+    l1 = re.sub(r"[^a-zA-Z0-9]", "", prefix)
+    l3 = "tests"
+
+    # (folder, testing folder, test cases) in the order they are reported
+    test_folders: list[tuple[str, str, list[ConfigTestCase]]] = []
 
-    for folder in top_layer_folders:
+    for folder in os.listdir(tests_path):
         testing_folder = tests_path + folder + "/"
 
         if not os.path.isdir(testing_folder):
             continue
 
-        amount_of_tests = len(
-            [
-                f for f in os.listdir(testing_folder) if f.endswith(".py")
-            ]  # Filter py files because of cache files
-        )
-        amount_of_failed_tests = 0
-        amount_of_passed_tests = 0
-        amount_of_skipped_tests = 0
-
-        l1 = re.sub(r"[^a-zA-Z0-9]", "", prefix)
-        l2 = folder
-        l3 = "tests"
-
-        print("==" * 50)
-
-        test_description = tests_info.get(l1, {}).get(l2, {}).get("description", None)
-
-        print(
-            f"{COLOR_MAP.YELLOW}Testing folder: {testing_folder} {test_description} {COLOR_MAP.RESET}"
-        )
-        no_info_tests = []
-
+        cases = []
         for tests in os.listdir(testing_folder):
+            # Filter py files because of cache files
             if not tests.endswith(".py"):
                 continue
 
-            test_path = testing_folder + tests
-            valid, error_reports = validate_slurmify_config(test_path)
-
-            tested_jobs: list[Job] = (
-                []
-            )  # List of jobs inside of the file reaired becquse it is possible to have multiple jobs in the same file
-
-            for report in error_reports:
-                if report.valid:
-                    tested_jobs.append(
-                        report.job
-                    )  # Add the validated Job to the list for generation
-                    continue
-
-                tested_jobs.append(report.job)
-
-            l4 = tests
-
             validation_information = (
-                tests_info.get(l1, {}).get(l2, {}).get(l3, {}).get(l4, None)
+                tests_info.get(l1, {}).get(folder, {}).get(l3, {}).get(tests, None)
             )
+            case = ConfigTestCase(folder=folder, file=tests, path=testing_folder + tests)
+
+            if validation_information is not None:
+                expected_result = validation_information.get("expected_result", None)
+
+                if expected_result == "valid":
+                    expected_result = True
+                elif expected_result == "invalid":
+                    expected_result = False
+
+                case.expected = expected_result
+                case.description = validation_information.get("description", None)
+
+            cases.append(case)
+
+        test_folders.append((folder, testing_folder, cases))
+
+    all_cases = [case for _, _, cases in test_folders for case in cases]
+
+    # Check once if Slurm is available using sinfo
+    slurm_available = False
+    if auto_run_slurm:
+        try:
+            subprocess.run(["sinfo"], capture_output=True, text=True)
+            slurm_available = True
+        except FileNotFoundError:
+            pass
+
+    tmp_test_path = os.path.join(current_dir, "tmpTest")
+    test_args = [
+        (
+            case.folder,
+            case.file,
+            case.path,
+            auto_run_slurm and case.expected is not None,
+            slurm_available,
+            tmp_test_path,
+        )
+        for case in all_cases
+    ]
 
-            if validation_information is None:
-                if not valid:
-                    no_info_tests.append(
-                        f"{COLOR_MAP.RED}Config File: {tests} is {valid} {COLOR_MAP.RESET}"
-                    )
-                else:
-                    no_info_tests.append(
-                        f"{COLOR_MAP.GREEN}Config File: {tests} is {valid} {COLOR_MAP.RESET}"
-                    )
-
-                amount_of_skipped_tests += 1
-                continue
-
-            expected_result = validation_information.get("expected_result", None)
-
-            if expected_result == "valid":
-                expected_result = True
-            elif expected_result == "invalid":
-                expected_result = False
-
-            message = ""
-
-            if valid != expected_result:
-                message = f"{COLOR_MAP.RED}[Test failed] {tests} {validation_information.get('description', None)} {COLOR_MAP.RESET}"
-                amount_of_failed_tests += 1
-            else:
-                message = f"{COLOR_MAP.GREEN}[Test passed] {tests} {validation_information.get('description', None)} {COLOR_MAP.RESET}"
-                amount_of_passed_tests += 1
-
-            if not auto_run_slurm or not valid:
-                print(message)
-                continue
+    jobs = jobs or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    executor = None
 
-            # Check if Slurm is available using sinfo
-            try:
-                result = subprocess.run(["sinfo"], capture_output=True, text=True)
-            except FileNotFoundError:
-                message += f"{COLOR_MAP.RED}| Slurm [UNAVAILABE]{COLOR_MAP.RESET}"
-                print(message)
-                print_error("Slurm is not available")
-                continue
+    if jobs > 1 and len(test_args) > 1:
+        from concurrent.futures import ProcessPoolExecutor
 
-            tmp_test_path = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)), "tmpTest"
+        executor = ProcessPoolExecutor(
+            max_workers=min(jobs, len(test_args)),
+            initializer=_init_test_worker,
+            initargs=(utils.printers.enable_print, utils.func.skip_modules),
+        )
+        # map hands results back in submission order, each as soon as it is ready
+        results = executor.map(run_test_config, *zip(*test_args))
+    else:
+        results = (run_test_config(*args) for args in test_args)
+
+    try:
+        for folder, testing_folder, cases in test_folders:
+            amount_of_tests = len(cases)
+            amount_of_failed_tests = 0
+            amount_of_passed_tests = 0
+            amount_of_skipped_tests = 0
+
+            print("==" * 50)
+
+            test_description = (
+                tests_info.get(l1, {}).get(folder, {}).get("description", None)
             )
 
-            # TODO: And need to remove the fila after the test
-            # Generate a TEMP SLURM script file to be executed by SLURM --test-onlyy
-            sbatch_paths = generate_slurm_script_from_config(
-                tested_jobs, valid=valid, output_path=tmp_test_path
+            print(
+                f"{COLOR_MAP.YELLOW}Testing folder: {testing_folder} {test_description} {COLOR_MAP.RESET}"
             )
+            no_info_tests = []
 
-            if sbatch_paths is None:
-                continue
+            for case in cases:
+                result: ConfigTestResult = next(results)
+                case.result = result
+                valid = result.valid
+                timing = f"({result.duration:.2f}s)"
 
-            for sbatch in sbatch_paths:
-                # Run the slurm script and check if it runs correctly
-                if sbatch.endswith(".sh"):
-                    output = subprocess.run(
-                        ["sbatch", "--test-only", sbatch],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
+                if result.error is not None:
+                    print(
+                        f"{COLOR_MAP.RED}[Test error] {case.file} {result.error} {timing} {COLOR_MAP.RESET}"
                     )
-
-                job_id = None
-
-                if output.stderr:
-                    print_error(f"output: {output.stderr.decode('utf-8')}")
-
-                    match = re.search(r"Job (\d+)", output.stderr.decode("utf-8"))
-
-                    if match:
-                        job_id = match.group(1)
-
-                if job_id is None:
-                    message += f"{COLOR_MAP.RED}| Slurm [FAILED] {COLOR_MAP.RESET}"
-                    print_error("Slurm script failed to run")
+                    case.passed = False
                     amount_of_failed_tests += 1
                     continue
 
-                message += f"{COLOR_MAP.GREEN}| Slurm [PASSED] {COLOR_MAP.RESET}"
-                print_success("Slurm script passed to run")
-
-            print(message)
+                if case.expected is None:
+                    if not valid:
+                        no_info_tests.append(
+                            f"{COLOR_MAP.RED}Config File: {case.file} is {valid} {timing} {COLOR_MAP.RESET}"
+                        )
+                    else:
+                        no_info_tests.append(
+                            f"{COLOR_MAP.GREEN}Config File: {case.file} is {valid} {timing} {COLOR_MAP.RESET}"
+                        )
+
+                    amount_of_skipped_tests += 1
+                    continue
 
-        print(f"{COLOR_MAP.YELLOW}Other Configs {COLOR_MAP.RESET}")
-        for no_info_test in no_info_tests:
-            print(no_info_test)
+                if valid != case.expected:
+                    message = f"{COLOR_MAP.RED}[Test failed] {case.file} {case.description} {timing} {COLOR_MAP.RESET}"
+                    case.passed = False
+                    amount_of_failed_tests += 1
+                else:
+                    message = f"{COLOR_MAP.GREEN}[Test passed] {case.file} {case.description} {timing} {COLOR_MAP.RESET}"
+                    case.passed = True
+                    amount_of_passed_tests += 1
+
+                amount_of_failed_tests += result.slurm_failures
+                print(message + result.slurm_message)
+
+            print(f"{COLOR_MAP.YELLOW}Other Configs {COLOR_MAP.RESET}")
+            for no_info_test in no_info_tests:
+                print(no_info_test)
+
+            print(" ")
+            print(
+                f"Total: {amount_of_tests}, Passed: {amount_of_passed_tests} ({(amount_of_passed_tests / amount_of_tests) * 100:.1f}%), "
+                f"Failed: {amount_of_failed_tests} ({(amount_of_failed_tests / amount_of_tests) * 100:.1f}%), "
+                f"Skipped: {amount_of_skipped_tests} ({(amount_of_skipped_tests / amount_of_tests) * 100:.1f}%) {COLOR_MAP.RESET}"
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    elapsed_time = time.perf_counter() - start_time
+    test_time = sum(case.result.duration for case in all_cases if case.result)
+    print(
+        f"Ran {len(all_cases)} configs in {elapsed_time:.2f}s "
+        f"({test_time:.2f}s of test time, {jobs} job{'s' if jobs > 1 else ''})"
+    )
 
-        print(" ")
-        print(
-            f"Total: {amount_of_tests}, Passed: {amount_of_passed_tests} ({(amount_of_passed_tests / amount_of_tests) * 100:.1f}%), "
-            f"Failed: {amount_of_failed_tests} ({(amount_of_failed_tests / amount_of_tests) * 100:.1f}%), "
-            f"Skipped: {amount_of_skipped_tests} ({(amount_of_skipped_tests / amount_of_tests) * 100:.1f}%) {COLOR_MAP.RESET}"
-        )
+    if junit_xml:
+        write_junit_xml(all_cases, junit_xml)
+        print(f"JUnit XML written to {junit_xml}")
 
 
 def generate_slurm_script_from_args(args: argparse.Namespace) -> None:
     """Generate a SLURM script based on command line arguments"""
+    from utils.config_info import Jobs
+    from utils.func import generate_slurm_script, start_validation
 
     partition = args.partition
     cores = args.cores
@@ -265,6 +414,7 @@ def generate_slurm_script_from_args(args: argparse.Namespace) -> None:
     gpu = args.gpu
     qos = args.qos
     time = args.time
+    array = args.array
     command = args.command
     logs_default = args.logs_default
     logs_error = args.logs_error
@@ -279,6 +429,7 @@ def generate_slurm_script_from_args(args: argparse.Namespace) -> None:
     print_info(f"GPUs: {gpu}")
     print_info(f"QOS: {qos}")
     print_info(f"Time: {time}")
+    print_info(f"Array: {array}")
     print_info(f"Command: {command}")
     print_info(f"Logs default: {logs_default}")
     print_info(f"Logs error: {logs_error}")
@@ -301,6 +452,7 @@ def generate_slurm_script_from_args(args: argparse.Namespace) -> None:
         module_names=modules,
         logs_default=logs_default,
         logs_error=logs_error,
+        array=array,
     )
     # Generate the SLURM script
     reports: list[SlurmifyValidationReport] = start_validation(jobs.get_jobs())
@@ -318,11 +470,36 @@ def generate_slurm_script_from_args(args: argparse.Namespace) -> None:
     pass
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
     # Add performance metrics time
     start_time = time.time()
+    if argv is None:
+        argv = sys.argv[1:]
     # Parse command line arguments
-    args = arg_handler()
+    args = arg_handler(argv)
+
+    if args.profile_startup:
+        from utils.startupProfile import profile_startup
+
+        sys.exit(profile_startup(os.path.abspath(__file__), argv))
+
+    if args.daemon:
+        from utils.validationDaemon import serve
+
+        try:
+            serve(main)
+        except RuntimeError as e:
+            print_error(str(e), debug=True)
+            sys.exit(1)
+        return
+
+    # Validation and generation go to the warm daemon if one is running
+    if (args.file or args.command) and not args.no_daemon:
+        from utils.validationDaemon import forward_to_daemon
+
+        exit_code = forward_to_daemon(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
 
     if args.verbose:
         enable_printing()
@@ -331,6 +508,8 @@ def main() -> None:
     if args.skip_module_check:
         # global skip_modules
         # skip_modules = True
+        from utils.func import set_skip_modules
+
         set_skip_modules(True)
 
     # Check if the user wants to generate a new configuration file
@@ -367,7 +546,12 @@ def main() -> None:
 
     if args.test:
 
-        testing_configs("TestConfigs/", auto_run_slurm=True)
+        testing_configs(
+            "TestConfigs/",
+            auto_run_slurm=True,
+            jobs=args.jobs,
+            junit_xml=args.junit_xml,
+        )
         end_time = time.time()
         elapsed_time = end_time - start_time
 
@@ -375,12 +559,18 @@ def main() -> None:
         return
 
     if args.file:
-        valid, error_reports = validate_slurmify_config(args.file)
+        from utils.func import generate_slurm_script
+        from utils.validationTrace import ValidationTrace
+
+        config_trace = ValidationTrace()
+        valid, error_reports = validate_slurmify_config(args.file, trace=config_trace)
 
         if not valid:
             print_error("SLURM configuration file is not valid")
             for report in error_reports:
                 print(report)
+            if args.trace:
+                write_validation_trace(args.trace, config_trace, error_reports)
             return
 
         validation_only = args.validation_only
@@ -396,12 +586,15 @@ def main() -> None:
 
                     # Generate the SLURM script
                     slurm = generate_slurm_script(
-                        report.job, create_file=True, output_path=out
+                        report.job, create_file=True, output_path=out, report=report
                     )
                     print_success(f"SLURM script generated: {slurm}")
 
             print(report)
 
+        if args.trace:
+            write_validation_trace(args.trace, config_trace, error_reports)
+
         end_time = time.time()
         elapsed_time = end_time - start_time
 
@@ -409,6 +602,8 @@ def main() -> None:
         return
 
     if args.web:
+        import subprocess
+
         print_info("Web mode enabled")
 
         streamlit_path = os.path.join(
@@ -419,6 +614,8 @@ def main() -> None:
         return
 
     if args.api:
+        import subprocess
+
         print_info("API mode enabled")
 
         api_path = os.path.join(
@@ -430,6 +627,8 @@ def main() -> None:
         return
 
     if args.module_search:
+        from utils.moduleListHandler import search_module
+
         modules = search_module(
             args.module_search,
         )
@@ -1,255 +1,468 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+import asyncio
 import sys
 import os
-import tempfile
+import uuid
+import time
 import logging
 import uvicorn
 
 
 from api.apiConfig import (
+    BatchRequest,
+    BatchValidationResponse,
     ConfigRequest,
     ValidationResponse,
     ValidationResult,
     ParameterRequest,
 )
-from utils.slurmifyLoader import load_python_conf_file
+from api.auditLog import AuditLogWriter
+from api.metrics import CONTENT_TYPE, MetricsRegistry
+from api.resultCache import ValidationCache
+from api.workerPool import PoolSaturatedError, ValidationWorkerPool
+from utils.sandboxPool import ConfigSandboxPool
 from utils.slurmifyValidationReport import SlurmifyValidationReport
-from utils.moduleListHandler import get_module_list
+from utils.moduleListHandler import get_module_list, module_list_cache_stats
+from utils.validationCheck import check_cache_stats
+from utils.printers import json_record
+from utils.system_config import get_system_config, system_config_cache_stats
+from utils.validationTrace import ValidationTrace
 
 # Add parent directory to path to import from project
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import project modules
+import utils.func
 from utils.config_info import Job, Jobs
 from utils.func import (
     generate_slurm_script,
-    get_slurmify_jobs,
     start_validation,
 )
 
-app = FastAPI(
-    title="SLURMify Validation API",
-    description="API for validating SLURM configurations",
+audit_log = AuditLogWriter(path="api/logs")
+
+# Identical config sources are answered from here without executing them again
+VALIDATION_CACHE_SIZE = 1024
+VALIDATION_CACHE_TTL = 600  # seconds
+validation_cache = ValidationCache(
+    max_size=VALIDATION_CACHE_SIZE, ttl=VALIDATION_CACHE_TTL
 )
 
 
-def create_tmp_file():
-    pass
+def warm_validation_caches():
+    """Load the system config and the module list (runs once per worker)"""
+    get_system_config()
+    get_module_list()
 
 
-def create_log_api(
-    tmp_name,
-    extension,
-    content,
-    report_name=None,
-    path="api/logs",
-):
-    print(f"Tmp_name: {tmp_name}")
-    print(f"Creating log file: {tmp_name}.{extension}")
-    print(f"Content: {content}")
-    print(f"Path: {path}")
+# User configs are executed in pre-forked processes with CPU, wall time and
+# memory limits. SLURMIFY_SANDBOX=0 executes them in the API process instead.
+config_sandbox = ConfigSandboxPool(
+    size=int(os.environ.get("SLURMIFY_WORKERS", 4)),
+    cpu_time=int(os.environ.get("SLURMIFY_SANDBOX_CPU_TIME", 10)),
+    wall_time=float(os.environ.get("SLURMIFY_SANDBOX_WALL_TIME", 15)),
+    memory=int(os.environ.get("SLURMIFY_SANDBOX_MEMORY_MB", 512)) * 1024 * 1024,
+    max_tasks=int(os.environ.get("SLURMIFY_SANDBOX_MAX_TASKS", 100)),
+    enabled=os.environ.get("SLURMIFY_SANDBOX", "1") != "0",
+    acquire_timeout=float(os.environ.get("SLURMIFY_SANDBOX_ACQUIRE_TIMEOUT", 60)),
+)
 
-    try:
-        path_to_save = f"{path}/{tmp_name}"
+# Blocking validation runs here, never on the asyncio loop.
+# SLURMIFY_WORKER_POOL selects "thread" or "process" workers. With process
+# workers the configs are still executed by the sandbox of the API process.
+worker_pool = ValidationWorkerPool(
+    max_workers=int(os.environ.get("SLURMIFY_WORKERS", 4)),
+    max_queue=int(os.environ.get("SLURMIFY_WORKER_QUEUE", 32)),
+    kind=os.environ.get("SLURMIFY_WORKER_POOL", "thread"),
+    retry_after=int(os.environ.get("SLURMIFY_RETRY_AFTER", 1)),
+    initializer=warm_validation_caches,
+)
 
-        os.makedirs(f"{path_to_save}", exist_ok=True)
 
-        if report_name:
-            file_path = f"{path_to_save}/{report_name}.{extension}"
-        else:
-            file_path = f"{path_to_save}/{tmp_name}.{extension}"
+# Scraped from /metrics. Counters live in the API process, with
+# SLURMIFY_WORKER_POOL=process the config and module list cache counters only
+# cover the lookups made by the API process itself.
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    "slurmify_http_requests_total",
+    "HTTP requests by route template, method and status code",
+    ("route", "method", "status"),
+)
+http_request_duration = metrics.histogram(
+    "slurmify_http_request_duration_seconds",
+    "Time to answer an HTTP request, by route template and method",
+    ("route", "method"),
+)
+validation_results = metrics.counter(
+    "slurmify_validation_results_total",
+    "Validated jobs by outcome (valid, invalid, critical) and source (config, parameters)",
+    ("outcome", "source"),
+)
 
-        with open(f"{ file_path }", "w") as f:
-            f.write(content)
-    except Exception as e:
-        logger.error(f"Failed to save temporary file: {str(e)}")
+
+@metrics.collector
+def collect_runtime_metrics():
+    cache_stats = {
+        "validation": validation_cache.stats(),
+        "system_config": system_config_cache_stats(),
+        "module_list": module_list_cache_stats(),
+        "job_check": check_cache_stats(),
+    }
+    yield (
+        "slurmify_cache_hits_total",
+        "counter",
+        "Lookups answered from a cache",
+        [({"cache": name}, stats["hits"]) for name, stats in cache_stats.items()],
+    )
+    yield (
+        "slurmify_cache_misses_total",
+        "counter",
+        "Lookups that had to compute or load the value",
+        [({"cache": name}, stats["misses"]) for name, stats in cache_stats.items()],
+    )
+    yield (
+        "slurmify_validation_cache_entries",
+        "gauge",
+        "Responses held in the validation cache",
+        [({}, len(validation_cache))],
+    )
+    yield (
+        "slurmify_worker_pool_queue_depth",
+        "gauge",
+        "Validation calls waiting for a worker",
+        [({}, worker_pool.queue_depth)],
+    )
+    yield (
+        "slurmify_worker_pool_in_flight",
+        "gauge",
+        "Validation calls running or waiting",
+        [({}, worker_pool.pending)],
+    )
+    yield (
+        "slurmify_worker_pool_capacity",
+        "gauge",
+        "Workers and queue slots of the validation pool",
+        [({"slot": "workers"}, worker_pool.max_workers), ({"slot": "queue"}, worker_pool.max_queue)],
+    )
+    yield (
+        "slurmify_worker_pool_rejected_total",
+        "counter",
+        "Validation calls rejected with 429 because the pool was saturated",
+        [({}, worker_pool.rejected)],
+    )
+    yield (
+        "slurmify_config_exec_timeouts_total",
+        "counter",
+        "Configs stopped by the sandbox wall time limit",
+        [({}, config_sandbox.timeouts)],
+    )
+    yield (
+        "slurmify_config_exec_terminations_total",
+        "counter",
+        "Sandbox workers that died while executing a config",
+        [({}, config_sandbox.terminations)],
+    )
+
+
+def record_validation_results(response: ValidationResponse, source: str) -> None:
+    """Count the outcome of every job of a response"""
+    for result in response.results:
+        if result.valid:
+            outcome = "valid"
+        elif result.critical:
+            outcome = "critical"
+        else:
+            outcome = "invalid"
+        validation_results.inc(outcome=outcome, source=source)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_validation_caches()
+    audit_log.start()
+    config_sandbox.start()
+    worker_pool.start()
+    yield
+    worker_pool.shutdown()
+    config_sandbox.shutdown()
+    # Flush the audit logs that are still queued
+    audit_log.close()
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per log line, the same shape as the print_* JSON output"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        extra = {}
+        if record.exc_info:
+            extra["exception"] = self.formatException(record.exc_info)
+        return json_record(
+            record.levelname.lower(), record.name, record.getMessage(), **extra
+        )
 
 
-# Configure logging
+# Configure logging, SLURMIFY_LOG_FORMAT=json switches to structured output
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+if os.environ.get("SLURMIFY_LOG_FORMAT") == "json":
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(JsonLogFormatter())
 logger = logging.getLogger(__name__)
 
+app = FastAPI(
+    title="SLURMify Validation API",
+    description="API for validating SLURM configurations",
+    lifespan=lifespan,
+)
+
 # Add parent directory to path to import from project
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-@app.post("/validate", response_model=ValidationResponse)
-async def validate_config(request: ConfigRequest):
-    """Validate a SLURM configuration"""
-    logger.debug("Starting validation request")
-    logger.debug(f"Received code of length: {len(request.code)}")
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The route template keeps the label set small, /module_search?search=x is /module_search
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_requests.inc(route=path, method=request.method, status=status)
+        http_request_duration.observe(
+            time.perf_counter() - start, route=path, method=request.method
+        )
 
-    logger.debug(f"Request code: {request.code}")
 
-    # Create a file to store the code
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False) as temp_file:
-        temp_file.write(request.code)
-        temp_file_path = temp_file.name
-        temp_file_name = os.path.basename(temp_file_path).replace(".py", "")
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    """Answer 429 when the validation workers and their queue are full"""
+    logger.warning("Validation worker pool saturated, rejecting request")
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Too many validation requests, retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
-    logger.debug(f"Temp file created: {temp_file_path}")
-    logger.debug(f"Temp file name: {temp_file_name}")
 
-    create_log_api(
-        tmp_name=temp_file_name, extension="py", content=request.code, path="api/logs"
+def validation_cache_versions() -> tuple:
+    """Versions of everything a validation result depends on besides the config source"""
+    return (
+        get_system_config().version,
+        get_module_list().version,
+        utils.func.skip_modules,
     )
 
-    response = ValidationResponse(valid=True, results=[])
 
-    try:
-        config_path = "systemConfig/conf.yaml"
-        path_of_python_file = temp_file_path
+def without_timings(response: ValidationResponse) -> ValidationResponse:
+    """Drop the stage timings from a response, they are only sent on request"""
+    response.timings = None
+    for result in response.results:
+        result.timings = None
+    return response
 
-        module, error_report = load_python_conf_file(path_of_python_file)
-        jobs: list[Job] = get_slurmify_jobs(module, error_report)
 
-        if not jobs:
-            print(error_report)
-            response.valid = False
+async def validate_config_code(
+    code: str, run=None, timings: bool = False
+) -> ValidationResponse:
+    """Validate the source code of a slurmify config, answering from the cache if possible
+
+    Args:
+        code (str): Python source of the slurmify configuration
+        run (callable, optional): Coroutine function used to run the blocking
+            validation, defaults to worker_pool.run
+        timings (bool): Keep the stage timings in the response. A cached
+            response carries the timings of the run that produced it.
+
+    Returns:
+        ValidationResponse: One result per job (or one for the loading error)
+    """
+    cache_key = validation_cache.make_key(code, *validation_cache_versions())
+
+    cached = validation_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Validation cache hit")
+        response = ValidationResponse.model_validate_json(cached)
+        record_validation_results(response, "config")
+        return response if timings else without_timings(response)
+
+    if run is None:
+        run = worker_pool.run
+
+    # The audit log is written in the background, never on the request path
+    log_id = uuid.uuid4().hex
+    audit_log.submit(log_id=log_id, extension="py", content=code)
+
+    if worker_pool.kind == "process" and config_sandbox.enabled:
+        # The sandbox only runs in the API process, a forked executor process
+        # gets the jobs the sandbox sent back instead of executing the config
+        loaded = await asyncio.to_thread(load_config_sandboxed, code, log_id)
+        response, report_name = await run(run_config_validation, code, log_id, loaded)
+    else:
+        response, report_name = await run(run_config_validation, code, log_id)
+
+    if report_name is not None:
+        audit_log.submit(
+            log_id=log_id,
+            report_name=report_name,
+            extension="md",
+            content=response.results[0].result,
+        )
 
-            response.results.append(
-                ValidationResult(
-                    job_name=error_report.job_name,
-                    valid=False,
-                    result=error_report.for_llm_json_safe(),
-                )
-            )
+    validation_cache.put(cache_key, response.model_dump_json())
+    record_validation_results(response, "config")
 
-            create_log_api(
-                tmp_name=temp_file_name,
-                report_name=error_report.job_name,
-                extension="md",
-                content=error_report.for_llm_json_safe(),
-                path="api/logs",
-            )
+    return response if timings else without_timings(response)
 
-            return response
 
-        list_of_reports = start_validation(jobs)
+def load_config_sandboxed(
+    code: str, log_id: str
+) -> tuple[list[Job] | None, SlurmifyValidationReport | None, ValidationTrace]:
+    """Execute a config in the sandbox and return its jobs with the load timing
 
-        if not list_of_reports:
-            response.valid = True
-            response.results.append(
-                ValidationResult(
-                    job_name="Job Is Valid",
-                    valid=True,
-                    result="No validation reports generated.",
-                )
-            )
-            return response
+    Returns:
+        tuple: (list of jobs or None, report if loading failed, trace of the load)
+    """
+    config_trace = ValidationTrace()
 
-        for list_of_report in list_of_reports:
-            if not list_of_report.valid:
-                response.valid = False
-                response.results.append(
-                    ValidationResult(
-                        job_name=list_of_report.job_name,
-                        valid=False,
-                        result=list_of_report.for_llm_json_safe(),
-                    )
-                )
-            else:
-                response.results.append(
-                    ValidationResult(
-                        job_name=list_of_report.job_name,
-                        valid=True,
-                        result=list_of_report.for_llm_json_safe(),
-                    )
-                )
+    # The config is untrusted code, it is executed in a sandboxed worker process
+    with config_trace.span("load"):
+        jobs, error_report = config_sandbox.load_jobs(code, filename=f"<{log_id}>")
 
-        create_log_api(
-            tmp_name=temp_file_name,
-            report_name="validation_report",
-            extension="md",
-            content=response.results[0].result,
-            path="api/logs",
-        )
+    return jobs, error_report, config_trace
 
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                logger.debug(f"Removed temporary file: {temp_file_path}")
-            except Exception as e:
-                logger.error(f"Failed to remove temporary file: {str(e)}")
 
-    logger.debug(response.results)
+def run_config_validation(
+    code: str, log_id: str, loaded: tuple | None = None
+) -> tuple[ValidationResponse, str | None]:
+    """Validate the source code of a slurmify config and build the API response
 
-    return response
+    This is the blocking part of /validate, it runs inside the worker pool.
 
+    Args:
+        code (str): Python source of the slurmify configuration
+        log_id (str): Id of the request, used as file name in error messages
+        loaded (tuple, optional): Result of load_config_sandboxed when the
+            config was already loaded (process workers), loaded here otherwise
 
-@app.post("/GenerateConfigParameters", response_model=ValidationResponse)
-async def generate_config_parameters(request: ParameterRequest):
-    try:
-        print(f"Request: {request}")
-        print(f"Request exec_command: {request.exec_command}")
+    Returns:
+        tuple: (response with one result per job or one for the loading error,
+            name of the audit report or None if there is nothing to log)
+    """
+    response = ValidationResponse(valid=True, results=[])
 
-        return ValidationResponse(
-            valid=True,
-            results=[
+    if loaded is None:
+        loaded = load_config_sandboxed(code, log_id)
+    jobs, error_report, config_trace = loaded
+
+    response.timings = config_trace.to_list()
+
+    if not jobs:
+        print(error_report)
+        response.valid = False
+
+        response.results.append(
+            ValidationResult(
+                job_name=error_report.job_name,
+                valid=False,
+                result=error_report.for_llm_json_safe(),
+                critical=error_report.has_critical_errors(),
+                timings=error_report.get_timings(),
+            )
+        )
+
+        return response, error_report.job_name
+
+    list_of_reports = start_validation(jobs)
+
+    if not list_of_reports:
+        response.valid = True
+        response.results.append(
+            ValidationResult(
+                job_name="Job Is Valid",
+                valid=True,
+                result="No validation reports generated.",
+            )
+        )
+        return response, None
+
+    for list_of_report in list_of_reports:
+        if not list_of_report.valid:
+            response.valid = False
+            response.results.append(
                 ValidationResult(
-                    job_name=request.name,
+                    job_name=list_of_report.job_name,
+                    valid=False,
+                    result=list_of_report.for_llm_json_safe(),
+                    critical=list_of_report.has_critical_errors(),
+                    timings=list_of_report.get_timings(),
+                )
+            )
+        else:
+            response.results.append(
+                ValidationResult(
+                    job_name=list_of_report.job_name,
                     valid=True,
-                    result=f"Configuration parameters generated for job: {request.name}",
+                    result=list_of_report.for_llm_json_safe(),
+                    critical=list_of_report.has_critical_errors(),
+                    timings=list_of_report.get_timings(),
                 )
-            ],
-        )
+            )
 
-    except Exception as e:
-        logger.error(f"Error in generate_config_parameters: {str(e)}")
-        return {"error": "Failed to generate configuration parameters"}
+    logger.debug(response.results)
 
+    return response, "validation_report"
 
-@app.get("/GenerateConfigParameters", response_model=ValidationResponse)
-async def generate_config_parameters(
-    name: str,
-    account: str,
-    exec_command: str,
-    cores: int = 1,
-    gpu: int | None = None,
-    mode: str = "default",
-    nodes: int | None = None,
-    time: str = "00:15:00",
-    ntasks: int = 1,
-    partition: str = "cpu",
-    environment_commands: str | None = None,
-    module_names: str | None = None,
-    logs_default: str | None = None,
-    logs_error: str | None = None,
-):
+
+def validate_parameter_request(request: ParameterRequest) -> ValidationResponse:
+    """Build a job from parameters, validate it and generate its SLURM script
+
+    Args:
+        request (ParameterRequest): Parameters of the job
+
+    Returns:
+        ValidationResponse: The validation report or the generated script
+    """
     try:
         print(
-            f"Request parameters - name: {name}, account: {account}, exec_command: {exec_command}, partition: {partition}, time: {time}, logs_default: {logs_default}, logs_error: {logs_error}"
+            f"Request parameters - name: {request.name}, account: {request.account}, exec_command: {request.exec_command}, partition: {request.partition}, time: {request.time}, logs_default: {request.logs_default}, logs_error: {request.logs_error}"
         )
         print(
-            f"Other parameters - cores: {cores}, gpu: {gpu}, mode: {mode}, nodes: {nodes}, ntasks: {ntasks}"
+            f"Other parameters - cores: {request.cores}, gpu: {request.gpu}, mode: {request.mode}, nodes: {request.nodes}, ntasks: {request.ntasks}"
         )
 
-        print(f"Module names: {module_names}")
+        print(f"Module names: {request.module_names}")
+
+        exec_command = request.exec_command
+        if isinstance(exec_command, str):
+            exec_command = [exec_command]
 
         jobs_instance = Jobs()
         jobs_instance.clear_jobs()
 
         jobs_instance.generate_job_based_on_params(
-            name=name,
-            account=account,
-            exec_command=[exec_command],
-            cores=cores,
-            gpu=gpu,
-            mode=mode,
-            nodes=nodes,
-            time=time,
-            ntasks=ntasks,
-            partition=partition,
-            environment_commands=(
-                environment_commands.split(",") if environment_commands else None
-            ),
-            module_names=module_names.split(",") if module_names else None,
-            logs_default=logs_default,
-            logs_error=logs_error,
+            name=request.name,
+            account=request.account,
+            exec_command=exec_command,
+            cores=request.cores,
+            gpu=request.gpu,
+            mode=request.mode,
+            nodes=request.nodes,
+            time=request.time,
+            ntasks=request.ntasks,
+            partition=request.partition,
+            environment_commands=request.environment_commands,
+            module_names=request.module_names,
+            logs_default=request.logs_default,
+            logs_error=request.logs_error,
+            array=request.array,
         )
 
         reports: list[SlurmifyValidationReport] = start_validation(
@@ -272,6 +485,8 @@ async def generate_config_parameters(
                             job_name=report.job_name,
                             valid=False,
                             result=report.for_llm_json_safe(),
+                            critical=report.has_critical_errors(),
+                            timings=report.get_timings(),
                         )
                     ],
                 )
@@ -290,16 +505,18 @@ async def generate_config_parameters(
                 ],
             )
 
-        slurm = generate_slurm_script(job, create_file=False)
+        slurm = generate_slurm_script(job, create_file=False, report=report)
 
         return ValidationResponse(
             valid=True,
             results=[
                 ValidationResult(
-                    job_name=name,
+                    job_name=request.name,
                     valid=True,
                     result=f"{slurm}",
                     report=report.for_llm_json_safe(),
+                    critical=False,
+                    timings=report.get_timings(),
                 )
             ],
         )
@@ -318,6 +535,123 @@ async def generate_config_parameters(
         )
 
 
+@app.post("/validate", response_model=ValidationResponse)
+async def validate_config(request: ConfigRequest, timings: bool = False):
+    """Validate a SLURM configuration
+
+    `?timings=true` adds the duration of every validation stage to the response.
+    """
+    logger.debug("Starting validation request")
+    logger.debug(f"Received code of length: {len(request.code)}")
+
+    logger.debug(f"Request code: {request.code}")
+
+    return await validate_config_code(request.code, timings=timings)
+
+
+@app.post("/validate/batch", response_model=BatchValidationResponse)
+async def validate_batch(request: BatchRequest, timings: bool = False):
+    """Validate several SLURM configurations and/or parameter sets in one call
+
+    The items share the loaded system config and module list and are validated
+    concurrently in the worker pool. Responses keep the order of the request
+    (configs first, then parameters). `?timings=true` keeps the stage timings.
+    """
+    logger.debug(
+        f"Starting batch validation: {len(request.configs)} configs, {len(request.parameters)} parameter sets"
+    )
+
+    async with worker_pool.batch() as run:
+        tasks = [
+            validate_config_code(config.code, run=run, timings=timings)
+            for config in request.configs
+        ]
+        tasks += [
+            run(validate_parameter_request, parameters)
+            for parameters in request.parameters
+        ]
+
+        responses: list[ValidationResponse] = await asyncio.gather(*tasks)
+
+    for response in responses[len(request.configs) :]:
+        record_validation_results(response, "parameters")
+
+    if not timings:
+        responses = [without_timings(response) for response in responses]
+
+    return BatchValidationResponse(
+        valid=all(response.valid for response in responses),
+        responses=responses,
+    )
+
+
+@app.post("/GenerateConfigParameters", response_model=ValidationResponse)
+async def generate_config_parameters(request: ParameterRequest):
+    try:
+        print(f"Request: {request}")
+        print(f"Request exec_command: {request.exec_command}")
+
+        return ValidationResponse(
+            valid=True,
+            results=[
+                ValidationResult(
+                    job_name=request.name,
+                    valid=True,
+                    result=f"Configuration parameters generated for job: {request.name}",
+                )
+            ],
+        )
+
+    except Exception as e:
+        logger.error(f"Error in generate_config_parameters: {str(e)}")
+        return {"error": "Failed to generate configuration parameters"}
+
+
+@app.get("/GenerateConfigParameters", response_model=ValidationResponse)
+async def generate_config_parameters(
+    name: str,
+    account: str,
+    exec_command: str,
+    cores: int = 1,
+    gpu: int | None = None,
+    mode: str = "default",
+    nodes: int | None = None,
+    time: str = "00:15:00",
+    ntasks: int = 1,
+    partition: str = "cpu",
+    environment_commands: str | None = None,
+    module_names: str | None = None,
+    logs_default: str | None = None,
+    logs_error: str | None = None,
+    array: str | None = None,
+    timings: bool = False,
+):
+    request = ParameterRequest(
+        name=name,
+        account=account,
+        exec_command=[exec_command],
+        cores=cores,
+        gpu=gpu,
+        mode=mode,
+        nodes=nodes,
+        time=time,
+        ntasks=ntasks,
+        partition=partition,
+        environment_commands=(
+            environment_commands.split(",") if environment_commands else None
+        ),
+        module_names=module_names.split(",") if module_names else None,
+        logs_default=logs_default,
+        logs_error=logs_error,
+        array=array,
+    )
+
+    response = await worker_pool.run(validate_parameter_request, request)
+    record_validation_results(response, "parameters")
+
+    return response if timings else without_timings(response)
+
+
 @app.get("/template")
 async def get_template():
     """Get a template for SLURM configuration"""
@@ -343,6 +677,18 @@ async def get_modules_and_versions(search: str):
         return {"error": "Failed to search modules"}
 
 
+@app.get("/cache_stats")
+async def get_cache_stats():
+    """Hit/miss counters and size of the validation result cache"""
+    return {"validation_cache": validation_cache.stats()}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Request, validation, cache, worker pool and sandbox metrics in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
 # API call to test if the API is running
 @app.get("/testAPI")
 async def test_api():
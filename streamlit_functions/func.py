@@ -2,7 +2,8 @@ import json
 import requests
 import streamlit as st
 from utils.config_info import Job, Jobs
-from utils.func import generate_slurm_script, start_validation
+from utils.func import generate_slurm_script
+from utils.incrementalValidation import IncrementalValidator
 from utils.slurmifyValidationReport import SlurmifyValidationReport
 
 
@@ -62,16 +63,16 @@ def get_slurm(layout):
         gpu=st.session_state.selected_gpus,
     )
 
-    reports: list[SlurmifyValidationReport] = start_validation(jobs_instance.get_jobs())
-
-    if len(reports) > 0:
-        report: SlurmifyValidationReport = reports[
-            0
-        ]  # there will always only be one for now
+    # The form changes one widget per rerun, only the validators that read the
+    # changed fields run again
+    report: SlurmifyValidationReport
+    valid, report = st.session_state.job_validator.validate(
+        jobs_instance.get_jobs()[0]  # there will always only be one for now
+    )
 
-        if not report.valid:
-            layout.error("Job is not valid")
-            layout.write(report.for_llm())
+    if not report.valid:
+        layout.error("Job is not valid")
+        layout.write(report.for_llm())
 
     for job_instance in jobs_instance.get_jobs():
         print(job_instance.name)
@@ -85,6 +86,8 @@ def get_slurm(layout):
 
 def init_states():
     # Initialize states
+    if "job_validator" not in st.session_state:
+        st.session_state.job_validator = IncrementalValidator()
     if "job_name" not in st.session_state:
         st.session_state.job_name = "main_job"
     if "selected_partion" not in st.session_state:
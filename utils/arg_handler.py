@@ -1,8 +1,37 @@
 import argparse
-from utils.config_getters import get_valid_modes, get_valid_partitions
 
 
-def arg_handler():
+class LazyChoices:
+    """
+    argparse choices that are only read from conf.yaml when argparse needs them.
+
+    argparse only checks the choices when the option is used (or prints them in
+    the help), so commands like --init never load the system config.
+    """
+
+    def __init__(self, getter_name: str):
+        self.getter_name = getter_name
+        self._choices: list[str] | None = None
+
+    def _load(self) -> list[str]:
+        if self._choices is None:
+            from utils import config_getters
+
+            # The getters read the process-wide cached SystemConfig
+            self._choices = getattr(config_getters, self.getter_name)()
+        return self._choices
+
+    def __contains__(self, item) -> bool:
+        return item in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+def arg_handler(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="SLURMify - Generate SLURM scripts from Python configurations"
     )
@@ -30,6 +59,20 @@ def arg_handler():
         action="store_true",
         help="Run in testing mode",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for --test (0 uses one per CPU)",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--junit-xml",
+        type=str,
+        help="Write the --test results to this file as JUnit XML",
+        metavar="PATH",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -71,12 +114,36 @@ def arg_handler():
         help="Output file path for the generated SLURM script",
     )
 
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="PATH",
+        help="Write the timing of every validation stage of -f as Chrome trace JSON (chrome://tracing, Perfetto)",
+    )
+
     parser.add_argument(
         "--skip-module-check",
         action="store_true",
         help="Skip the module check when generating the SLURM script",
     )
 
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep a warm validator running on a Unix socket, -f and generate use it when it runs",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if a daemon is running",
+    )
+
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print how long the imports of the CLI take",
+    )
+
     # Create a 'generate' subparser for generating SLURM scripts
     generate_parser = subparsers.add_parser(
         "generate", help="Generate a SLURM script with specified parameters"
@@ -95,8 +162,10 @@ def arg_handler():
         "--partition",
         type=str,
         default="cpu",
-        choices=get_valid_partitions(),
-        help="SLURM partition to use",
+        choices=LazyChoices("get_valid_partitions"),
+        # With a metavar argparse does not read the choices when building the parser
+        metavar="PARTITION",
+        help="SLURM partition to use (%(choices)s)",
     )
     generate_parser.add_argument("--cores", type=int, default=1, help="CPUs per task")
     generate_parser.add_argument("--nodes", type=int, default=1, help="Number of nodes")
@@ -108,12 +177,19 @@ def arg_handler():
         "--qos",
         type=str,
         default="default",
-        choices=get_valid_modes(),
-        help="Quality of service mode",
+        choices=LazyChoices("get_valid_modes"),
+        metavar="QOS",
+        help="Quality of service mode (%(choices)s)",
     )
     generate_parser.add_argument(
         "--time", type=str, default="00:15:00", help="Maximum runtime (HH:MM:SS)"
     )
+    generate_parser.add_argument(
+        "--array",
+        type=str,
+        default=None,
+        help="Job array indices, e.g. 0-99:2%%10 (step 2, 10 tasks at once)",
+    )
 
     # Job execution parameters
     generate_parser.add_argument(
@@ -149,4 +225,4 @@ def arg_handler():
         "--output", type=str, help="Output file path (default: ./out/<job_name>.sh)"
     )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
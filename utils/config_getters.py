@@ -1,8 +1,10 @@
-import os
+from collections.abc import Mapping
+
 import yaml
 from utils.config_info import Job
 from utils.printers import print_debug
 from utils.slurmifyValidationReport import SlurmifyValidationReport
+from utils.system_config import PartitionLimits, get_system_config
 
 
 # TODO: Extract most of the config things maybe create a class to handle the config which will make it simpler
@@ -15,6 +17,10 @@ def load_config(config_path=None) -> dict:
     """
     Load the configuration file.
 
+    The file is parsed once per process and only re-parsed when it changes on
+    disk (see utils.system_config). The returned mapping is shared between all
+    callers and is read-only.
+
     Args:
         config_path (str, optional): Path to the configuration file.
             If None, uses the default config path.
@@ -22,17 +28,11 @@ def load_config(config_path=None) -> dict:
     Returns:
         dict: The loaded configuration
     """
-    if config_path is None:
-        # Default to the generator config
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config_path = os.path.join(current_dir, "systemConfig", "conf.yaml")
-
-    with open(config_path, "r") as stream:
-        try:
-            return yaml.safe_load(stream)
-        except yaml.YAMLError as exc:
-            print(f"Error loading config: {exc}")
-            return None
+    try:
+        return get_system_config(config_path).raw
+    except yaml.YAMLError as exc:
+        print(f"Error loading config: {exc}")
+        return None
 
 
 def get_valid_partitions(config=None) -> list[str]:
@@ -40,14 +40,14 @@ def get_valid_partitions(config=None) -> list[str]:
     if config is None:
         config: dict = load_config()
 
-    return config["constraints"]["partitions"]
+    return list(config["constraints"]["partitions"])
 
 
 def get_valid_modes(config=None) -> list[str]:
     """Get list of valid QoS modes from config."""
     if config is None:
         config: dict = load_config()
-    return config["constraints"]["modes"]
+    return list(config["constraints"]["modes"])
 
 
 def get_partition_system_constraints(partition, config=None) -> dict | None:
@@ -137,7 +137,7 @@ def is_gpu_partition(partition, config=None) -> bool:
         return False
 
     if "gpus_per_node" not in partition_details:
-        print_debug(f"Partition {partition} does not have GPU details")
+        print_debug("Partition %s does not have GPU details", partition)
         return False
 
     return "gpus_per_node" in partition_details
@@ -153,6 +153,49 @@ def get_max_time_for_mode(mode, config=None) -> dict | None:
     return None
 
 
+def get_array_limits(mode, config=None) -> tuple[int | None, int | None]:
+    """
+    Get the job array limits for a QoS mode.
+
+    Args:
+        mode (str): QoS mode
+        config (dict, optional): Config dict
+
+    Returns:
+        tuple: (max_array_size, max_jobs_per_user), None when conf.yaml sets no limit
+    """
+    if config is None:
+        config: dict = load_config()
+
+    array_constraints = config["constraints"].get("array") or {}
+    max_jobs_per_user = array_constraints.get("max_jobs_per_user") or {}
+
+    return array_constraints.get("max_array_size"), max_jobs_per_user.get(mode)
+
+
+def get_partition_limits(partition, mode, config=None) -> PartitionLimits | None:
+    """
+    Get the precomputed limits for a partition and QoS mode.
+
+    Args:
+        partition (str): Partition name
+        mode (str): QoS mode
+        config (dict, optional): Config dict, used if it carries a "constraint_table"
+
+    Returns:
+        PartitionLimits: Limits or None if the pair is unknown or config has no table
+    """
+    if config is None:
+        table = get_system_config().constraint_table
+    else:
+        table = config.get("constraint_table")
+
+    if table is None:
+        return None
+
+    return table.get(partition, mode)
+
+
 def calculate_max_nodes(mode, partition, config=None) -> int:
     """
     Calculate maximum nodes allowed for a mode and partition.
@@ -233,7 +276,7 @@ def get_slurm_translation(attribute, config=None):
 
     # Check for nested attributes (like logs.default)
     for key, value in slurm_info.items():
-        if isinstance(value, dict) and attribute in value:
+        if isinstance(value, Mapping) and attribute in value:
             return value[attribute]
 
     return None
@@ -284,6 +327,7 @@ def calculate_max_cpus(
     ntasks=None,
     config=None,
     report: SlurmifyValidationReport = None,
+    limits: PartitionLimits | None = None,
 ):
     """
     Calculate maximum CPUs allowed for a given node count.
@@ -292,6 +336,7 @@ def calculate_max_cpus(
         cpus_per_node (int): CPUs per nodey
         nodes (int): Number of nodes
         config (dict, optional): Config dict
+        limits (PartitionLimits, optional): Precomputed limits of the partition
 
     Returns:
         int: Maximum allowed CPUs
@@ -303,14 +348,17 @@ def calculate_max_cpus(
         ntasks = 1  # Minimum Task
 
     if not is_valid_partition(partition, config):
-        print_debug(f"Invalid partition: {partition}")
+        print_debug("Invalid partition: %s", partition)
         return None
 
-    total_cpus = get_max_cpus_partition(partition, nodes, config)
+    if limits is not None:
+        total_cpus = limits.cores_per_node * (nodes if nodes is not None else 1)
+    else:
+        total_cpus = get_max_cpus_partition(partition, nodes, config)
     requested_cpus: int = cpus_per_tasks * ntasks
 
-    print_debug(f"Requested cpus: {requested_cpus}")
-    print_debug(f"Total cpus: {total_cpus}")
+    print_debug("Requested cpus: %s", requested_cpus)
+    print_debug("Total cpus: %s", total_cpus)
 
     if total_cpus is None:
         print_debug("There was a problem with the system constraints")
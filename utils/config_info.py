@@ -2,6 +2,104 @@
 ## https://docs.lxp.lu/first-steps/handling_jobs/#__tabbed_1_1
 ## there are also usfull slurm error messages at the bottom of the page
 
+import threading
+import weakref
+
+
+# Attribute values that are already hashable and immutable
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _freeze(value):
+    """Hashable form of an attribute value, used for equality and interning"""
+    if value.__class__ in _SCALAR_TYPES:
+        return value
+    if isinstance(value, _Model):
+        if value._frozen_key is not None:
+            return value._frozen_key
+        return (value.__class__.__name__, value._key())
+    if isinstance(value, (list, tuple)):
+        return tuple([_freeze(item) for item in value])
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class _Model:
+    """Base of the config classes: slotted and compared by value
+
+    The validators fix jobs in place, so the objects are mutable and not
+    hashable, like a list. intern() shares equal objects between jobs and
+    makes them read-only (and hashable): changing an interned object raises
+    AttributeError, change a copy.copy() of it instead. Copies are mutable.
+    """
+
+    # _frozen_key is (class name, values) once the object is interned
+    __slots__ = ("_frozen_key", "__weakref__")
+    # Attributes in the order they are set, replaces vars() for slotted objects
+    _fields: tuple[str, ...] = ()
+
+    def __new__(cls, *args, **kwargs):
+        obj = super().__new__(cls)
+        object.__setattr__(obj, "_frozen_key", None)
+        return obj
+
+    @property
+    def interned(self) -> bool:
+        return self._frozen_key is not None
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def _key(self) -> tuple:
+        return tuple([_freeze(getattr(self, name)) for name in self._fields])
+
+    def _check_mutable(self, name: str) -> None:
+        if self._frozen_key is not None:
+            raise AttributeError(
+                f"Cannot change {name} of an interned {self.__class__.__name__}, "
+                "change a copy.copy() of it"
+            )
+
+    def __setattr__(self, name: str, value) -> None:
+        self._check_mutable(name)
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        self._check_mutable(name)
+        object.__delattr__(self, name)
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self._frozen_key is not None and other._frozen_key is not None:
+            return self._frozen_key == other._frozen_key
+        # Field by field, interned sub-objects are equal by identity
+        for name in self._fields:
+            value, other_value = getattr(self, name), getattr(other, name)
+            if value is not other_value and value != other_value:
+                return False
+        return True
+
+    def __hash__(self) -> int:
+        # A value hash of a mutable object would change when a validator fixes it
+        if self._frozen_key is None:
+            raise TypeError(
+                f"unhashable type: '{self.__class__.__name__}' (intern() it first)"
+            )
+        return hash(self._frozen_key)
+
+    # copy, deepcopy and pickle go through the state, the result is not interned
+    def __getstate__(self) -> dict:
+        return self.to_dict()
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+
 """
 This class is used for the configuration of the environment that will be used in the job.
 The commands will not be validated in this class shell commands are expected.
@@ -38,7 +136,9 @@ Maybe using a mockup of the slurm server with docker with the actual hpc server
 """
 
 
-class Environment:
+class Environment(_Model):
+    __slots__ = _fields = ("name", "commands")
+
     def __init__(self, name: str, commands: list[str]):
         self.name: str = name
         self.commands: list[str] = commands
@@ -47,7 +147,20 @@ class Environment:
         return f"{self.name}: {self.commands}"
 
 
-class Resources:
+class Resources(_Model):
+    # Same order as the #SBATCH lines of the generated script
+    __slots__ = _fields = (
+        "cores",
+        "gpu",
+        "mode",
+        "nodes",
+        "time",
+        "account",
+        "partitions",
+        "ntasks",
+        "array",
+    )
+
     def __init__(
         self,
         account: str,
@@ -58,6 +171,7 @@ class Resources:
         nodes: int | None = None,
         time: str = "00:15:00",
         ntasks: int = 1,
+        array: str | None = None,  # "0-99%10", see utils.jobArray
     ) -> None:
 
         self.cores: int | None = cores
@@ -68,12 +182,15 @@ class Resources:
         self.account: str = account
         self.partitions: str = partitions
         self.ntasks: int = ntasks
+        self.array: str | None = array
 
     def __str__(self) -> str:
         return f"{self.cores}, {self.gpu}, {self.mode}, {self.nodes}, {self.time}, {self.account}, {self.partitions}, {self.ntasks}"
 
 
-class Logs:
+class Logs(_Model):
+    __slots__ = _fields = ("default", "error")
+
     def __init__(self, default: str, error: str):
         self.default: str = default
         self.error: str = error
@@ -82,7 +199,9 @@ class Logs:
         return f"{self.default}, {self.error}"
 
 
-class Module:
+class Module(_Model):
+    __slots__ = _fields = ("name",)
+
     def __init__(self, name: str):
         self.name: str = name
 
@@ -90,11 +209,17 @@ class Module:
         return f"{self.name}"
 
 
-class Modules:
-    def __init__(self, list_of_modules: list[Module] = []):
-        self.modules: list[Module] = list_of_modules
+class Modules(_Model):
+    __slots__ = _fields = ("modules",)
+
+    def __init__(self, list_of_modules: list[Module] | None = None):
+        # A new list per instance, add_module must not change other Modules
+        self.modules: list[Module] = (
+            list_of_modules if list_of_modules is not None else []
+        )
 
     def add_module(self, module: Module):
+        self._check_mutable("modules")
         self.modules.append(module)
 
     def get_modules(self) -> list[Module]:
@@ -104,7 +229,9 @@ class Modules:
         return f"{self.modules}"
 
 
-class System:
+class System(_Model):
+    __slots__ = _fields = ("name", "resources")
+
     def __init__(self, resources: Resources, name: str = None):
         self.name: str = name
         self.resources: Resources = resources
@@ -119,7 +246,15 @@ class System:
 """
 
 
-class Job:
+class Job(_Model):
+    __slots__ = _fields = (
+        "name",
+        "environments",
+        "system",
+        "logs",
+        "modules",
+        "exec_command",
+    )
 
     def __init__(
         self,
@@ -141,6 +276,60 @@ class Job:
         return f"{self.name}, {self.environments}, {self.system} {self.logs}, {self.modules}, {self.exec_command}"
 
 
+# (class name, value key) -> the shared object, dropped when nothing uses it
+_INTERNED: "weakref.WeakValueDictionary[tuple, _Model]" = weakref.WeakValueDictionary()
+_INTERN_LOCK = threading.Lock()
+
+
+def intern(obj: _Model) -> _Model:
+    """The shared, read-only object equal to obj, obj itself if it is the first
+
+    The sub-objects of a Job, System or Modules are interned as well, so the
+    equal Resources, Logs, Modules and Environments of many jobs are one
+    object. A Job is returned as it is (with shared sub-objects) and stays
+    mutable, its name makes it unique anyway.
+
+    The validators fix values in place and cannot change interned objects,
+    intern jobs after they are validated.
+    """
+    if obj._frozen_key is not None:
+        return obj
+
+    if isinstance(obj, Job):
+        obj.system = intern(obj.system)
+        if obj.logs is not None:
+            obj.logs = intern(obj.logs)
+        if obj.modules is not None:
+            obj.modules = intern(obj.modules)
+        if obj.environments is not None:
+            obj.environments = [intern(env) for env in obj.environments]
+        return obj
+
+    if isinstance(obj, System):
+        obj.resources = intern(obj.resources)
+    elif isinstance(obj, Modules):
+        obj.modules = [intern(module) for module in obj.modules]
+
+    key = (obj.__class__.__name__, obj._key())
+    with _INTERN_LOCK:
+        shared = _INTERNED.get(key)
+        if shared is None:
+            object.__setattr__(obj, "_frozen_key", key)
+            _INTERNED[key] = shared = obj
+    return shared
+
+
+def intern_jobs(jobs: list[Job]) -> list[Job]:
+    """The jobs with their equal sub-objects shared, see intern"""
+    return [intern(job) for job in jobs]
+
+
+def clear_interned() -> None:
+    """Forget the shared objects, they stay valid (and read-only)"""
+    with _INTERN_LOCK:
+        _INTERNED.clear()
+
+
 class Jobs:
     def __init__(self, jobs=None):
         if jobs is None:
@@ -174,6 +363,7 @@ class Jobs:
         module_names: list[str] | None = None,
         logs_default: str | None = None,
         logs_error: str | None = None,
+        array: str | None = None,
     ) -> Job:
         """
         Generate a job based on the provided parameters.
@@ -193,6 +383,7 @@ class Jobs:
             module_names: List of module names to load (default: None)
             logs_default: Path for stdout logs (default: None)
             logs_error: Path for stderr logs (default: None)
+            array: Job array like "0-99%10" (default: None)
 
         Returns:
             Job: The generated job instance
@@ -207,6 +398,7 @@ class Jobs:
             nodes=nodes,
             time=time,
             ntasks=ntasks,
+            array=array,
         )
 
         system = System(resources=resources, name=None)  # Name is optional
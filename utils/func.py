@@ -1,17 +1,32 @@
 from utils.config_getters import load_config
 from utils.config_info import Job, Jobs
-from utils.moduleListHandler import get_module_list
+from utils.moduleListHandler import search_module
 from utils.printers import print_debug, print_info, print_warning, print_error
 from utils.slurmifyValidationReport import SlurmifyValidationReport
+from utils.system_config import SystemConfig, get_system_config
+from utils.scriptGenerator import (
+    get_section_templates,
+    iter_environment_section,
+    iter_exec_section,
+    iter_module_section,
+    iter_slurm_script,
+    iter_system_section,
+    render,
+    write_slurm_script,
+)
+from utils.scriptWriter import write_job_scripts
+from utils.validationTrace import ValidationTrace
 from utils.validators import (
     validate_system,
     validate_logs,
     validate_modules,
     validate_environment,
 )
+from concurrent.futures import ThreadPoolExecutor
 from types import ModuleType
+from typing import Iterator
 import os
-import requests
+import threading
 
 """
 This function will be used to validate the job configuration before anything else.
@@ -46,6 +61,13 @@ TODO:
 """
 skip_modules: bool = False
 
+# Threads of start_validation, overridden by SLURMIFY_VALIDATION_WORKERS. The
+# validators are pure Python and hold the GIL, so more threads only pay off on a
+# free-threaded interpreter or when validation waits on I/O (module list).
+VALIDATION_WORKERS = 1
+# Fewer jobs are validated in the calling thread
+MIN_PARALLEL_JOBS = 16
+
 
 def set_skip_modules(skip: bool):
     """
@@ -60,12 +82,76 @@ def set_skip_modules(skip: bool):
         print_warning("Skipping module validation")
 
 
-def start_validation(Jobs: list[Job]):
-    error_reports: list[SlurmifyValidationReport] = []
-    for job in Jobs:
-        valid, error_report = validate_job(job)
-        error_reports.append(error_report)
-    return error_reports
+def start_validation(
+    Jobs: list[Job],
+    systemConfigPath: str | None = None,
+    workers: int | None = None,
+    stop_on_critical: bool = False,
+) -> list[SlurmifyValidationReport]:
+    """Validate the jobs of a config, optionally with a thread pool
+
+    The constraints are read once and shared read-only by every job. With more
+    than one worker the jobs are validated by a thread pool, except that jobs
+    sharing one Resources object are validated one after the other in config
+    order, since the validators fix values in place and each job has to see
+    the fixes of the previous one.
+
+    Args:
+        Jobs (list[Job]): The jobs, fixed in place like validate_job does
+        systemConfigPath (str, optional): System config, defaults to systemConfig/conf.yaml
+        workers (int, optional): Validation threads, defaults to
+            SLURMIFY_VALIDATION_WORKERS or VALIDATION_WORKERS
+        stop_on_critical (bool): Stop at the first job with a critical error,
+            the reports end with its report
+
+    Returns:
+        list[SlurmifyValidationReport]: One report per job, in the order of Jobs
+    """
+    validation_info = get_validation_info(systemConfigPath)
+
+    # Jobs sharing their Resources form one chain, chains are independent
+    chains: dict[int, list[int]] = {}
+    for index, job in enumerate(Jobs):
+        chains.setdefault(id(job.system.resources), []).append(index)
+
+    reports: list[SlurmifyValidationReport | None] = [None] * len(Jobs)
+    # Index of the first job with a critical error so far
+    stop_at = len(Jobs)
+    lock = threading.Lock()
+
+    def validate_chain(indices: list[int]) -> None:
+        nonlocal stop_at
+        for index in indices:
+            if index > stop_at:
+                return
+
+            job = Jobs[index]
+            report = SlurmifyValidationReport(job.name, job)
+            check_job_validity(job, validation_info, report)
+            reports[index] = report
+
+            if stop_on_critical and report.has_critical_errors():
+                with lock:
+                    stop_at = min(stop_at, index)
+                return
+
+    if workers is None:
+        workers = int(os.getenv("SLURMIFY_VALIDATION_WORKERS", VALIDATION_WORKERS))
+    workers = min(workers, len(chains))
+
+    if workers <= 1 or len(Jobs) < MIN_PARALLEL_JOBS:
+        validate_chain(list(range(len(Jobs))))
+    else:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="slurmify-validate"
+        ) as pool:
+            for future in [pool.submit(validate_chain, ids) for ids in chains.values()]:
+                future.result()
+
+    if stop_at < len(Jobs):
+        print_error("Stopped at job %s, it has critical errors", Jobs[stop_at].name)
+
+    return reports[: stop_at + 1]
 
 
 def get_slurmify_jobs(
@@ -110,20 +196,33 @@ def get_slurmify_jobs(
     return jobs
 
 
+def get_validation_info(systemConfigPath: str | None = None) -> dict:
+    """The constraints the validators check a job against
+
+    Args:
+        systemConfigPath (str, optional): System config, defaults to systemConfig/conf.yaml
+
+    Returns:
+        dict: constraints, system_constraints and constraint_table
+    """
+    system_config: SystemConfig = get_system_config(systemConfigPath)
+    config: dict = system_config.raw
+
+    return {
+        "constraints": config["constraints"],
+        "system_constraints": config["system_constraints"],
+        "constraint_table": system_config.constraint_table,
+    }
+
+
 def validate_job(
-    job: Job, systemConfigPath: str = "systemConfig/conf.yaml"
+    job: Job, systemConfigPath: str | None = None
 ) -> tuple[bool, SlurmifyValidationReport]:
-    config: dict = load_config()
-    constraints: dict = config["constraints"]
-    system_constraints: dict = config["system_constraints"]
     job_validity_report: SlurmifyValidationReport = SlurmifyValidationReport(
         job.name, job
     )
 
-    all_constraints = {
-        "constraints": constraints,
-        "system_constraints": system_constraints,
-    }
+    all_constraints = get_validation_info(systemConfigPath)
 
     result = check_job_validity(job, all_constraints, job_validity_report)
 
@@ -133,22 +232,37 @@ def validate_job(
 # TODO: There is no validation for FPGA cards
 # TODO: There is no validation for space constraints
 def check_job_validity(
-    job: Job, validation_info: dict, report: SlurmifyValidationReport
+    job: Job,
+    validation_info: dict,
+    report: SlurmifyValidationReport,
+    system_validators=None,
+    fixes: list | None = None,
 ) -> bool:
-    """Main validation function that calls specialized validators"""
+    """Main validation function that calls specialized validators
 
-    if not validate_system(job, validation_info, report):
-        return False
+    system_validators (Iterable[str], optional) restricts the system checks to
+    these validators, see utils.validators.SYSTEM_VALIDATORS. fixes (list,
+    optional) collects the values they changed.
+    """
 
-    if not validate_logs(job):
-        return False
+    with report.span("validate_system"):
+        if not validate_system(
+            job, validation_info, report, system_validators, fixes
+        ):
+            return False
 
-    if not skip_modules:
-        if not validate_modules(job, report):
+    with report.span("validate_logs"):
+        if not validate_logs(job):
             return False
 
-    if not validate_environment(job):
-        return False
+    if not skip_modules:
+        with report.span("validate_modules"):
+            if not validate_modules(job, report):
+                return False
+
+    with report.span("validate_environment"):
+        if not validate_environment(job):
+            return False
 
     return True
 
@@ -158,131 +272,20 @@ def check_job_validity(
 
 
 def generate_slurm_system_script(job: Job, slurm_translation: dict) -> str:
-    # Create an attractive ASCII header
-    slurm = """
-#==============================================================================#
-#                                                                              #
-#                         SLURM JOB CONFIGURATION                              #
-#                                                                              #
-#==============================================================================#
-"""
-    # Add job name with nice formatting
-    slurm += f"\n#SBATCH --job-name={job.name}"
-
-    # Add a separator for resource section
-    slurm += """
-#------------------------------------------------------------------------------#
-#                           RESOURCE CONFIGURATION                             #
-#------------------------------------------------------------------------------#
-"""
-
-    # Add resources with proper formatting
-    resources_dict: dict[str, Any] = vars(job.system.resources)
-
-    for attr_name, value in resources_dict.items():
-        if attr_name.startswith("_"):
-            continue
-        if value is None:
-            continue
-        if value == 0:
-            continue
-        slurm_option = slurm_translation.get(attr_name)
-        if slurm_option:
-            slurm += f"\n#SBATCH --{slurm_option}={value}"
-        else:
-            print_warning(f"Warning: No SLURM translation for '{attr_name}'")
-            print_warning(f"         Using '{attr_name}' as SLURM option")
-            print_warning(f"         Please check the SLURM documentation")
-            print_warning(f"         to ensure this is a valid option")
-            print_warning(f"         use at your own risk!")
-            slurm += f"\n#SBATCH --{attr_name}={value}"  # TODO: Ask user if he want to add it or just skip
-            pass
-
-    if not job.logs == None:  # logs are not required will be handled by slurm
-
-        # Add a separator for log section
-        slurm += """
-#------------------------------------------------------------------------------#
-#                               LOG SETTINGS                                   #
-#------------------------------------------------------------------------------#
-"""
-
-        # Add log configuration
-        log_dict: dict[str, Any] = vars(job.logs)
-
-        for attr_name, value in log_dict.items():
-            if attr_name.startswith("_"):
-                continue
-            if value is None:
-                continue
-            logs_options = slurm_translation.get(f"logs")
-            if logs_options is None:
-                print_warning(f"Warning: No SLURM translation for '{attr_name}'")
-                print_warning(f"         Using '{attr_name}' as SLURM option")
-                print_warning(f"         Please check the SLURM documentation")
-                print_warning(f"         to ensure this is a valid option")
-                print_warning(f"         use at your own risk!")
-
-            # get logs from logs_options
-            slurm_option = logs_options.get(attr_name)
-            if slurm_option is None:
-                print_warning(f"Warning: No SLURM translation for '{attr_name}'")
-                print_warning(f"         Using '{attr_name}' as SLURM option")
-                print_warning(f"         Please check the SLURM documentation")
-                print_warning(f"         to ensure this is a valid option")
-                print_warning(f"         use at your own risk!")
-                slurm_option = attr_name
-            # print(f"Log option: {slurm_option} = {value}")
-            print_debug(f"Log option: {slurm_option} = {value}")
-            if slurm_option:
-                slurm += f"\n#SBATCH --{slurm_option}={value}"
-            else:
-                # slurm += f"\n#SBATCH --{attr_name}={value}"
-                pass
-    return slurm
+    """#SBATCH part of the script (job name, resources, logs)"""
+    return "".join(iter_system_section(job, slurm_translation))
 
 
 def generate_slurm_env_script(job: Job) -> str:
-    slurm = """
-#==============================================================================#
-#                           ENVIRONMENT SETUP                                  #
-#==============================================================================#
-"""
-    if job.environments is None:
-        return ""
-    for env in job.environments:
-        slurm += f"\n# {env.name} environment"
-        for command in env.commands:
-            slurm += f"\n{command}"
-    return slurm
+    return "".join(iter_environment_section(job))
 
 
 def generate_slurm_module_script(job: Job) -> str:
-    slurm = """
-#==============================================================================#
-#                            MODULE LOADING                                    #
-#==============================================================================#
-"""
-    if not job.modules is None:
-        for module in job.modules.get_modules():
-            slurm += f"\nmodule load {module.name}"
-        return slurm
-    return ""
+    return "".join(iter_module_section(job))
 
 
 def generate_slurm_exec_script(job: Job) -> str:
-    slurm = """
-#==============================================================================#
-#                           EXECUTION COMMAND                                  #
-#==============================================================================#
-"""
-    if type(job.exec_command) == str:
-        return f"\n{job.exec_command}"
-
-    for command in job.exec_command:
-        slurm += f"\n{command}"
-
-    return slurm
+    return "".join(iter_exec_section(job))
 
 
 def generate_slurm_script(
@@ -290,41 +293,85 @@ def generate_slurm_script(
     config_path: str = None,
     create_file: bool = True,
     output_path: str = "./out",
+    report: SlurmifyValidationReport | None = None,
 ) -> str:
+    """Generate the SLURM script of a validated job
+
+    The script is rendered from a template cached per set of job attributes
+    (see utils.scriptGenerator) and streamed into the file.
+
+    Args:
+        job (Job): The job to generate the script for
+        config_path (str, optional): System config, defaults to systemConfig/conf.yaml
+        create_file (bool): Write the script to output_path and return its path,
+            otherwise return the script itself
+        output_path (str): Directory of the generated script
+        report (SlurmifyValidationReport, optional): Report of the job, the
+            generation time is recorded on it
+
+    Returns:
+        str: Path of the generated file, or the script if create_file is False
+    """
+    if report is None:
+        return _generate_slurm_script(job, config_path, create_file, output_path)
+
+    with report.span("generate", create_file=create_file):
+        return _generate_slurm_script(
+            job, config_path, create_file, output_path, report.trace
+        )
+
+
+def _traced_fragments(
+    job: Job, slurm_translation: dict, trace: ValidationTrace
+) -> Iterator[str]:
+    # One span per section (generate_system, ...), rendered from cached templates
+    for name, parts in get_section_templates(job, slurm_translation):
+        with trace.span(f"generate_{name}"):
+            fragments = list(render(parts, job))
+        yield from fragments
 
-    if config_path is None:
-        # Default to the generator config
-        config = load_config()
+
+def _generate_slurm_script(
+    job: Job,
+    config_path: str | None,
+    create_file: bool,
+    output_path: str,
+    trace: ValidationTrace | None = None,
+) -> str:
+
+    # Defaults to systemConfig/conf.yaml when config_path is None (cached)
+    config = load_config(config_path)
 
     slurm_translation = config["SlurmInfo"]
-    slurm: str = "#!/bin/bash -l"
 
     print_info("Generating SLURM script...")
 
-    # get all the resources
-    slurm += generate_slurm_system_script(job, slurm_translation)
-    slurm += generate_slurm_env_script(job)
-    slurm += generate_slurm_module_script(job)
-    slurm += generate_slurm_exec_script(job)
+    if trace is None:
+        fragments = iter_slurm_script(job, slurm_translation)
+    else:
+        fragments = _traced_fragments(job, slurm_translation, trace)
 
     if not create_file:
-        return slurm
-
-    # print(slurm)
-
-    # Write the slurm script to a file ./out/job_name.sbatch
+        return "".join(fragments)
 
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
+    # Write the slurm script to a file ./out/job_name.sh
+    os.makedirs(output_path, exist_ok=True)
 
     file_path = os.path.join(
         output_path, f"{job.name}.sh"
     )  # TODO: Make this dynamic and not hardcoded
 
-    with open(file_path, "w") as file:
-        file.write(slurm)
-
-    print_debug(f"SLURM script generated for {job.name}")
+    if trace is None:
+        with open(file_path, "w") as file:
+            write_slurm_script(job, file, slurm_translation)
+    else:
+        # Rendered first, so write_file only times the file system
+        fragments = list(fragments)
+        with trace.span("write_file"):
+            with open(file_path, "w") as file:
+                file.writelines(fragments)
+
+    print_debug("SLURM script generated for %s", job.name)
     return file_path
 
 
@@ -335,49 +382,25 @@ def generate_slurm_script_from_config(
 
     IMPORTANT: This function should only be used after validation of the config file.
 
+    The scripts are written by the bulk writer (see utils.scriptWriter), which
+    also saves a manifest.json with their hashes in output_path.
+
     Args:
-        slurmify_config_path (str): Path to the slurmify config file
+        list_of_job (list[Job]): The validated jobs of the config file
+        valid (bool): Whether the config file was validated
+        output_path (str): Directory of the generated scripts
 
     Returns:
-        str | None: Path to the generated slurm script or None if failed
+        list[str] | None: Paths of the generated slurm scripts or None if failed
     """
     if not valid:
         print_error("Slurmify config file is not valid | Should never happen")
         return None
 
-    sbatch_paths: list[str] = []
+    print_info("Generating SLURM scripts...")
+    entries = write_job_scripts(list_of_job, output_path=output_path)
 
-    for job in list_of_job:
-        sbatch_path: str = generate_slurm_script(
-            job, create_file=True, output_path=output_path
-        )
-        sbatch_paths.append(sbatch_path)
-
-    return sbatch_paths
-
-
-def search_module(name: str) -> list[str]:
-    """
-    This function is used to search for a module in the system.
-    Args:
-        module_name (str): The name of the module to search for.
-    Returns:
-        list[str]: A list of module names that match the search query.
-    """
-    module_list = get_module_list()
-    if module_list is None:
-        print_error("Module list is None")
-        return []
-
-    # Search for the module in the module list
-    search_results: list[str] = module_list.search_modules_with_versions(name)
-    if not search_results:
-        print_warning(f"No modules found for '{name}'")
-        return []
-
-    print_info(f"Found {len(search_results)} modules for '{name}':")
-
-    return search_results
+    return [entry.path for entry in entries]
 
 
 # Not Finished
@@ -393,6 +416,9 @@ def submit_slurm_job(jwt_token: str, workdir: str, job: Job, slurm: str = None):
         job (Job): The job object containing job details.
         slurm (str): The Slurm script to be submitted. # Maybe generate it here instead of passing it
     """
+    # Only needed here, importing it costs more than the rest of the CLI startup
+    import requests
+
     print("Submitting job...")  # TODO: Add error message here
     if jwt_token is None:
         return False, ""
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+
+from utils import func
+from utils.config_info import Job
+from utils.moduleListHandler import get_module_list
+from utils.printers import print_debug, print_error, print_info
+from utils.slurmifyValidationReport import ErrorEntry, SlurmifyValidationReport
+from utils.system_config import get_system_config
+from utils.validators import (
+    SYSTEM_VALIDATORS,
+    validate_environment,
+    validate_logs,
+    validate_modules,
+)
+
+"""
+Incremental validation of a job that is edited step by step.
+
+An interactive form changes one field at a time, but validate_job runs every
+validator again. IncrementalValidator remembers the outcome of each validator
+for the previous version of the job: the values of the Resources fields it
+reads (see SYSTEM_VALIDATORS in utils.validators), its result, the errors it
+reported and the values of the fields it may fix. On the next call a
+validator only runs again when one of the fields it reads has another value
+at its turn, either because the user changed it or because a validator before
+it fixed it differently. The outcomes of the other validators are merged into
+the new report and their fixes applied as they were.
+
+    validator = IncrementalValidator()
+    valid, report = validator.validate(job)   # every validator
+    job = Job(...)                              # same job with another time
+    valid, report = validator.validate(job)   # validate_time only
+
+The report is the same as the one validate_job would return for the job.
+"""
+
+
+@dataclass(frozen=True)
+class ValidatorOutcome:
+    """What one validator did for the previous version of the job
+
+    Attributes:
+        inputs (dict): Values of the fields it reads, before it ran
+        result (bool): Its return value
+        errors (tuple[ErrorEntry]): The errors it added to the report
+        fixes (dict): Values of the fields it may rewrite, after it ran
+    """
+
+    inputs: dict
+    result: bool
+    errors: tuple[ErrorEntry, ...]
+    fixes: dict
+
+
+def _values(job: Job, fields) -> dict:
+    resources = job.system.resources
+    return {field: getattr(resources, field, None) for field in fields}
+
+
+def _modules_key(job: Job) -> tuple | None:
+    if job.modules is None:
+        return None
+    return tuple(module.name for module in job.modules.get_modules())
+
+
+class IncrementalValidator:
+    """Validates successive versions of one job, re-running only what changed
+
+    Attributes:
+        systemConfigPath (str | None): System config, defaults to systemConfig/conf.yaml
+        last_run (list[str]): Validators that ran in the last validate call
+    """
+
+    def __init__(self, systemConfigPath: str | None = None):
+        self.systemConfigPath = systemConfigPath
+        self._config_version = None
+        self._modules_version = None
+        self._validation_info: dict | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous job, the next validate runs every validator"""
+        self._outcomes: dict[str, ValidatorOutcome] = {}
+        self._modules_outcome: ValidatorOutcome | None = None
+        self.last_run: list[str] = []
+
+    def _run(
+        self, name, validator, report: SlurmifyValidationReport, inputs: dict, writes=()
+    ) -> ValidatorOutcome:
+        job = report.job
+        start = len(report.errors)
+
+        with report.span(name):
+            result = validator(job, report)
+
+        self.last_run.append(name)
+        return ValidatorOutcome(
+            inputs=inputs,
+            result=result,
+            errors=tuple(report.errors[start:]),
+            fixes=_values(job, writes),
+        )
+
+    @staticmethod
+    def _replay(outcome: ValidatorOutcome, report: SlurmifyValidationReport) -> None:
+        for entry in outcome.errors:
+            report.add_error_entry(entry)
+
+        resources = report.job.system.resources
+        for field, value in outcome.fixes.items():
+            setattr(resources, field, value)
+
+    def validate(self, job: Job) -> tuple[bool, SlurmifyValidationReport]:
+        """Validate the job, re-using the outcomes of unaffected validators
+
+        Like validate_job the job is fixed in place.
+
+        Args:
+            job (Job): The current version of the job
+
+        Returns:
+            tuple[bool, SlurmifyValidationReport]: The result and the report
+        """
+        system_config = get_system_config(self.systemConfigPath)
+        modules_version = None if func.skip_modules else get_module_list().version
+        if (
+            system_config.version != self._config_version
+            or modules_version != self._modules_version
+        ):
+            # Other limits or modules, none of the previous outcomes hold
+            self.reset()
+            self._config_version = system_config.version
+            self._modules_version = modules_version
+            self._validation_info = func.get_validation_info(self.systemConfigPath)
+
+        validation_info = self._validation_info
+        self.last_run = []
+
+        report = SlurmifyValidationReport(job.name, job)
+
+        results = []
+        with report.span("validate_system"):
+            for name, validator, reads, writes in SYSTEM_VALIDATORS:
+                outcome = self._outcomes.get(name)
+                inputs = _values(job, reads)
+
+                if outcome is None or outcome.inputs != inputs:
+                    outcome = self._outcomes[name] = self._run(
+                        name,
+                        lambda j, r, validator=validator: validator(
+                            j, validation_info, r
+                        ),
+                        report,
+                        inputs,
+                        writes,
+                    )
+                else:
+                    self._replay(outcome, report)
+
+                results.append(outcome.result)
+
+        print_debug(
+            "Re-ran %s of %s system validators", len(self.last_run), len(results)
+        )
+
+        if not all(results):
+            print_error("System Validation Failed")
+            return False, report
+        print_info("System Validation Passed")
+
+        with report.span("validate_logs"):
+            if not validate_logs(job):
+                return False, report
+
+        if not func.skip_modules:
+            outcome = self._modules_outcome
+            inputs = {"modules": _modules_key(job)}
+
+            if outcome is None or outcome.inputs != inputs:
+                outcome = self._modules_outcome = self._run(
+                    "validate_modules", validate_modules, report, inputs
+                )
+            else:
+                self._replay(outcome, report)
+
+            if not outcome.result:
+                return False, report
+
+        with report.span("validate_environment"):
+            if not validate_environment(job):
+                return False, report
+
+        return True, report
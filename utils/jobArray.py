@@ -0,0 +1,175 @@
+import re
+import shlex
+from dataclasses import dataclass
+
+"""
+SLURM job arrays.
+
+Resources(array=...) takes the value of "#SBATCH --array": task indices as
+single numbers and ranges with an optional step, separated by commas, and an
+optional "%N" that limits how many tasks run at once.
+
+    Resources(account="p200301", array="0-999%50")
+    Resources(account="p200301", array=array_range(0, 999, throttle=50))
+
+Every task runs the same script with its own $SLURM_ARRAY_TASK_ID. The
+helpers below write that variable into exec_command:
+
+    exec_command=[
+        array_values("INPUT", ["a.csv", "b.csv", "c.csv"]),
+        array_task_command("./run --input $INPUT --seed {task_id}"),
+    ]
+"""
+
+# Placeholders of array_task_command and the SLURM variables they stand for
+TASK_PLACEHOLDERS = {
+    "{task_id}": "${SLURM_ARRAY_TASK_ID}",
+    "{task_min}": "${SLURM_ARRAY_TASK_MIN}",
+    "{task_max}": "${SLURM_ARRAY_TASK_MAX}",
+    "{task_step}": "${SLURM_ARRAY_TASK_STEP}",
+    "{task_count}": "${SLURM_ARRAY_TASK_COUNT}",
+    "{array_job_id}": "${SLURM_ARRAY_JOB_ID}",
+}
+
+_RANGE_PATTERN = re.compile(r"^(\d+)(?:-(\d+)(?::(\d+))?)?$")
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    """A parsed --array value
+
+    Attributes:
+        indices (str): The index part, e.g. "0-99:2,200"
+        ranges (tuple[range]): The task indices of each comma separated entry
+        throttle (int | None): Maximum number of tasks running at once
+    """
+
+    indices: str
+    ranges: tuple[range, ...]
+    throttle: int | None = None
+
+    @property
+    def count(self) -> int:
+        """Number of tasks (an index listed twice counts twice)"""
+        return sum(len(task_range) for task_range in self.ranges)
+
+    @property
+    def min_index(self) -> int:
+        return min(task_range[0] for task_range in self.ranges)
+
+    @property
+    def max_index(self) -> int:
+        return max(task_range[-1] for task_range in self.ranges)
+
+    def with_throttle(self, throttle: int | None) -> "ArraySpec":
+        return ArraySpec(self.indices, self.ranges, throttle)
+
+    def __str__(self) -> str:
+        if self.throttle is None:
+            return self.indices
+        return f"{self.indices}%{self.throttle}"
+
+
+def parse_array_spec(spec: str) -> ArraySpec:
+    """Parse a --array value like "0-15:4,20%2"
+
+    Raises:
+        ValueError: The value is not a valid SLURM array specification
+    """
+    if not isinstance(spec, str):
+        raise ValueError(f"Array must be a string like '0-99%10', got {spec!r}")
+
+    indices, percent, throttle_text = spec.strip().partition("%")
+
+    throttle = None
+    if percent:
+        if not throttle_text.isdigit() or int(throttle_text) < 1:
+            raise ValueError(f"Array throttle '%{throttle_text}' must be a number > 0")
+        throttle = int(throttle_text)
+
+    ranges = []
+    for entry in indices.split(","):
+        match = _RANGE_PATTERN.match(entry.strip())
+        if match is None:
+            raise ValueError(
+                f"Invalid array entry '{entry}', use N, N-M or N-M:STEP"
+            )
+
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) is not None else start
+        step = int(match.group(3)) if match.group(3) is not None else 1
+
+        if end < start:
+            raise ValueError(f"Array range '{entry}' ends before it starts")
+        if step < 1:
+            raise ValueError(f"Array step in '{entry}' must be > 0")
+
+        ranges.append(range(start, end + 1, step))
+
+    return ArraySpec(indices.strip(), tuple(ranges), throttle)
+
+
+def array_range(
+    start: int, end: int | None = None, step: int = 1, throttle: int | None = None
+) -> str:
+    """Build a --array value
+
+    Args:
+        start (int): First task index
+        end (int, optional): Last task index (inclusive), defaults to start
+        step (int): Distance between two task indices
+        throttle (int, optional): Maximum number of tasks running at once
+
+    Returns:
+        str: e.g. "0-99:2%10"
+    """
+    spec = str(start)
+    if end is not None and end != start:
+        spec += f"-{end}"
+        if step != 1:
+            spec += f":{step}"
+    if throttle is not None:
+        spec += f"%{throttle}"
+
+    # Raises on values SLURM would reject
+    parse_array_spec(spec)
+    return spec
+
+
+def array_task_command(command: str) -> str:
+    """Replace the task placeholders ({task_id}, {task_count}, ...) of a command
+
+    The placeholders become the SLURM array variables, other braces (like
+    ${HOME}) are left as they are.
+
+        array_task_command("./run --seed {task_id}")
+        # './run --seed ${SLURM_ARRAY_TASK_ID}'
+    """
+    for placeholder, variable in TASK_PLACEHOLDERS.items():
+        command = command.replace(placeholder, variable)
+    return command
+
+
+def array_values(name: str, values: list, start: int = 0, step: int = 1) -> str:
+    """A command that sets the shell variable name to the value of this task
+
+    The value of task index start + i * step is values[i].
+
+        array_values("INPUT", ["a.csv", "b.csv"])
+        # INPUT_VALUES=(a.csv b.csv); INPUT="${INPUT_VALUES[$(( ... ))]}"
+
+    Args:
+        name (str): Shell variable name
+        values (list): One value per task, quoted for the shell
+        start (int): Task index of the first value
+        step (int): Distance between the task indices of two values
+
+    Returns:
+        str: One exec_command line
+    """
+    if not name.isidentifier():
+        raise ValueError(f"'{name}' is not a valid shell variable name")
+
+    quoted = " ".join(shlex.quote(str(value)) for value in values)
+    index = f"(SLURM_ARRAY_TASK_ID - {start}) / {step}"
+    return f'{name}_VALUES=({quoted}); {name}="${{{name}_VALUES[$(( {index} ))]}}"'
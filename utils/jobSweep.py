@@ -0,0 +1,364 @@
+import copy
+import itertools
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from utils.config_info import Job, System
+from utils.func import check_job_validity, get_validation_info
+from utils.printers import print_error, print_info, print_warning
+from utils.scriptWriter import MANIFEST_NAME, ManifestEntry, write_job_scripts
+from utils.slurmifyValidationReport import SlurmifyValidationReport
+from utils.validators import SYSTEM_VALIDATORS, affected_validators, validate_system
+
+"""
+Parameter sweeps: many jobs from one base job and a grid of values.
+
+    sweep = JobSweep(
+        base_job,
+        {"cores": [4, 8, 16], "exec_command": [["./run a"], ["./run b"]]},
+        mode="product",
+    )
+    validation = sweep.validate()
+    sweep.write_scripts("./out", validation)
+
+mode="product" makes a job for every combination of the values (3 x 2 = 6
+jobs above), mode="zip" pairs the i-th values of every field.
+
+The variants only differ in the grid fields, so the checks that do not read
+them (account, logs, modules, environments, ...) are run once on the base job
+and only the system validators that depend on a grid field are run per
+variant (see utils.validators.SYSTEM_VALIDATORS). A sweep of 50k jobs costs
+50k runs of a few validators instead of 50k full validations.
+
+A sweep that only varies exec_command can also be written as one job array,
+one script with "#SBATCH --array" that picks the command of
+$SLURM_ARRAY_TASK_ID.
+"""
+
+RESOURCE_FIELDS = (
+    "account",
+    "partitions",
+    "cores",
+    "gpu",
+    "mode",
+    "nodes",
+    "time",
+    "ntasks",
+    "array",
+)
+SWEEP_FIELDS = RESOURCE_FIELDS + ("exec_command",)
+SWEEP_MODES = ("product", "zip")
+
+
+@dataclass
+class SweepValidation:
+    """Validation of a sweep
+
+    Attributes:
+        report (SlurmifyValidationReport): The checks run once on the base job
+        jobs (list[Job]): The validated variants, in grid order
+        reports (list[SlurmifyValidationReport]): Report of each variant, with
+            the errors of the base report and its own
+        stopped (bool): Validation stopped at the first critical error, jobs
+            and reports end with the failing variant
+    """
+
+    report: SlurmifyValidationReport
+    jobs: list[Job] = field(default_factory=list)
+    reports: list[SlurmifyValidationReport] = field(default_factory=list)
+    stopped: bool = False
+
+    @property
+    def valid(self) -> bool:
+        return (
+            self.report.valid
+            and not self.stopped
+            and all(report.valid for report in self.reports)
+        )
+
+    def valid_jobs(self) -> list[Job]:
+        if not self.report.valid:
+            return []
+        return [job for job, report in zip(self.jobs, self.reports) if report.valid]
+
+    def invalid_reports(self) -> list[SlurmifyValidationReport]:
+        return [report for report in self.reports if not report.valid]
+
+
+class JobSweep:
+    """A grid of jobs derived from a base job
+
+    Attributes:
+        base (Job): The job the variants are copied from
+        grid (dict[str, list]): Values of each swept field, the fields are the
+            Resources fields and exec_command
+        mode (str): "product" for every combination, "zip" to pair the values
+        name_format (str): Name of a variant, formatted with the base name,
+            the index of the variant and the values of the grid fields
+    """
+
+    def __init__(
+        self,
+        base: Job,
+        grid: dict[str, list],
+        mode: str = "product",
+        name_format: str = "{name}_{index}",
+    ):
+        unknown = [name for name in grid if name not in SWEEP_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Cannot sweep over {', '.join(unknown)}, "
+                f"use one of {', '.join(SWEEP_FIELDS)}"
+            )
+
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unknown sweep mode '{mode}', use product or zip")
+
+        self.grid: dict[str, list] = {name: list(values) for name, values in grid.items()}
+
+        if mode == "zip" and len({len(values) for values in self.grid.values()}) > 1:
+            raise ValueError("All fields of a zip sweep need the same number of values")
+
+        self.base = base
+        self.mode = mode
+        self.name_format = name_format
+        self.fields: tuple[str, ...] = tuple(self.grid)
+
+    def __len__(self) -> int:
+        if not self.grid:
+            return 0
+
+        lengths = [len(values) for values in self.grid.values()]
+        if self.mode == "zip":
+            return lengths[0]
+
+        count = 1
+        for length in lengths:
+            count *= length
+        return count
+
+    def values(self) -> Iterator[dict]:
+        """The grid values of every variant, in order"""
+        combine = itertools.product if self.mode == "product" else zip
+        for combination in combine(*self.grid.values()):
+            yield dict(zip(self.fields, combination))
+
+    def variant(self, index: int, values: dict) -> Job:
+        """A copy of the base job with the values of one variant
+
+        Only Resources, System and exec_command are new objects, the logs,
+        modules and environments are shared with the base job.
+        """
+        base = self.base
+        resources = copy.copy(base.system.resources)
+        for name, value in values.items():
+            if name != "exec_command":
+                setattr(resources, name, value)
+
+        return Job(
+            name=self.name_format.format(name=base.name, index=index, **values),
+            system=System(resources, name=base.system.name),
+            exec_command=values.get("exec_command", base.exec_command),
+            environments=base.environments,
+            logs=base.logs,
+            modules=base.modules,
+        )
+
+    def jobs(self) -> Iterator[Job]:
+        """The variant jobs, not validated"""
+        for index, values in enumerate(self.values()):
+            yield self.variant(index, values)
+
+    def varying_validators(self) -> list[str]:
+        """The system validators that are run for every variant"""
+        return affected_validators(self.fields)
+
+    def validate(
+        self, systemConfigPath: str | None = None, stop_on_critical: bool = False
+    ) -> SweepValidation:
+        """Validate the base job once and every variant for its grid fields
+
+        Like validate_job, the validators fix values in place: the base job
+        gets the fixes of the invariant checks (which every variant inherits)
+        and each variant its own.
+
+        Args:
+            systemConfigPath (str, optional): System config, defaults to systemConfig/conf.yaml
+            stop_on_critical (bool): Stop at the first variant with a critical error
+
+        Returns:
+            SweepValidation: The base report and the variants with their reports
+        """
+        validation_info = get_validation_info(systemConfigPath)
+
+        varying = self.varying_validators()
+        invariant = [name for name, *_ in SYSTEM_VALIDATORS if name not in varying]
+
+        base_report = SlurmifyValidationReport(self.base.name, self.base)
+        with base_report.span("sweep_invariant", validators=len(invariant)):
+            check_job_validity(self.base, validation_info, base_report, invariant)
+
+        validation = SweepValidation(report=base_report)
+
+        if base_report.has_critical_errors():
+            print_error("Base job of sweep %s is not valid", self.base.name)
+            validation.stopped = stop_on_critical
+            return validation
+
+        for index, values in enumerate(self.values()):
+            job = self.variant(index, values)
+            report = SlurmifyValidationReport(job.name, job)
+            report.merge(base_report)
+
+            if varying:
+                validate_system(job, validation_info, report, varying)
+
+            validation.jobs.append(job)
+            validation.reports.append(report)
+
+            if stop_on_critical and report.has_critical_errors():
+                print_error("Variant %s of sweep %s is not valid", index, self.base.name)
+                validation.stopped = True
+                break
+
+        print_info(
+            "Sweep %s: %s of %s variants valid",
+            self.base.name,
+            len(validation.valid_jobs()),
+            len(validation.jobs),
+        )
+        return validation
+
+    def write_scripts(
+        self,
+        output_path: str = "./out",
+        validation: SweepValidation | None = None,
+        config_path: str | None = None,
+        workers: int | None = None,
+        manifest_name: str | None = MANIFEST_NAME,
+    ) -> list[ManifestEntry]:
+        """Write one script per valid variant
+
+        Args:
+            output_path (str): Directory of the scripts
+            validation (SweepValidation, optional): Result of validate(), the
+                sweep is validated when it is not given
+            config_path (str, optional): System config, defaults to systemConfig/conf.yaml
+            workers (int, optional): Writer threads
+            manifest_name (str, optional): File name of the JSON manifest, None to skip
+
+        Returns:
+            list[ManifestEntry]: The written scripts
+        """
+        if validation is None:
+            validation = self.validate(config_path)
+
+        skipped = len(validation.invalid_reports())
+        if skipped:
+            print_warning("Skipping %s invalid variants of %s", skipped, self.base.name)
+
+        return write_job_scripts(
+            validation.valid_jobs(),
+            output_path,
+            config_path=config_path,
+            workers=workers,
+            manifest_name=manifest_name,
+        )
+
+    def _array_spec(self, throttle: int | None) -> str:
+        resource_fields = [name for name in self.fields if name != "exec_command"]
+        if resource_fields:
+            raise ValueError(
+                f"A job array cannot vary {', '.join(resource_fields)}, "
+                "write one script per variant with write_scripts"
+            )
+
+        count = len(self)
+        if count == 0:
+            raise ValueError("The sweep has no variants")
+
+        if throttle is None:
+            return f"0-{count - 1}"
+        return f"0-{count - 1}%{throttle}"
+
+    def array_job(self, throttle: int | None = None) -> Job:
+        """The sweep as one job array
+
+        All tasks of a SLURM job array get the same resources, so only sweeps
+        over exec_command can be written as one. The commands are selected
+        with a case on $SLURM_ARRAY_TASK_ID.
+
+        Args:
+            throttle (int, optional): Maximum number of tasks running at once
+
+        Returns:
+            Job: Copy of the base job with the array and the selected command
+
+        Raises:
+            ValueError: The sweep varies Resources fields or is empty
+        """
+        array = self._array_spec(throttle)
+
+        lines = ['case "$SLURM_ARRAY_TASK_ID" in']
+        for index, values in enumerate(self.values()):
+            commands = values.get("exec_command", self.base.exec_command)
+            if isinstance(commands, str):
+                commands = [commands]
+            lines.append(f"    {index})")
+            lines.extend(f"        {command}" for command in commands)
+            lines.append("        ;;")
+        lines.extend(
+            [
+                "    *)",
+                '        echo "No command for array task $SLURM_ARRAY_TASK_ID" >&2',
+                "        exit 1",
+                "        ;;",
+                "esac",
+            ]
+        )
+
+        resources = copy.copy(self.base.system.resources)
+        resources.array = array
+
+        return Job(
+            name=self.base.name,
+            system=System(resources, name=self.base.system.name),
+            exec_command=lines,
+            environments=self.base.environments,
+            logs=self.base.logs,
+            modules=self.base.modules,
+        )
+
+    def write_array_script(
+        self,
+        output_path: str = "./out",
+        throttle: int | None = None,
+        config_path: str | None = None,
+        manifest_name: str | None = MANIFEST_NAME,
+    ) -> list[ManifestEntry]:
+        """Validate and write the sweep as one job array script
+
+        Args:
+            output_path (str): Directory of the script
+            throttle (int, optional): Maximum number of tasks running at once
+            config_path (str, optional): System config, defaults to systemConfig/conf.yaml
+            manifest_name (str, optional): File name of the JSON manifest, None to skip
+
+        Returns:
+            list[ManifestEntry]: The written script, empty if the base job is not valid
+        """
+        array_job = self.array_job(throttle)
+
+        # Nothing the validators read varies, one validation covers every task
+        report = SlurmifyValidationReport(array_job.name, array_job)
+        check_job_validity(array_job, get_validation_info(config_path), report)
+        if not report.valid:
+            print_error("Array job of sweep %s is not valid", self.base.name)
+            return []
+
+        return write_job_scripts(
+            [array_job],
+            output_path,
+            config_path=config_path,
+            manifest_name=manifest_name,
+        )
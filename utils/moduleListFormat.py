@@ -0,0 +1,232 @@
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Mapping
+
+"""
+Binary, memory-mappable format of the module list (systemConfig/all_modules.bin).
+
+Layout (little endian, all offsets in bytes from the start of the file):
+
+    header      MAGIC, schema version, flags, module count, version count,
+                string table offset, string table size, sha256 content hash
+    modules     per module in list order: name offset, name length,
+                index of its first version, number of versions
+    sorted      per module: position in the modules table, ordered by name
+    versions    per version: offset, length
+    strings     UTF-8 names and versions, back to back
+
+A reader maps the file and answers lookups by binary search over the sorted
+table, nothing is deserialized until a module's versions are asked for. The
+content hash is the same value as ModuleList.version, so it can be used as a
+cache key without reading the rest of the file.
+"""
+
+MAGIC = b"SLMODLST"
+SCHEMA_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHIIII32s")
+_MODULE = struct.Struct("<IIII")
+_SORTED = struct.Struct("<I")
+_VERSION = struct.Struct("<II")
+
+
+def module_list_hash(modules: Mapping) -> str:
+    """Content hash of a module list, independent of the order of modules and versions"""
+    import hashlib
+
+    digest = hashlib.sha256()
+    for module in sorted(modules):
+        digest.update(module.encode())
+        digest.update(b"\0")
+        for version in sorted(modules[module] or []):
+            digest.update(str(version).encode())
+            digest.update(b"\1")
+    return digest.hexdigest()
+
+
+def save_to_binary(modules: Mapping, filename: str) -> None:
+    """Write a module list ({name: {version: {}}}) in the binary format.
+
+    Args:
+        modules (Mapping): Module names and their versions, as loaded from the pickle.
+        filename (str): Name of the file to write.
+    """
+    strings = bytearray()
+    string_offsets: dict[bytes, int] = {}
+
+    def add_string(value: str) -> tuple[int, int]:
+        encoded = value.encode()
+        if encoded not in string_offsets:
+            string_offsets[encoded] = len(strings)
+            strings.extend(encoded)
+        return string_offsets[encoded], len(encoded)
+
+    module_entries = []
+    version_entries = []
+    for name, versions in modules.items():
+        versions = [str(version) for version in (versions or [])]
+        module_entries.append((*add_string(name), len(version_entries), len(versions)))
+        version_entries.extend(add_string(version) for version in versions)
+
+    names = list(modules)
+    sorted_positions = sorted(range(len(names)), key=lambda i: names[i].encode())
+
+    string_table_offset = (
+        _HEADER.size
+        + _MODULE.size * len(module_entries)
+        + _SORTED.size * len(sorted_positions)
+        + _VERSION.size * len(version_entries)
+    )
+
+    header = _HEADER.pack(
+        MAGIC,
+        SCHEMA_VERSION,
+        0,
+        len(module_entries),
+        len(version_entries),
+        string_table_offset,
+        len(strings),
+        bytes.fromhex(module_list_hash(modules)),
+    )
+
+    # Write next to the target and rename so a running reader never sees half a file
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "wb") as file:
+        file.write(header)
+        for entry in module_entries:
+            file.write(_MODULE.pack(*entry))
+        for position in sorted_positions:
+            file.write(_SORTED.pack(position))
+        for entry in version_entries:
+            file.write(_VERSION.pack(*entry))
+        file.write(strings)
+    os.replace(tmp_filename, filename)
+
+
+class MappedModuleList(Mapping):
+    """
+    Read-only {module name: {version: {}}} mapping backed by a memory-mapped file.
+
+    Membership tests and lookups binary-search the sorted table directly in the
+    mapped file. The values have the same shape as the pickled module list so
+    the rest of the code (and the API responses) do not change.
+
+    Attributes:
+        path (str): Path of the mapped file.
+        content_hash (str): sha256 content hash stored in the header.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"{path} is too small to be a module list")
+
+        (
+            magic,
+            schema,
+            _flags,
+            self._module_count,
+            self._version_count,
+            self._strings_offset,
+            strings_size,
+            content_hash,
+        ) = _HEADER.unpack_from(self._mm, 0)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Slurmify module list")
+        if schema != SCHEMA_VERSION:
+            raise ValueError(
+                f"{path} has schema version {schema}, expected {SCHEMA_VERSION}"
+            )
+        if self._strings_offset + strings_size != len(self._mm):
+            raise ValueError(f"{path} is truncated")
+
+        self.content_hash = content_hash.hex()
+        self._modules_offset = _HEADER.size
+        self._sorted_offset = self._modules_offset + _MODULE.size * self._module_count
+        self._versions_offset = self._sorted_offset + _SORTED.size * self._module_count
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._mm[start : start + length]
+
+    def _module(self, position: int) -> tuple[int, int, int, int]:
+        return _MODULE.unpack_from(self._mm, self._modules_offset + _MODULE.size * position)
+
+    def _find(self, name: str) -> int:
+        """Position of a module in the modules table or -1"""
+        key = name.encode()
+        low, high = 0, self._module_count
+
+        while low < high:
+            middle = (low + high) // 2
+            (position,) = _SORTED.unpack_from(
+                self._mm, self._sorted_offset + _SORTED.size * middle
+            )
+            name_offset, name_length, _, _ = self._module(position)
+            candidate = self._string(name_offset, name_length)
+
+            if candidate == key:
+                return position
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return -1
+
+    def versions(self, name: str) -> list[str]:
+        """Versions of a module in list order ([] if the module is unknown)"""
+        position = self._find(name)
+        if position < 0:
+            return []
+        return self._versions_at(position)
+
+    def _versions_at(self, position: int) -> list[str]:
+        _, _, first_version, version_count = self._module(position)
+        versions = []
+        for index in range(first_version, first_version + version_count):
+            offset, length = _VERSION.unpack_from(
+                self._mm, self._versions_offset + _VERSION.size * index
+            )
+            versions.append(self._string(offset, length).decode())
+        return versions
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self._find(name) >= 0
+
+    def __getitem__(self, name: str) -> dict[str, dict]:
+        position = self._find(name) if isinstance(name, str) else -1
+        if position < 0:
+            raise KeyError(name)
+        return {version: {} for version in self._versions_at(position)}
+
+    def __iter__(self) -> Iterator[str]:
+        for position in range(self._module_count):
+            name_offset, name_length, _, _ = self._module(position)
+            yield self._string(name_offset, name_length).decode()
+
+    def __len__(self) -> int:
+        return self._module_count
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+if __name__ == "__main__":
+    # Convert the existing pickle without running 'module spider' again
+    import pickle
+
+    base = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "systemConfig",
+        "all_modules",
+    )
+    with open(base + ".pkl", "rb") as file:
+        save_to_binary(pickle.load(file), base + ".bin")
+    print(f"Written {base}.bin")
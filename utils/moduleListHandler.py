@@ -1,11 +1,195 @@
-import pickle
-import subprocess
+import bisect
 import re
-from numpy import test
-import yaml
 import os
+from collections.abc import Mapping
+from utils.moduleListFormat import MappedModuleList, module_list_hash, save_to_binary
+from utils.printers import print_error, print_info, print_warning
 
 _CLASS_MODULE_LIST = None
+# Lookups answered by the loaded list / that loaded the file
+_MODULE_LIST_STATS = {"hits": 0, "misses": 0}
+
+# Grams of length 1 to GRAM_SIZE are indexed, longer search terms are answered
+# by intersecting the postings of their trigrams
+GRAM_SIZE = 3
+
+
+class ModuleIndex:
+    """
+    Search index over module names, built once when the module list is loaded.
+
+    It holds the lowercased names, a sorted array of them for prefix queries and
+    an inverted index from every 1, 2 and 3 character gram to the names that
+    contain it, so substring, prefix and fuzzy queries never scan the whole list.
+    Results are returned in the order of the module list.
+    """
+
+    def __init__(self, names: list[str]):
+        self.names: list[str] = list(names)
+        self.lower_names: list[str] = [name.lower() for name in self.names]
+
+        # (lowercase name, position) sorted for binary search on prefixes
+        self._sorted: list[tuple[str, int]] = sorted(
+            (lower, i) for i, lower in enumerate(self.lower_names)
+        )
+        self._sorted_keys: list[str] = [lower for lower, _ in self._sorted]
+
+        # gram -> positions of the names containing it (ascending)
+        self._postings: dict[str, list[int]] = {}
+        for i, lower in enumerate(self.lower_names):
+            for gram in self._grams(lower):
+                self._postings.setdefault(gram, []).append(i)
+
+    @staticmethod
+    def _grams(text: str, size: int = GRAM_SIZE) -> set[str]:
+        """All distinct substrings of text with a length from 1 to size"""
+        return {
+            text[start : start + length]
+            for length in range(1, size + 1)
+            for start in range(len(text) - length + 1)
+        }
+
+    @staticmethod
+    def _trigrams(text: str) -> set[str]:
+        return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+    def substring(self, term: str) -> list[str]:
+        """Names containing term (case insensitive)"""
+        term = term.lower()
+
+        if not term:
+            return list(self.names)
+
+        if len(term) <= GRAM_SIZE:
+            return [self.names[i] for i in self._postings.get(term, [])]
+
+        postings = [self._postings.get(gram) for gram in self._trigrams(term)]
+        if any(posting is None for posting in postings):
+            return []
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        # Having all trigrams does not mean they are adjacent, verify the survivors
+        return [
+            self.names[i] for i in sorted(candidates) if term in self.lower_names[i]
+        ]
+
+    def prefix(self, term: str) -> list[str]:
+        """Names starting with term (case insensitive)"""
+        term = term.lower()
+        start = bisect.bisect_left(self._sorted_keys, term)
+        end = bisect.bisect_left(self._sorted_keys, term + "\uffff", lo=start)
+        return [self.names[i] for i in sorted(i for _, i in self._sorted[start:end])]
+
+    def fuzzy(self, term: str, limit: int = 10) -> list[str]:
+        """Names sharing the most trigrams with term, best match first
+
+        Only names that share at least one trigram are considered, the score is
+        the Jaccard similarity of the trigram sets.
+        """
+        term = term.lower()
+        term_grams = self._trigrams(term) if len(term) >= GRAM_SIZE else {term}
+
+        shared: dict[int, int] = {}
+        for gram in term_grams:
+            for i in self._postings.get(gram, []):
+                shared[i] = shared.get(i, 0) + 1
+
+        def score(i: int) -> float:
+            name_grams = max(len(self.lower_names[i]) - GRAM_SIZE + 1, 1)
+            return shared[i] / (len(term_grams) + name_grams - shared[i])
+
+        ranked = sorted(shared, key=lambda i: (-score(i), i))
+        return [self.names[i] for i in ranked[:limit]]
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance (insertions, deletions and substitutions) between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+
+    return previous[-1]
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over strings with the (case insensitive) edit distance.
+
+    A query only visits the subtrees whose edge distance lies within the search
+    radius of the distance to the current node, so finding the close matches of
+    a typo does not compute the distance to every word.
+    """
+
+    def __init__(self, words: list[str] | None = None):
+        # node: (word, lowercase word, {distance: child node})
+        self._root: tuple[str, str, dict] | None = None
+        self.size = 0
+        for word in words or []:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        lower = word.lower()
+
+        if self._root is None:
+            self._root = (word, lower, {})
+            self.size += 1
+            return
+
+        node = self._root
+        while True:
+            distance = levenshtein(lower, node[1])
+            if distance == 0:
+                return  # already in the tree
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (word, lower, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, term: str, max_distance: int) -> list[tuple[int, str]]:
+        """All words within max_distance of term as (distance, word), closest first"""
+        if self._root is None:
+            return []
+
+        term = term.lower()
+        matches = []
+        stack = [self._root]
+
+        while stack:
+            word, lower, children = stack.pop()
+            distance = levenshtein(term, lower)
+            if distance <= max_distance:
+                matches.append((distance, word))
+
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+
+        return sorted(matches)
+
+
+def suggestion_distance(term: str) -> int:
+    """How many edits a suggestion may be away from what the user typed"""
+    return max(1, len(term) // 3)
 
 
 class ModuleList:
@@ -16,8 +200,30 @@ class ModuleList:
 
     MODULE_LIST_CACHE = None
 
-    def __init__(self, modules: dict[str, list[str]]):
+    def __init__(self, modules: Mapping[str, list[str]]):
         self.modules = modules
+        self._index: ModuleIndex | None = None
+        # The binary module list carries its content hash in the header
+        self._version: str | None = getattr(modules, "content_hash", None)
+        self._name_tree: BKTree | None = None
+
+    @property
+    def index(self) -> ModuleIndex:
+        """Search index over the module names, built on first use"""
+        if self._index is None:
+            self._index = ModuleIndex(list(self.modules))
+        return self._index
+
+    @property
+    def version(self) -> str:
+        """
+        Content hash of the module list, changes whenever a module or version changes.
+        Computed once on first access.
+        """
+        if self._version is None:
+            self._version = module_list_hash(self.modules)
+
+        return self._version
 
     def get_modules(self) -> list[str]:
         """
@@ -49,6 +255,9 @@ class ModuleList:
         """
         return self.modules.get(module_name, [])
 
+    def has_module(self, module_name: str) -> bool:
+        return module_name in self.modules
+
     def search_modules(self, search_term: str) -> list[str]:
         """
         Searches for modules that contain the given search term in their names.
@@ -59,11 +268,93 @@ class ModuleList:
         Returns:
             list[str]: A list of module names that match the search term.
         """
-        return [
-            module
-            for module in self.get_modules()
-            if search_term.lower() in module.lower()
-        ]
+        return self.index.substring(search_term)
+
+    def search_modules_prefix(self, search_term: str) -> list[str]:
+        """
+        Searches for modules whose names start with the given search term.
+
+        Args:
+            search_term (str): The prefix to search for in module names.
+
+        Returns:
+            list[str]: A list of module names that start with the search term.
+        """
+        return self.index.prefix(search_term)
+
+    def search_modules_fuzzy(self, search_term: str, limit: int = 10) -> list[str]:
+        """
+        Searches for modules with names similar to the search term (shared trigrams).
+
+        Args:
+            search_term (str): The term to compare the module names to.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[str]: Module names, the most similar first.
+        """
+        return self.index.fuzzy(search_term, limit)
+
+    def suggest_modules(self, module_name: str, limit: int = 5) -> list[str]:
+        """
+        "Did you mean" suggestions for an unknown module name.
+
+        The closest names by edit distance come first, completed with the names
+        that start with module_name and then with the shortest names containing
+        it. The BK-tree over the names is built on the first call.
+
+        Args:
+            module_name (str): The module name the user typed.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list[str]: Suggested module names, the best first.
+        """
+        if self._name_tree is None:
+            self._name_tree = BKTree(self.index.names)
+
+        matches = self._name_tree.search(
+            module_name, suggestion_distance(module_name)
+        )
+        suggestions = [name for _, name in matches[:limit]]
+
+        for name in self.index.prefix(module_name):
+            if len(suggestions) >= limit:
+                break
+            if name not in suggestions:
+                suggestions.append(name)
+
+        if len(suggestions) < limit:
+            for name in sorted(self.index.substring(module_name), key=len):
+                if len(suggestions) >= limit:
+                    break
+                if name not in suggestions:
+                    suggestions.append(name)
+
+        return suggestions
+
+    def suggest_versions(
+        self, module_name: str, version: str, limit: int = 5
+    ) -> list[str]:
+        """
+        "Did you mean" suggestions for an unknown version of a known module.
+
+        Args:
+            module_name (str): Name of the module.
+            version (str): The version the user typed.
+            limit (int): Maximum number of suggestions.
+
+        Returns:
+            list[str]: The versions of the module closest to version.
+        """
+        versions = [str(v) for v in self.get_module_versions(module_name)]
+        if version is None:
+            return versions[:limit]
+
+        ranked = sorted(
+            versions, key=lambda v: (levenshtein(version.lower(), v.lower()), v)
+        )
+        return ranked[:limit]
 
     def search_modules_with_versions(self, search_term: str) -> dict[str, list[str]]:
         """
@@ -87,6 +378,8 @@ def generate_module_list() -> list[str]:
     Returns:
     List[str]: A list containing the names of all modules available.
     """
+    import subprocess
+
     try:
         # Execute the 'module spider' command
         command = "module spider"
@@ -112,6 +405,7 @@ def generate_module_list() -> list[str]:
         # Save the list to a file
         save_to_pickle(module_list, "all_modules.pkl")
         save_list_to_yaml(module_list, "all_modules.yaml")
+        save_to_binary(module_list, "all_modules.bin")
 
         return module_list
 
@@ -168,6 +462,7 @@ def save_list_to_yaml(module_list: list[str, list[str]], filename: str) -> None:
         module_list (list[str, list[str]]): List of modules to save.
         filename (str): Name of the file to save the list to.
     """
+    import yaml
 
     with open(filename, "w") as file:
         yaml.dump(module_list, file)
@@ -175,25 +470,40 @@ def save_list_to_yaml(module_list: list[str, list[str]], filename: str) -> None:
 
 def save_to_pickle(module_list: list[str, list[str]], filename: str) -> None:
     """Save module list as a binary pickle file for faster loading."""
+    import pickle
+
     with open(filename, "wb") as file:
         pickle.dump(module_list, file)
 
 
 def load_module_list(
     path: str = "systemConfig/all_modules",
-) -> dict[str, list[str]]:
-    """This function loads the module list from a YAML file.
+) -> Mapping[str, list[str]]:
+    """This function loads the module list, preferring the memory-mapped binary file
+    and falling back to the pickle and then the YAML file.
 
     Args:
-        filename (str): Name of the file to load the list from.
+        filename (str): Name of the file to load the list from (without extension).
 
     Returns:
-        dict[str, list[str]]: A dictionary containing the hierarchical structure of modules.
+        Mapping[str, list[str]]: Module names and their versions.
     """
 
     current_dir = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(current_dir, "../", path)
 
+    # The binary file is mapped, nothing is deserialized up front
+    try:
+        return MappedModuleList(path + ".bin")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Binary module list not usable ({e}), loading from pickle")
+
+    # The fallbacks are only imported when the binary file is missing
+    import pickle
+    import yaml
+
     # Check if file exists with pickle
     try:
         with open(path + ".pkl", "rb") as file:
@@ -216,12 +526,52 @@ def get_module_list() -> ModuleList:
     global _CLASS_MODULE_LIST
 
     if _CLASS_MODULE_LIST is None:
+        _MODULE_LIST_STATS["misses"] += 1
         module_list = load_module_list()
         _CLASS_MODULE_LIST = ModuleList(module_list)
+    else:
+        _MODULE_LIST_STATS["hits"] += 1
 
     return _CLASS_MODULE_LIST
 
 
+def module_list_cache_stats() -> dict:
+    """Hits and misses of get_module_list in this process"""
+    return dict(_MODULE_LIST_STATS)
+
+
+def clear_module_list_cache() -> None:
+    """Drop the cached module list (the next access loads the file again)"""
+    global _CLASS_MODULE_LIST
+
+    _CLASS_MODULE_LIST = None
+    ModuleList.MODULE_LIST_CACHE = None
+
+
+def search_module(name: str) -> list[str]:
+    """
+    This function is used to search for a module in the system.
+    Args:
+        module_name (str): The name of the module to search for.
+    Returns:
+        list[str]: A list of module names that match the search query.
+    """
+    module_list = get_module_list()
+    if module_list is None:
+        print_error("Module list is None")
+        return []
+
+    # Search for the module in the module list
+    search_results: list[str] = module_list.search_modules_with_versions(name)
+    if not search_results:
+        print_warning("No modules found for '%s'", name)
+        return []
+
+    print_info("Found %s modules for '%s':", len(search_results), name)
+
+    return search_results
+
+
 if __name__ == "__main__":
     generate_module_list()
     # module_list = get_module_list()
@@ -1,45 +1,215 @@
+import os
+import sys
+import time
+
 import utils.colors as COLOR_MAP
 
+"""
+Level-gated console output of Slurmify.
+
+The print_* helpers take a message and optional %-style arguments that are
+only formatted when the message is printed:
+
+    print_debug("Checking %s against %s", attr_name, expected_type)
+
+A disabled call returns after one comparison, so the validators can log in
+their hot loops without paying for string formatting nobody sees.
+
+Levels can be set per module, and the output can be colored text (CLI) or
+one JSON object per line (API):
+
+    SLURMIFY_LOG_LEVEL=info,utils.validators=debug
+    SLURMIFY_LOG_FORMAT=json
+
+Without SLURMIFY_LOG_LEVEL nothing is printed until enable_printing() (-v),
+except calls with debug=True, which always print.
+"""
+
+DEBUG = 10
+INFO = 20
+SUCCESS = 25
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "success": SUCCESS,
+    "warning": WARNING,
+    "error": ERROR,
+    "off": OFF,
+}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+TEXT_FORMATS = {
+    DEBUG: f"{COLOR_MAP.MAGENTA} [DEBUG] {{}}{COLOR_MAP.RESET}",
+    INFO: f"{COLOR_MAP.BLUE} [INFO] {{}}{COLOR_MAP.RESET}",
+    SUCCESS: f"{COLOR_MAP.GREEN} [SUCCESS] {{}} {COLOR_MAP.RESET}",
+    WARNING: f"{COLOR_MAP.YELLOW} [WARNING] {{}}{COLOR_MAP.RESET}",
+    ERROR: f"{COLOR_MAP.RED} [ERROR] {{}}{COLOR_MAP.RESET}",
+}
+
 # Initialize the global variable
-enable_print = False  # Default to no printing
+enable_print = False  # True while verbose printing is on, see enable_printing
+
+_default_level = OFF
+# Default level from SLURMIFY_LOG_LEVEL, restored by enable_printing(False)
+_configured_level = OFF
+_module_levels: dict[str, int] = {}
+# Lowest level any module prints, checked first so disabled calls return at once
+_threshold = OFF
+# module name -> effective level, filled on first use
+_resolved_levels: dict[str, int] = {}
+_output_format = "text"
+
+
+def _parse_level(name: str | int) -> int:
+    if isinstance(name, int):
+        return name
+    try:
+        return LEVELS[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown log level '{name}', use one of {', '.join(LEVELS)}"
+        ) from None
+
+
+def _update_threshold() -> None:
+    global _threshold
+    _threshold = min([_default_level, *_module_levels.values()])
+    _resolved_levels.clear()
+
+
+def set_level(level: str | int, module: str | None = None) -> None:
+    """Set the lowest level that is printed
+
+    Args:
+        level (str | int): debug, info, success, warning, error or off
+        module (str, optional): Only for this module and its submodules
+            (e.g. "utils.validators"), defaults to every module
+    """
+    global _default_level
+
+    if module is None:
+        _default_level = _parse_level(level)
+    else:
+        _module_levels[module] = _parse_level(level)
+    _update_threshold()
+
+
+def configure_logging(
+    levels: str | None = None, output_format: str | None = None
+) -> None:
+    """Configure the output from a level spec and a format
+
+    Args:
+        levels (str, optional): "info" or "warning,utils.validators=debug",
+            entries with a module name set that module's level
+        output_format (str, optional): "text" or "json"
+    """
+    global _configured_level, _output_format
+
+    if levels:
+        for entry in filter(None, (part.strip() for part in levels.split(","))):
+            module, _, level = entry.rpartition("=")
+            set_level(level, module or None)
+        _configured_level = _default_level
+
+    if output_format:
+        if output_format not in ("text", "json"):
+            raise ValueError(f"Unknown log format '{output_format}', use text or json")
+        _output_format = output_format
 
 
 def enable_printing(enable=True) -> None:
     """Enable printing for debugging"""
     global enable_print
     enable_print = enable
+    set_level(DEBUG if enable else _configured_level)
 
 
-def print_error(error: str, debug: bool = enable_print) -> None:
-    """Print error message in bold red color"""
+def _module_level(module: str) -> int:
+    level = _resolved_levels.get(module)
+    if level is not None:
+        return level
 
-    if debug or enable_print:
-        print(f"{COLOR_MAP.RED} [ERROR] {error}{COLOR_MAP.RESET}")
+    level = _default_level
+    name = module
+    while name:
+        if name in _module_levels:
+            level = _module_levels[name]
+            break
+        name = name.rpartition(".")[0]
 
+    _resolved_levels[module] = level
+    return level
 
-def print_warning(warning: str, debug: bool = enable_print) -> None:
-    """Print warning message in bold yellow color"""
 
-    if debug or enable_print:
-        print(f"{COLOR_MAP.YELLOW} [WARNING] {warning}{COLOR_MAP.RESET}")
+def json_record(level: str, module: str, message: str, **extra) -> str:
+    """One log line as JSON, shared with the API's logging formatter"""
+    import json
 
+    return json.dumps(
+        {
+            "time": round(time.time(), 3),
+            "level": level,
+            "module": module,
+            "message": message,
+            **extra,
+        },
+        default=str,
+    )
 
-def print_info(info: str, debug: bool = enable_print) -> None:
-    """Print info message in bold green color"""
 
-    if debug or enable_print:
-        print(f"{COLOR_MAP.BLUE} [INFO] {info}{COLOR_MAP.RESET}")
+def _emit(level: int, message, args: tuple, force: bool) -> None:
+    # Two frames up is the caller of print_*
+    module = sys._getframe(2).f_globals.get("__name__", "")
 
+    if not force and level < _module_level(module):
+        return
+
+    text = str(message)
+    if args:
+        try:
+            text = text % args
+        except (TypeError, ValueError):
+            text = " ".join([text, *map(str, args)])
+
+    if _output_format == "json":
+        print(json_record(LEVEL_NAMES[level], module, text))
+    else:
+        print(TEXT_FORMATS[level].format(text))
+
+
+def print_error(error: str, *args, debug: bool = False) -> None:
+    """Print error message in bold red color"""
+    if ERROR >= _threshold or debug:
+        _emit(ERROR, error, args, debug)
+
+
+def print_warning(warning: str, *args, debug: bool = False) -> None:
+    """Print warning message in bold yellow color"""
+    if WARNING >= _threshold or debug:
+        _emit(WARNING, warning, args, debug)
 
-def print_success(success: str, debug: bool = enable_print) -> None:
-    """Print success message in bold blue color"""
 
-    if debug or enable_print:
-        print(f"{COLOR_MAP.GREEN} [SUCCESS] {success} {COLOR_MAP.RESET}")
+def print_info(info: str, *args, debug: bool = False) -> None:
+    """Print info message in bold green color"""
+    if INFO >= _threshold or debug:
+        _emit(INFO, info, args, debug)
 
 
-def print_debug(debugStr: str, debug: bool = enable_print) -> None:
+def print_success(success: str, *args, debug: bool = False) -> None:
+    """Print success message in bold blue color"""
+    if SUCCESS >= _threshold or debug:
+        _emit(SUCCESS, success, args, debug)
+
+
+def print_debug(debugStr: str, *args, debug: bool = False) -> None:
     """Print debug message in bold purple color"""
+    if DEBUG >= _threshold or debug:
+        _emit(DEBUG, debugStr, args, debug)
+
 
-    if debug or enable_print:
-        print(f"{COLOR_MAP.MAGENTA} [DEBUG] {debugStr}{COLOR_MAP.RESET}")
+configure_logging(os.getenv("SLURMIFY_LOG_LEVEL"), os.getenv("SLURMIFY_LOG_FORMAT"))
@@ -0,0 +1,520 @@
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows has no resource limits
+    resource = None
+
+from errorMsgs.StructuralErrors import (
+    sandboxBusyMsg,
+    sandboxTerminatedMsg,
+    sandboxTimeoutMsg,
+    unsupportedJobObjectsMsg,
+)
+from utils.config_info import Environment, Job, Logs, Module, Modules, Resources, System
+from utils.printers import print_error, print_warning
+from utils.slurmifyLoader import load_python_conf_source
+from utils.slurmifyValidationReport import ErrorEntry, SlurmifyValidationReport
+from utils.validationTrace import TraceSpan
+
+"""
+Executes untrusted configuration files in pre-forked worker processes.
+
+A configuration is Python code, loading it means running it. In the API this
+used to happen inside the server process, so a config could hang the server,
+leak memory or change globals like utils.func.skip_modules. The workers of
+ConfigSandboxPool run the config with CPU time and memory limits, the parent
+enforces the wall time, and only the jobs come back.
+
+Nothing a worker sends is unpickled: the config code can change any class in
+the worker, so a pickle from there could run code in the API process. The
+worker sends the jobs and the error report as JSON, built from the _fields of
+the Slurmify classes, and the parent rebuilds the objects from that data.
+
+Workers are forked from a forkserver that already imported the Slurmify classes
+and the validators, so no import cost is paid per config. A worker is replaced
+after max_tasks configs, or right away if it was killed or hit a limit.
+"""
+
+# Model fields that hold other models (or lists of them), the other fields
+# hold plain values: str, int, float, bool, None or a list of those
+_MODEL_FIELDS: dict[type, dict[str, type]] = {
+    Job: {"system": System, "environments": Environment, "logs": Logs, "modules": Modules},
+    System: {"resources": Resources},
+    Resources: {},
+    Logs: {},
+    Modules: {"modules": Module},
+    Module: {},
+    Environment: {},
+}
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+# Imported once in the forkserver so every worker starts warm
+SANDBOX_PRELOAD = [
+    "utils.config_info",
+    "utils.slurmifyLoader",
+    "utils.validators",
+]
+
+
+def load_config_jobs(
+    source: str, filename: str
+) -> tuple[list[Job] | None, SlurmifyValidationReport | None]:
+    """Execute a config source and return its jobs
+
+    Returns:
+        tuple: (list of jobs or None, validation report if loading failed)
+    """
+    module, error_report = load_python_conf_source(source, filename)
+
+    if module is None:
+        return None, error_report
+
+    try:
+        jobs: list[Job] = module.Jobs.get_jobs()
+    except Exception:
+        return None, error_report
+
+    return jobs, error_report
+
+
+class SandboxDataError(ValueError):
+    """A job holds a value that cannot be sent back from the sandbox"""
+
+
+def _plain_value(value, where: str):
+    if type(value) in _PLAIN_TYPES:
+        return value
+    if type(value) is list and all(type(item) in _PLAIN_TYPES for item in value):
+        return list(value)
+    raise SandboxDataError(f"{where} is a {type(value).__name__}")
+
+
+def _model_to_data(obj, cls: type, where: str, seen: dict) -> dict:
+    # Exactly the Slurmify class, a subclass could do anything when it is used
+    if type(obj) is not cls:
+        raise SandboxDataError(
+            f"{where} is a {type(obj).__name__}, expected {cls.__name__}"
+        )
+
+    # An object used twice (jobs sharing one Resources) is sent once, the
+    # validators rely on that sharing (see func.start_validation)
+    if id(obj) in seen:
+        return {"ref": seen[id(obj)]}
+    seen[id(obj)] = len(seen)
+
+    fields = {}
+    nested = _MODEL_FIELDS[cls]
+    for name in cls._fields:
+        value = getattr(obj, name)
+        path = f"{where}.{name}"
+        if name not in nested or value is None:
+            fields[name] = _plain_value(value, path)
+        elif type(value) is list:
+            fields[name] = [
+                _model_to_data(item, nested[name], f"{path}[{index}]", seen)
+                for index, item in enumerate(value)
+            ]
+        else:
+            fields[name] = _model_to_data(value, nested[name], path, seen)
+    return {"fields": fields}
+
+
+def _model_from_data(data, cls: type, where: str, objects: list):
+    if type(data) is dict and set(data) == {"ref"}:
+        ref = data["ref"]
+        if type(ref) is not int or not 0 <= ref < len(objects):
+            raise SandboxDataError(f"{where} refers to an unknown object")
+        if type(objects[ref]) is not cls:
+            raise SandboxDataError(f"{where} is not a {cls.__name__}")
+        return objects[ref]
+
+    if type(data) is not dict or set(data) != {"fields"}:
+        raise SandboxDataError(f"{where} is not a {cls.__name__}")
+    fields = data["fields"]
+    if type(fields) is not dict or set(fields) != set(cls._fields):
+        raise SandboxDataError(f"{where} is not a {cls.__name__}")
+
+    obj = cls.__new__(cls)
+    # Numbered in the order the worker first sent the objects
+    objects.append(obj)
+    nested = _MODEL_FIELDS[cls]
+    for name in cls._fields:
+        value = fields[name]
+        path = f"{where}.{name}"
+        if name not in nested or value is None:
+            value = _plain_value(value, path)
+        elif type(value) is list:
+            value = [
+                _model_from_data(item, nested[name], f"{path}[{index}]", objects)
+                for index, item in enumerate(value)
+            ]
+        else:
+            value = _model_from_data(value, nested[name], path, objects)
+        setattr(obj, name, value)
+    return obj
+
+
+def jobs_to_data(jobs) -> list[dict]:
+    """Plain data (dicts, lists, str, int, ...) of the jobs of a config
+
+    Raises:
+        SandboxDataError: A job is not exactly a Job or holds other objects
+    """
+    if type(jobs) is not list:
+        raise SandboxDataError(f"Jobs is a {type(jobs).__name__}, expected list")
+    seen: dict[int, int] = {}
+    return [
+        _model_to_data(job, Job, f"Jobs[{index}]", seen)
+        for index, job in enumerate(jobs)
+    ]
+
+
+def jobs_from_data(data) -> list[Job]:
+    """Rebuild the jobs sent by a sandbox worker, see jobs_to_data
+
+    Raises:
+        SandboxDataError: The data does not have the shape of a list of jobs
+    """
+    if type(data) is not list:
+        raise SandboxDataError("Jobs is not a list")
+    objects: list = []
+    return [
+        _model_from_data(item, Job, f"Jobs[{index}]", objects)
+        for index, item in enumerate(data)
+    ]
+
+
+def report_to_data(report: SlurmifyValidationReport) -> dict:
+    """Plain data of a loading report (errors, messages and timings)"""
+    return {
+        "job_name": str(report.job_name),
+        "valid": bool(report.valid),
+        "messages": [str(message) for message in report.messages],
+        "errors": [
+            {
+                "msgFunctionName": entry.msgFunctionName,
+                "critical": bool(entry.critical),
+                "errormsg": entry.errormsg,
+                "warning": entry.warning,
+                "info": entry.info,
+            }
+            for entry in report.errors
+        ],
+        "spans": [
+            [span.name, span.start, span.duration, span.depth, span.args]
+            for span in report.trace.spans
+        ],
+    }
+
+
+def _texts(value) -> list[str] | None:
+    # Message lists of an ErrorEntry, whatever shape the worker sent
+    if value is None:
+        return None
+    if type(value) is list:
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def report_from_data(data: dict) -> SlurmifyValidationReport:
+    """Rebuild a report sent by a sandbox worker, see report_to_data"""
+    report = SlurmifyValidationReport(str(data["job_name"]))
+    for entry in data["errors"]:
+        report.add_error_entry(
+            ErrorEntry(
+                errormsg=_texts(entry["errormsg"]) or [],
+                critical=bool(entry["critical"]),
+                warning=_texts(entry["warning"]),
+                info=_texts(entry["info"]),
+                msgFunctionName=str(entry["msgFunctionName"]),
+            )
+        )
+    if not data["valid"]:
+        report.mark_invalid()
+    report.messages = [str(message) for message in data["messages"]]
+    report.trace.spans = [
+        TraceSpan(str(name), int(start), int(duration), int(depth), dict(args))
+        for name, start, duration, depth, args in data["spans"]
+    ]
+    return report
+
+
+def _result_to_message(result) -> bytes:
+    jobs, report = result
+    message = {
+        "jobs": None if jobs is None else jobs_to_data(jobs),
+        "report": None if report is None else report_to_data(report),
+    }
+    # default=str: messages and span args of the report may hold other objects
+    return json.dumps(message, default=str).encode("utf-8")
+
+
+def _current_address_space() -> int:
+    """Virtual memory used by this process in bytes (0 if unknown)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _sandbox_worker(conn, cpu_time: int | None, memory: int | None, max_tasks: int):
+    """Main loop of a sandbox worker process"""
+
+    if memory:
+        # RLIMIT_AS caps the virtual memory, on top of what the worker already uses
+        limit = _current_address_space() + memory
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    for _ in range(max_tasks):
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+
+        if message is None:
+            return
+
+        source, filename = message
+
+        if cpu_time:
+            # RLIMIT_CPU counts the whole process so move it forward for every config
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = int(usage.ru_utime + usage.ru_stime)
+            resource.setrlimit(
+                resource.RLIMIT_CPU, (used + cpu_time, used + cpu_time + 1)
+            )
+
+        try:
+            result = load_config_jobs(source, filename)
+        except MemoryError:
+            report = SlurmifyValidationReport("ConfigValidation")
+            report.add_error_entry(sandboxTerminatedMsg("memory limit exceeded"))
+            result = (None, report)
+
+        try:
+            message = _result_to_message(result)
+        except Exception as e:
+            report = SlurmifyValidationReport("ConfigValidation")
+            report.add_error_entry(unsupportedJobObjectsMsg(e))
+            message = _result_to_message((None, report))
+
+        conn.send_bytes(message)
+
+
+class _SandboxWorker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                self.process.kill()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ConfigSandboxPool:
+    """Pool of pre-forked processes that execute untrusted configuration files.
+
+    Attributes:
+        size (int): Number of worker processes
+        cpu_time (int | None): CPU seconds a config may use
+        wall_time (float | None): Seconds a config may take in total
+        memory (int | None): Bytes of memory a config may allocate
+        max_tasks (int): Configs a worker executes before it is replaced
+        acquire_timeout (float | None): Seconds a config waits for a free worker
+        enabled (bool): If False (or not supported here) configs run in-process
+        timeouts (int): Number of configs stopped by the wall time limit
+        terminations (int): Number of workers that died while running a config
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        cpu_time: int | None = 10,
+        wall_time: float | None = 15,
+        memory: int | None = 512 * 1024 * 1024,
+        max_tasks: int = 100,
+        enabled: bool = True,
+        acquire_timeout: float | None = 60,
+    ):
+        self.size = size
+        self.cpu_time = cpu_time
+        self.wall_time = wall_time
+        self.memory = memory
+        self.max_tasks = max_tasks
+        self.acquire_timeout = acquire_timeout
+        self.enabled = enabled and self.is_supported()
+        self.timeouts = 0
+        self.terminations = 0
+        self._context = None
+        self._idle: queue.Queue = queue.Queue()
+        self._workers: list[_SandboxWorker] = []
+        self._owner_pid: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_supported() -> bool:
+        return (
+            resource is not None
+            and "forkserver" in multiprocessing.get_all_start_methods()
+        )
+
+    def start(self) -> None:
+        """Pre-fork the workers (does nothing if already started in this process)
+
+        Raises:
+            RuntimeError: The pool was started in another process. A forked
+                copy (e.g. a ProcessPoolExecutor worker) shares the parent's
+                forkserver and workers, it must not start a pool of its own.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+
+            if self._owner_pid is not None:
+                raise RuntimeError(
+                    f"The config sandbox was started in process {self._owner_pid}, "
+                    "it cannot be used from a forked process"
+                )
+
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(SANDBOX_PRELOAD)
+
+            workers: list[_SandboxWorker] = []
+            try:
+                for _ in range(self.size):
+                    workers.append(self._spawn())
+            except BaseException:
+                for worker in workers:
+                    worker.stop(kill=True)
+                raise
+
+            # Only a fully started pool is marked as owned by this process
+            self._idle = queue.Queue()
+            self._workers = workers
+            for worker in workers:
+                self._idle.put(worker)
+            self._owner_pid = os.getpid()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._owner_pid != os.getpid():
+                return
+
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                worker.stop()
+
+            self._owner_pid = None
+
+    def _spawn(self) -> _SandboxWorker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_sandbox_worker,
+            args=(child_conn, self.cpu_time, self.memory, self.max_tasks),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _SandboxWorker(process, parent_conn)
+
+    def load_jobs(
+        self, source: str, filename: str = "<slurmify-config>"
+    ) -> tuple[list[Job] | None, SlurmifyValidationReport | None]:
+        """Execute a config source in a sandbox worker and return its jobs
+
+        Falls back to executing in this process when the sandbox is disabled.
+
+        Returns:
+            tuple: (list of jobs or None, validation report if loading failed)
+        """
+        if not self.enabled:
+            return load_config_jobs(source, filename)
+
+        self.start()
+
+        try:
+            worker: _SandboxWorker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            print_error("No sandbox worker free for %s", filename)
+            return None, self._error_report(sandboxBusyMsg(self.acquire_timeout))
+
+        try:
+            if not worker.process.is_alive() or worker.tasks >= self.max_tasks:
+                worker.stop()
+                worker = self._spawn()
+
+            worker.conn.send((source, filename))
+            worker.tasks += 1
+
+            if not worker.conn.poll(self.wall_time):
+                print_error("Config %s exceeded the wall time limit", filename)
+                self.timeouts += 1
+                worker.stop(kill=True)
+                worker = self._spawn()
+                return None, self._error_report(sandboxTimeoutMsg(self.wall_time))
+
+            try:
+                message = worker.conn.recv_bytes()
+            except (EOFError, OSError):
+                worker.process.join(1)
+                reason = self._termination_reason(worker.process.exitcode)
+                print_warning("Sandbox worker for %s died: %s", filename, reason)
+                self.terminations += 1
+                worker.stop(kill=True)
+                worker = self._spawn()
+                return None, self._error_report(sandboxTerminatedMsg(reason))
+
+            return self._result_from_message(message, filename)
+        finally:
+            self._idle.put(worker)
+
+    def _result_from_message(
+        self, message: bytes, filename: str
+    ) -> tuple[list[Job] | None, SlurmifyValidationReport | None]:
+        # Plain JSON only, never unpickle what the config code could have built
+        try:
+            data = json.loads(message)
+            jobs = None if data["jobs"] is None else jobs_from_data(data["jobs"])
+            report = None if data["report"] is None else report_from_data(data["report"])
+        except (ValueError, KeyError, TypeError) as e:
+            print_error("Invalid result from the sandbox worker for %s", filename)
+            return None, self._error_report(unsupportedJobObjectsMsg(e))
+        return jobs, report
+
+    @staticmethod
+    def _termination_reason(exitcode: int | None) -> str:
+        if exitcode == -signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        if exitcode == -signal.SIGKILL:
+            return "killed (probably out of memory)"
+        return f"worker exited with code {exitcode}"
+
+    @staticmethod
+    def _error_report(error_entry) -> SlurmifyValidationReport:
+        report = SlurmifyValidationReport("ConfigValidation")
+        report.add_error_entry(error_entry)
+        return report
@@ -0,0 +1,302 @@
+from operator import attrgetter
+from typing import Callable, Iterable, Iterator
+
+from utils.config_info import Job
+from utils.printers import print_debug, print_warning
+
+"""
+Streaming SLURM script generation.
+
+A script is produced as a sequence of fragments instead of one growing string.
+The layout of a script only depends on which attributes the job sets (the
+resources that are not None/0, the log files, whether there are environments
+and modules, and the kind of exec_command). That set of attributes is the
+template key. The first job with a given key compiles a template: the constant
+parts (shebang, section banners, "#SBATCH --cpus-per-task=" and so on) are
+pre-rendered and merged, and only getters for the job values are left.
+Rendering a job is then a walk over the template that yields fragments.
+
+    for fragment in iter_slurm_script(job, slurm_translation):
+        ...
+
+write_slurm_script sends the fragments straight to a file or a socket, so no
+intermediate string of the whole script is built.
+"""
+
+SCRIPT_HEADER = "#!/bin/bash -l"
+
+JOB_HEADER = """
+#==============================================================================#
+#                                                                              #
+#                         SLURM JOB CONFIGURATION                              #
+#                                                                              #
+#==============================================================================#
+"""
+
+RESOURCE_HEADER = """
+#------------------------------------------------------------------------------#
+#                           RESOURCE CONFIGURATION                             #
+#------------------------------------------------------------------------------#
+"""
+
+LOG_HEADER = """
+#------------------------------------------------------------------------------#
+#                               LOG SETTINGS                                   #
+#------------------------------------------------------------------------------#
+"""
+
+ENV_HEADER = """
+#==============================================================================#
+#                           ENVIRONMENT SETUP                                  #
+#==============================================================================#
+"""
+
+MODULE_HEADER = """
+#==============================================================================#
+#                            MODULE LOADING                                    #
+#==============================================================================#
+"""
+
+EXEC_HEADER = """
+#==============================================================================#
+#                           EXECUTION COMMAND                                  #
+#==============================================================================#
+"""
+
+# A template part is a constant fragment or a function yielding the job's fragments
+Part = str | Callable[[Job], Iterable[str]]
+
+# id(slurm_translation) -> (slurm_translation, {template key: parts}). The
+# translation is kept referenced so its id cannot be reused by another mapping.
+_TEMPLATE_CACHE: dict[int, tuple[dict, dict[tuple, tuple[Part, ...]]]] = {}
+# Translations are replaced when conf.yaml changes, old ones are dropped past this
+MAX_CACHED_TRANSLATIONS = 8
+
+
+def _present_attributes(obj) -> tuple[str, ...]:
+    """Public attributes of obj that are set (not None and not 0)"""
+    return tuple(
+        name
+        for name, value in obj.to_dict().items()
+        if not name.startswith("_") and value is not None and value != 0
+    )
+
+
+def template_key(job: Job) -> tuple:
+    """The attributes of a job that decide the layout of its script"""
+    return (
+        _present_attributes(job.system.resources),
+        None if job.logs is None else _present_attributes(job.logs),
+        job.environments is not None,
+        job.modules is not None,
+        isinstance(job.exec_command, str),
+    )
+
+
+def _value(path: str) -> Callable[[Job], Iterable[str]]:
+    getter = attrgetter(path)
+    return lambda job: (str(getter(job)),)
+
+
+def _warn_untranslated(attr_name: str) -> None:
+    print_warning("Warning: No SLURM translation for '%s'", attr_name)
+    print_warning("         Using '%s' as SLURM option", attr_name)
+    print_warning("         Please check the SLURM documentation")
+    print_warning("         to ensure this is a valid option")
+    print_warning("         use at your own risk!")
+
+
+def _system_parts(key: tuple, slurm_translation: dict) -> list[Part]:
+    resource_names, log_names = key[0], key[1]
+
+    parts: list[Part] = [JOB_HEADER, "\n#SBATCH --job-name=", _value("name")]
+    parts.append(RESOURCE_HEADER)
+
+    for attr_name in resource_names:
+        slurm_option = slurm_translation.get(attr_name)
+        if not slurm_option:
+            _warn_untranslated(attr_name)
+            slurm_option = attr_name  # TODO: Ask user if he want to add it or just skip
+        parts.append(f"\n#SBATCH --{slurm_option}=")
+        parts.append(_value(f"system.resources.{attr_name}"))
+
+    if log_names is not None:  # logs are not required will be handled by slurm
+        parts.append(LOG_HEADER)
+        logs_options = slurm_translation.get("logs") or {}
+
+        for attr_name in log_names:
+            slurm_option = logs_options.get(attr_name)
+            if slurm_option is None:
+                _warn_untranslated(attr_name)
+                slurm_option = attr_name
+            print_debug("Log option: %s", slurm_option)
+            parts.append(f"\n#SBATCH --{slurm_option}=")
+            parts.append(_value(f"logs.{attr_name}"))
+
+    return parts
+
+
+def _environment_lines(job: Job) -> Iterator[str]:
+    for env in job.environments:
+        yield f"\n# {env.name} environment"
+        for command in env.commands:
+            yield f"\n{command}"
+
+
+def _module_lines(job: Job) -> Iterator[str]:
+    for module in job.modules.get_modules():
+        yield f"\nmodule load {module.name}"
+
+
+def _exec_lines(job: Job) -> Iterator[str]:
+    for command in job.exec_command:
+        yield f"\n{command}"
+
+
+def _environment_parts(key: tuple) -> list[Part]:
+    return [ENV_HEADER, _environment_lines] if key[2] else []
+
+
+def _module_parts(key: tuple) -> list[Part]:
+    return [MODULE_HEADER, _module_lines] if key[3] else []
+
+
+def _exec_parts(key: tuple) -> list[Part]:
+    if key[4]:
+        # A single command string is written without the section banner
+        return ["\n", _value("exec_command")]
+    return [EXEC_HEADER, _exec_lines]
+
+
+def _merge(parts: list[Part]) -> tuple[Part, ...]:
+    """Join neighbouring constant fragments into one"""
+    merged: list[Part] = []
+    for part in parts:
+        if isinstance(part, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += part
+        elif part != "":
+            merged.append(part)
+    return tuple(merged)
+
+
+def compile_template(key: tuple, slurm_translation: dict) -> tuple[Part, ...]:
+    """Build the template of a whole script for a template key"""
+    return _merge(
+        [SCRIPT_HEADER]
+        + _system_parts(key, slurm_translation)
+        + _environment_parts(key)
+        + _module_parts(key)
+        + _exec_parts(key)
+    )
+
+
+def compile_sections(
+    key: tuple, slurm_translation: dict
+) -> tuple[tuple[str, tuple[Part, ...]], ...]:
+    """Build the template of each script section for a template key
+
+    Joined in order the sections give the same script as compile_template,
+    they are kept apart so every section can be timed on its own.
+    """
+    return (
+        ("system", _merge([SCRIPT_HEADER] + _system_parts(key, slurm_translation))),
+        ("environment", _merge(_environment_parts(key))),
+        ("modules", _merge(_module_parts(key))),
+        ("exec", _merge(_exec_parts(key))),
+    )
+
+
+def _templates(slurm_translation: dict) -> dict:
+    entry = _TEMPLATE_CACHE.get(id(slurm_translation))
+    if entry is None or entry[0] is not slurm_translation:
+        if len(_TEMPLATE_CACHE) >= MAX_CACHED_TRANSLATIONS:
+            _TEMPLATE_CACHE.clear()
+        entry = _TEMPLATE_CACHE[id(slurm_translation)] = (slurm_translation, {})
+    return entry[1]
+
+
+def get_template(job: Job, slurm_translation: dict) -> tuple[Part, ...]:
+    """The compiled template for the layout of a job, compiled on first use"""
+    templates = _templates(slurm_translation)
+    key = template_key(job)
+    template = templates.get(key)
+    if template is None:
+        template = templates[key] = compile_template(key, slurm_translation)
+    return template
+
+
+def get_section_templates(
+    job: Job, slurm_translation: dict
+) -> tuple[tuple[str, tuple[Part, ...]], ...]:
+    """The compiled (section name, template) pairs for the layout of a job"""
+    templates = _templates(slurm_translation)
+    # Cached next to the whole-script templates, marked so the keys differ
+    key = ("sections", template_key(job))
+    sections = templates.get(key)
+    if sections is None:
+        sections = templates[key] = compile_sections(key[1], slurm_translation)
+    return sections
+
+
+def clear_template_cache() -> None:
+    """Drop every compiled template"""
+    _TEMPLATE_CACHE.clear()
+
+
+def render(parts: tuple[Part, ...], job: Job) -> Iterator[str]:
+    """Yield the fragments of a template filled with the values of a job"""
+    for part in parts:
+        if part.__class__ is str:
+            yield part
+        else:
+            yield from part(job)
+
+
+def iter_slurm_script(job: Job, slurm_translation: dict) -> Iterator[str]:
+    """Yield the fragments of the SLURM script of a job
+
+    Args:
+        job (Job): A validated job
+        slurm_translation (dict): SlurmInfo section of conf.yaml
+
+    Yields:
+        str: Script fragments, their concatenation is the script
+    """
+    return render(get_template(job, slurm_translation), job)
+
+
+def iter_system_section(job: Job, slurm_translation: dict) -> Iterator[str]:
+    """Fragments of the #SBATCH part (job name, resources, logs)"""
+    key = template_key(job)
+    return render(_merge(_system_parts(key, slurm_translation)), job)
+
+
+def iter_environment_section(job: Job) -> Iterator[str]:
+    return render(_merge(_environment_parts(template_key(job))), job)
+
+
+def iter_module_section(job: Job) -> Iterator[str]:
+    return render(_merge(_module_parts(template_key(job))), job)
+
+
+def iter_exec_section(job: Job) -> Iterator[str]:
+    return render(_merge(_exec_parts(template_key(job))), job)
+
+
+def write_slurm_script(job: Job, target, slurm_translation: dict) -> None:
+    """Write the script of a job to a text file or a connected socket
+
+    Args:
+        job (Job): A validated job
+        target: Object with a write method (file, io.StringIO, ...) or a socket
+        slurm_translation (dict): SlurmInfo section of conf.yaml
+    """
+    fragments = iter_slurm_script(job, slurm_translation)
+
+    if hasattr(target, "sendall"):
+        # Buffered, so the many small fragments become a few send calls
+        with target.makefile("w", encoding="utf-8") as stream:
+            stream.writelines(fragments)
+        return
+
+    target.writelines(fragments)
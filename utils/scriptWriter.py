@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable
+
+from utils.config_getters import load_config
+from utils.config_info import Job
+from utils.printers import print_debug, print_error
+from utils.scriptGenerator import iter_slurm_script
+
+"""
+Bulk writing of SLURM scripts.
+
+Writing thousands of scripts one generate_slurm_script call at a time costs a
+makedirs, an open and a close per job, and on Lustre/GPFS every one of those
+is a round trip to the metadata server. write_job_scripts creates the output
+directory once and writes the scripts from a thread pool, so the metadata
+latency of one file overlaps with the others.
+
+Each script is written to a temporary file in the output directory and renamed
+into place, so a reader (or sbatch) never sees a half written script, and
+hashed while it is written. The result is a manifest of the written scripts:
+
+    entries = write_job_scripts(jobs, "./out")
+    # [ManifestEntry(name="job_1", path="./out/job_1.sh", sha256="...", size=812)]
+
+The manifest is also saved as manifest.json next to the scripts.
+"""
+
+MANIFEST_NAME = "manifest.json"
+# Permission bits of written files, mkstemp alone would create them 0600
+FILE_MODE = 0o644
+# Threads writing scripts, the work is mostly waiting on the file system
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+@dataclass
+class ManifestEntry:
+    """One written script
+
+    Attributes:
+        name (str): Name of the job
+        path (str): Path of the script
+        sha256 (str): Hex digest of the script
+        size (int): Size of the script in bytes
+    """
+
+    name: str
+    path: str
+    sha256: str
+    size: int
+
+
+def write_atomic(
+    path: str, fragments: Iterable[str], mode: int | None = None, durable: bool = False
+) -> tuple[str, int]:
+    """Write fragments to path through a temporary file and a rename
+
+    Args:
+        path (str): Destination, replaced if it exists
+        fragments (Iterable[str]): Text written in order (UTF-8)
+        mode (int, optional): Permission bits of the file, defaults to FILE_MODE
+        durable (bool): fsync the file before the rename
+
+    Returns:
+        tuple[str, int]: sha256 hex digest and size in bytes of the file
+    """
+    directory, filename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{filename}.", suffix=".tmp", dir=directory or "."
+    )
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as file:
+            for fragment in fragments:
+                data = fragment.encode("utf-8")
+                digest.update(data)
+                size += len(data)
+                file.write(data)
+            file.flush()
+            os.fchmod(file.fileno(), FILE_MODE if mode is None else mode)
+            if durable:
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    return digest.hexdigest(), size
+
+
+def write_scripts(
+    scripts: Iterable[tuple[str, Callable[[], Iterable[str]]]],
+    output_path: str = "./out",
+    workers: int | None = None,
+    manifest_name: str | None = MANIFEST_NAME,
+    durable: bool = False,
+) -> list[ManifestEntry]:
+    """Write many scripts into one directory
+
+    Args:
+        scripts (Iterable[tuple[str, Callable]]): (name, render) pairs, the
+            script is written to output_path/name.sh and render() returns its
+            fragments. It is called in a worker thread.
+        output_path (str): Directory of the scripts, created once
+        workers (int, optional): Writer threads, defaults to DEFAULT_WORKERS
+        manifest_name (str, optional): File name of the JSON manifest in
+            output_path, None to not write one
+        durable (bool): fsync every script before it is renamed into place
+
+    Returns:
+        list[ManifestEntry]: The written scripts, in the order they were given.
+            A name given twice is written once, with its last script.
+
+    Raises:
+        OSError: The first error of a write, after the other writes finished
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    # Same name is the same file, the last one wins like it did with one
+    # generate_slurm_script call per job
+    by_name: dict[str, Callable[[], Iterable[str]]] = {}
+    for name, render in scripts:
+        by_name.pop(name, None)
+        by_name[name] = render
+
+    def write(item: tuple[str, Callable[[], Iterable[str]]]) -> ManifestEntry:
+        name, render = item
+        path = os.path.join(output_path, f"{name}.sh")
+        sha256, size = write_atomic(path, render(), durable=durable)
+        return ManifestEntry(name=name, path=path, sha256=sha256, size=size)
+
+    items = list(by_name.items())
+    if len(items) <= 1:
+        entries = [write(item) for item in items]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(workers or DEFAULT_WORKERS, len(items)),
+            thread_name_prefix="slurmify-writer",
+        ) as pool:
+            futures = [pool.submit(write, item) for item in items]
+
+        errors = [future.exception() for future in futures if future.exception()]
+        if errors:
+            print_error("%s of %s scripts could not be written", len(errors), len(items))
+            raise errors[0]
+        entries = [future.result() for future in futures]
+
+    if manifest_name is not None:
+        write_manifest(entries, os.path.join(output_path, manifest_name))
+
+    print_debug("Wrote %s scripts to %s", len(entries), output_path)
+    return entries
+
+
+def write_manifest(entries: list[ManifestEntry], path: str) -> None:
+    """Save the manifest of written scripts as JSON"""
+    manifest = {
+        "created": round(time.time(), 3),
+        "scripts": [asdict(entry) for entry in entries],
+    }
+    write_atomic(path, [json.dumps(manifest, indent=2), "\n"])
+
+
+def write_job_scripts(
+    jobs: Iterable[Job],
+    output_path: str = "./out",
+    config_path: str | None = None,
+    workers: int | None = None,
+    manifest_name: str | None = MANIFEST_NAME,
+    durable: bool = False,
+) -> list[ManifestEntry]:
+    """Write the SLURM scripts of validated jobs to output_path/job_name.sh
+
+    Args:
+        jobs (Iterable[Job]): Validated jobs
+        output_path (str): Directory of the scripts
+        config_path (str, optional): System config, defaults to systemConfig/conf.yaml
+        workers (int, optional): Writer threads, defaults to DEFAULT_WORKERS
+        manifest_name (str, optional): File name of the JSON manifest, None to skip
+        durable (bool): fsync every script before it is renamed into place
+
+    Returns:
+        list[ManifestEntry]: The written scripts
+    """
+    slurm_translation = load_config(config_path)["SlurmInfo"]
+
+    return write_scripts(
+        (
+            (job.name, lambda job=job: iter_slurm_script(job, slurm_translation))
+            for job in jobs
+        ),
+        output_path,
+        workers=workers,
+        manifest_name=manifest_name,
+        durable=durable,
+    )
@@ -16,6 +16,7 @@ from errorMsgs.StructuralErrors import (
     wrongJobsVariableNameMsg,
 )
 from utils.typeValidators import check_class_parameter_types
+from utils.validationTrace import ValidationTrace
 
 
 def check_class_validation(
@@ -23,7 +24,7 @@ def check_class_validation(
 ) -> tuple[bool, ModuleType | None, SlurmifyValidationReport]:
     """Check if the class has the required attributes and methods"""
 
-    print_info(f"Checking class validation for {path}")
+    print_info("Checking class validation for %s", path)
 
     # Phase 1: Initial loading and syntax checking
     try:
@@ -40,19 +41,57 @@ def check_class_validation(
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
     except SyntaxError as e:
-        print_error(f"Syntax Error in {path}: {e}")
+        print_error("Syntax Error in %s: %s", path, e)
         validation_report.add_error_entry(syntaxErrorMsg(e))
         return False, None, validation_report
     except ImportError as e:
-        print_error(f"Import Error in {path}: {e}")
+        print_error("Import Error in %s: %s", path, e)
         validation_report.add_error_entry(importErrorMsg(e))
         return False, None, validation_report
     except NameError as e:
-        print_error(f"Name Error in {path}: {e}")
+        print_error("Name Error in %s: %s", path, e)
         validation_report.add_error_entry(nameErrorMsg(e))
         return False, None, validation_report
     except Exception as e:
-        print_error(f"Unexpected Error in {path}: {e}")
+        print_error("Unexpected Error in %s: %s", path, e)
+        validation_report.add_error_entry(exceptionMsg(e))
+        return False, None, validation_report
+
+    return True, module, validation_report
+
+
+def check_source_validation(
+    source: str,
+    validation_report: SlurmifyValidationReport,
+    filename: str = "<slurmify-config>",
+) -> tuple[bool, ModuleType | None, SlurmifyValidationReport]:
+    """Same as check_class_validation but for config source text held in memory
+
+    The source is compiled and executed in a fresh module namespace, nothing is
+    written to disk.
+    """
+
+    print_info("Checking class validation for %s", filename)
+
+    try:
+        module = ModuleType("pythonSlurmConfig")
+        module.__file__ = filename
+        code = compile(source, filename, "exec")
+        exec(code, module.__dict__)
+    except SyntaxError as e:
+        print_error("Syntax Error in %s: %s", filename, e)
+        validation_report.add_error_entry(syntaxErrorMsg(e))
+        return False, None, validation_report
+    except ImportError as e:
+        print_error("Import Error in %s: %s", filename, e)
+        validation_report.add_error_entry(importErrorMsg(e))
+        return False, None, validation_report
+    except NameError as e:
+        print_error("Name Error in %s: %s", filename, e)
+        validation_report.add_error_entry(nameErrorMsg(e))
+        return False, None, validation_report
+    except Exception as e:
+        print_error("Unexpected Error in %s: %s", filename, e)
         validation_report.add_error_entry(exceptionMsg(e))
         return False, None, validation_report
 
@@ -75,7 +114,7 @@ def check_if_required_classes_exist(
 
             if var_value.__class__.__name__ == "Jobs":
                 print_warning(
-                    f"var_value.__class__.__name__ {var_value.__class__.__name__}"
+                    "var_value.__class__.__name__ %s", var_value.__class__.__name__
                 )
                 jobs_instances.append(var_name)
 
@@ -85,7 +124,7 @@ def check_if_required_classes_exist(
 
         # If we have Jobs instances with different names
         if jobs_instances and not ("Jobs" in jobs_instances):
-            print_debug(f"Jobs instances found with different names: {jobs_instances}")
+            print_debug("Jobs instances found with different names: %s", jobs_instances)
             other_names = ", ".join([f"'{name}'" for name in jobs_instances])
             validation_report.add_error_entry(
                 wrongJobsVariableNameMsg(names=other_names)
@@ -98,7 +137,7 @@ def check_if_required_classes_exist(
         variable_name = getattr(module, "Job", None)
 
         print_error(
-            f"Job variable name is not correct. Expected 'Job', got '{variable_name}'"
+            "Job variable name is not correct. Expected 'Job', got '%s'", variable_name
         )
 
     if not hasattr(module, "System"):
@@ -114,48 +153,95 @@ def check_if_required_classes_exist(
 
 def load_python_conf_file(
     path: str,
+    trace: ValidationTrace | None = None,
 ) -> tuple[ModuleType | None, SlurmifyValidationReport]:
     """Load Python config file and return module and validation report with any errors found
 
+    Args:
+        path (str): Path of the slurmify configuration
+        trace (ValidationTrace, optional): Records the load and check timings,
+            kept by the caller because no report is returned on success
+
     Returns:
         tuple: (loaded module or None, validation report with all detected errors)
     """
     # Create validation report upfront to collect all errors
-    validation_report = SlurmifyValidationReport("ConfigValidation")
-    module = None
-    has_critical_error = False
+    validation_report = SlurmifyValidationReport("ConfigValidation", trace=trace)
+
+    with validation_report.span("load", path=path):
+        class_validity, module, validation_report = check_class_validation(
+            path, validation_report
+        )
+
+    return check_loaded_config(class_validity, module, validation_report)
+
+
+def load_python_conf_source(
+    source: str,
+    filename: str = "<slurmify-config>",
+    trace: ValidationTrace | None = None,
+) -> tuple[ModuleType | None, SlurmifyValidationReport]:
+    """Load a Python config from its source text instead of a file
+
+    Args:
+        source (str): Python source of the slurmify configuration
+        filename (str, optional): Name used in tracebacks and error messages
+        trace (ValidationTrace, optional): Records the load and check timings
 
-    class_validity, module, validation_report = check_class_validation(
-        path, validation_report
-    )
+    Returns:
+        tuple: (loaded module or None, validation report with all detected errors)
+    """
+    validation_report = SlurmifyValidationReport("ConfigValidation", trace=trace)
+
+    with validation_report.span("load", path=filename):
+        class_validity, module, validation_report = check_source_validation(
+            source, validation_report, filename
+        )
+
+    return check_loaded_config(class_validity, module, validation_report)
+
+
+def check_loaded_config(
+    class_validity: bool,
+    module: ModuleType | None,
+    validation_report: SlurmifyValidationReport,
+) -> tuple[ModuleType | None, SlurmifyValidationReport]:
+    """Run the structural and type checks on an executed config module
+
+    Returns:
+        tuple: (loaded module or None, validation report with all detected errors)
+    """
+    has_critical_error = False
 
     if not class_validity:
         has_critical_error = True
-        print_error(f"Class Validation Failed")
+        print_error("Class Validation Failed")
         return None, validation_report
     else:
-        print_info(f"Class Validation Succefull")
+        print_info("Class Validation Succefull")
 
-    has_required_classes, module, validation_report = check_if_required_classes_exist(
-        module, validation_report
-    )
+    with validation_report.span("required_classes"):
+        has_required_classes, module, validation_report = (
+            check_if_required_classes_exist(module, validation_report)
+        )
 
     if not has_required_classes:
         has_critical_error = True
-        print_error(f"Failed Jobs requirements Check")
+        print_error("Failed Jobs requirements Check")
         # return None, validation_report
     else:
-        print_info(f"Jobs requirements Check Succefull")
+        print_info("Jobs requirements Check Succefull")
 
     # TODO: Check that the class parameters have the correct types for System Resources and Job
     # Check that the class parameters have the correct types
     if not has_critical_error:
-        type_check_passed = check_class_parameter_types(module, validation_report)
+        with validation_report.span("type_check"):
+            type_check_passed = check_class_parameter_types(module, validation_report)
         if not type_check_passed:
-            print_error(f"Failed parameter type check")
+            print_error("Failed parameter type check")
             has_critical_error = True
         else:
-            print_info(f"Parameter type check Successful")
+            print_info("Parameter type check Successful")
 
     # Return module only if we didn't encounter any critical errors
     if has_critical_error:
@@ -1,4 +1,5 @@
 from utils.config_info import Job
+from utils.validationTrace import ValidationTrace
 
 RED = "\033[91m"
 GREEN = "\033[92m"
@@ -77,17 +78,37 @@ class SlurmifyValidationReport:
     including tracking validity, errors, warnings, and informational messages.
     """
 
-    def __init__(self, job_name, job: Job = None):
+    def __init__(self, job_name, job: Job = None, trace: ValidationTrace = None):
         """Initialize a JobResponseHandler instance.
 
         Args:
             job_name (str): The name of the job being validated.
+            trace (ValidationTrace, optional): Trace the stage timings are recorded in,
+                pass one to share it between reports. Defaults to a new trace.
         """
         self.job: Job | None = job  # Store the Job instance for later use
         self.job_name = job_name
         self.valid = True  # By default, assume job is valid
         self.errors: list[ErrorEntry] = []  # List to hold error entries
         self.messages = []
+        self.trace: ValidationTrace = trace if trace is not None else ValidationTrace()
+
+    def span(self, name, **args):
+        """Time a validation stage, use as `with report.span("validate_time"):`
+
+        Args:
+            name (str): Name of the stage.
+            **args: Extra values stored with the timing.
+        """
+        return self.trace.span(name, **args)
+
+    def get_timings(self):
+        """Get the stage timings of this report.
+
+        Returns:
+            list[dict]: One entry per stage with name, start_ms, duration_ms, depth and args.
+        """
+        return self.trace.to_list()
 
     def add_error(self, critical=False, errormsg=None, warning=None, info=None):
         """Add an error entry to the response.
@@ -139,7 +160,7 @@ class SlurmifyValidationReport:
         Returns:
             bool: True if there are any critical errors, False otherwise.
         """
-        return any(error["critical"] for error in self.errors)
+        return any(error.critical for error in self.errors)
 
     def get_critical_errors(self):
         """Get a list of all critical errors.
@@ -189,6 +210,8 @@ class SlurmifyValidationReport:
 
         self.errors.extend(other_handler.errors)
         self.messages.extend(other_handler.messages)
+        if other_handler.trace is not self.trace:
+            self.trace.extend(other_handler.trace)
 
         return self
 
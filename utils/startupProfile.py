@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import time
+
+"""
+Support for `main.py --profile-startup`.
+
+The command is run again in a child interpreter with `-X importtime`. Its
+output is passed through, and the import timings it writes to stderr are
+summed up per top-level module, so it is easy to see which import made the
+CLI slow.
+"""
+
+PROFILE_FLAG = "--profile-startup"
+IMPORT_TIME_PREFIX = "import time:"
+
+
+def parse_import_times(lines: list[str]) -> list[tuple[str, int, int]]:
+    """Parse the -X importtime lines of the top-level imports
+
+    Returns:
+        list[tuple[str, int, int]]: (module, self µs, cumulative µs) of every import
+            done directly by the program (not by another import)
+    """
+    imports = []
+
+    for line in lines:
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+
+        fields = line[len(IMPORT_TIME_PREFIX) :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+
+        name = fields[2]
+        # Nested imports are indented by two spaces per level
+        if len(name) - len(name.lstrip()) > 1:
+            continue
+
+        imports.append((name.strip(), int(fields[0]), int(fields[1])))
+
+    return imports
+
+
+def profile_startup(script: str, argv: list[str], top: int = 15) -> int:
+    """Run the CLI with `-X importtime` and print the import-time breakdown
+
+    Args:
+        script (str): Path of main.py
+        argv (list[str]): Command line arguments, --profile-startup is removed
+        top (int): Number of imports to show
+
+    Returns:
+        int: Exit code of the profiled command
+    """
+    if getattr(sys, "frozen", False):
+        print("--profile-startup needs a Python interpreter, not a bundled executable")
+        return 1
+
+    argv = [arg for arg in argv if arg != PROFILE_FLAG]
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", script, *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    wall_time = time.perf_counter() - start
+
+    lines = result.stderr.splitlines()
+    for line in lines:
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            print(line, file=sys.stderr)
+
+    imports = parse_import_times(lines)
+    total_imports = sum(cumulative for _, _, cumulative in imports)
+
+    print("")
+    print(f"Startup profile: {' '.join(argv) or '(no arguments)'}")
+    print(f"{'Import':<45} {'self ms':>9} {'total ms':>9}")
+    for name, self_time, cumulative in sorted(imports, key=lambda i: -i[2])[:top]:
+        print(f"{name:<45} {self_time / 1000:>9.1f} {cumulative / 1000:>9.1f}")
+    print(f"{'Imports':<45} {'':>9} {total_imports / 1000:>9.1f}")
+    print(f"{'Wall time (interpreter, imports and command)':<45} {'':>9} {wall_time * 1000:>9.1f}")
+
+    return result.returncode
@@ -0,0 +1,348 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import yaml
+
+"""
+Parsed view of systemConfig/conf.yaml.
+
+The YAML file is parsed once per process and shared by every caller. Before
+handing out the cached object the file is stat'ed and only re-parsed when its
+mtime, inode or size changed, so editing conf.yaml on a running API still
+takes effect without paying the YAML cost on every request.
+"""
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "systemConfig",
+    "conf.yaml",
+)
+
+# path -> (stat signature, SystemConfig)
+_SYSTEM_CONFIG_CACHE: dict[str, tuple[tuple[int, int, int], "SystemConfig"]] = {}
+_SYSTEM_CONFIG_LOCK = threading.Lock()
+# Lookups answered from the cache / that parsed the file, see system_config_cache_stats
+_SYSTEM_CONFIG_STATS = {"hits": 0, "misses": 0}
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class PartitionDetails:
+    """Hardware description of one partition (system_constraints.partition_details)"""
+
+    name: str
+    nodes: int
+    cores_per_node: int
+    ram_per_node: int | None = None
+    gpus_per_node: int | None = None
+    fpgas_per_node: int | None = None
+    local_storage: float | None = None
+
+    @property
+    def has_gpus(self) -> bool:
+        return self.gpus_per_node is not None
+
+
+def parse_time_to_seconds(time_str: str) -> int:
+    """
+    Parse different SLURM time formats and convert to seconds
+    Supported formats:
+    - M (minutes)
+    - M:S (minutes:seconds)
+    - H:M:S (hours:minutes:seconds)
+    - D-H (days:hours)
+    - D-H:M (days:hours:minutes)
+    - D-H:M:S (days:hours:minutes:seconds)
+    """
+    try:
+        # Check if it's just minutes (single integer)
+        if time_str.isdigit():
+            return int(time_str) * 60
+
+        # Check if it contains days (D-H format)
+        if "-" in time_str:
+            days_part, time_part = time_str.split("-")
+            days = int(days_part)
+
+            # Handle different time part formats after the day
+            time_components = time_part.split(":")
+
+            if len(time_components) == 1:  # D-H format
+                hours = int(time_components[0])
+                return (days * 24 * 3600) + (hours * 3600)
+            elif len(time_components) == 2:  # D-H:M format
+                hours, minutes = map(int, time_components)
+                return (days * 24 * 3600) + (hours * 3600) + (minutes * 60)
+            elif len(time_components) == 3:  # D-H:M:S format
+                hours, minutes, seconds = map(int, time_components)
+                return (days * 24 * 3600) + (hours * 3600) + (minutes * 60) + seconds
+
+        # Handle time formats without days
+        time_components = time_str.split(":")
+
+        if len(time_components) == 2:  # M:S format
+            minutes, seconds = map(int, time_components)
+            return (minutes * 60) + seconds
+        elif len(time_components) == 3:  # H:M:S format
+            hours, minutes, seconds = map(int, time_components)
+            return (hours * 3600) + (minutes * 60) + seconds
+
+        raise ValueError(f"Unrecognized time format: {time_str}")
+
+    except Exception as e:
+        raise ValueError(f"Error parsing time '{time_str}': {str(e)}")
+
+
+@dataclass(frozen=True)
+class PartitionLimits:
+    """Precomputed limits for one (partition, qos) pair
+
+    Attributes:
+        partition (str): Partition name
+        mode (str): QoS mode
+        max_nodes (int): Maximum nodes a job may request
+        max_gpus (int): Maximum GPUs a job may request (0 if the system has no GPUs)
+        cores_per_node (int): Cores of one node of the partition
+        max_time (str | None): Maximum walltime as written in conf.yaml
+        max_time_seconds (int | None): Maximum walltime in seconds
+    """
+
+    partition: str
+    mode: str
+    max_nodes: int
+    max_gpus: int
+    cores_per_node: int
+    max_time: str | None
+    max_time_seconds: int | None
+
+
+class ConstraintTable:
+    """Lookup table of PartitionLimits keyed by (partition, qos).
+
+    The table is compiled once per SystemConfig so the validators do not derive
+    the same limits again for every job.
+    """
+
+    def __init__(self, limits: dict[tuple[str, str], PartitionLimits]):
+        self._limits: Mapping[tuple[str, str], PartitionLimits] = MappingProxyType(
+            limits
+        )
+
+    @classmethod
+    def compile(
+        cls,
+        partition_details: Mapping[str, PartitionDetails],
+        modes: tuple[str, ...],
+        max_nodes: Mapping[str, float],
+        time_limits: Mapping[str, str],
+    ) -> "ConstraintTable":
+        """Build the table for every partition and every QoS mentioned in the config"""
+        all_modes = list(dict.fromkeys([*modes, *max_nodes.keys(), *time_limits.keys()]))
+
+        # GPU limits only depend on the QoS, they are always taken from the gpu partition
+        gpu_partition = partition_details.get("gpu")
+
+        limits = {}
+        for mode in all_modes:
+            max_time = time_limits.get(mode)
+            try:
+                max_time_seconds = (
+                    parse_time_to_seconds(max_time) if max_time is not None else None
+                )
+            except ValueError:
+                # Keep the broken value, validate_time reports it when it is used
+                max_time_seconds = None
+
+            if gpu_partition is None or gpu_partition.gpus_per_node is None:
+                max_gpus = 0
+            elif mode not in max_nodes:
+                max_gpus = int(1 * gpu_partition.gpus_per_node)
+            else:
+                allowed_nodes = int(gpu_partition.nodes * max_nodes[mode])
+                max_gpus = int(allowed_nodes * gpu_partition.gpus_per_node)
+
+            for partition, details in partition_details.items():
+                if mode not in max_nodes:
+                    # Dev mode will always be in the constraints
+                    mode_max_nodes = 1
+                else:
+                    mode_max_nodes = int(details.nodes * max_nodes[mode])
+
+                limits[(partition, mode)] = PartitionLimits(
+                    partition=partition,
+                    mode=mode,
+                    max_nodes=mode_max_nodes,
+                    max_gpus=max_gpus,
+                    cores_per_node=details.cores_per_node,
+                    max_time=max_time,
+                    max_time_seconds=max_time_seconds,
+                )
+
+        return cls(limits)
+
+    def get(self, partition: str, mode: str) -> PartitionLimits | None:
+        """Get the limits for a partition and QoS or None if the pair is unknown"""
+        return self._limits.get((partition, mode))
+
+    def __len__(self) -> int:
+        return len(self._limits)
+
+
+@dataclass(frozen=True)
+class SystemConfig:
+    """Immutable, typed representation of the system configuration file.
+
+    Attributes:
+        path (str): Absolute path of the parsed file.
+        version (tuple): Stat signature (mtime_ns, inode, size) of the parsed file.
+        total_nodes (int): Total number of nodes of the system.
+        partitions (tuple[str]): Valid partition names.
+        partition_details (Mapping[str, PartitionDetails]): Hardware per partition.
+        modes (tuple[str]): Valid QoS modes.
+        max_nodes (Mapping[str, float]): Fraction of a partition a QoS may use.
+        time_limits (Mapping[str, str]): Maximum walltime per QoS.
+        slurm_info (Mapping[str, Any]): Python attribute -> SBATCH option table.
+        constraint_table (ConstraintTable): Precomputed limits per (partition, qos).
+        raw (Mapping[str, Any]): Read-only view of the whole YAML document.
+    """
+
+    path: str
+    version: tuple[int, int, int]
+    total_nodes: int
+    partitions: tuple[str, ...]
+    partition_details: Mapping[str, PartitionDetails]
+    modes: tuple[str, ...]
+    max_nodes: Mapping[str, float]
+    time_limits: Mapping[str, str]
+    slurm_info: Mapping[str, Any]
+    constraint_table: ConstraintTable = field(repr=False)
+    raw: Mapping[str, Any] = field(repr=False)
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, path: str = "", version: tuple[int, int, int] = (0, 0, 0)
+    ) -> "SystemConfig":
+        """Build a SystemConfig from the dict produced by yaml.safe_load"""
+        system_constraints: dict = data.get("system_constraints", {})
+        constraints: dict = data.get("constraints", {})
+
+        partition_details = {
+            name: PartitionDetails(
+                name=name,
+                nodes=details["nodes"],
+                cores_per_node=details["cores_per_node"],
+                ram_per_node=details.get("ram_per_node"),
+                gpus_per_node=details.get("gpus_per_node"),
+                fpgas_per_node=details.get("fpgas_per_node"),
+                local_storage=details.get("local_storage"),
+            )
+            for name, details in system_constraints.get(
+                "partition_details", {}
+            ).items()
+        }
+
+        modes = tuple(constraints.get("modes", []))
+        max_nodes = MappingProxyType(dict(constraints.get("max_nodes", {})))
+        time_limits = MappingProxyType(dict(constraints.get("time", {})))
+
+        return cls(
+            path=path,
+            version=version,
+            total_nodes=system_constraints.get("total_nodes", 0),
+            partitions=tuple(constraints.get("partitions", [])),
+            partition_details=MappingProxyType(partition_details),
+            modes=modes,
+            max_nodes=max_nodes,
+            time_limits=time_limits,
+            slurm_info=_freeze(data.get("SlurmInfo", {})),
+            constraint_table=ConstraintTable.compile(
+                partition_details, modes, max_nodes, time_limits
+            ),
+            raw=_freeze(data),
+        )
+
+    def get_partition(self, partition: str) -> PartitionDetails | None:
+        return self.partition_details.get(partition)
+
+    def get_slurm_translation(self, attribute: str) -> str | None:
+        """Get the SBATCH option for a Python attribute (also checks nested tables like logs)"""
+        if attribute in self.slurm_info:
+            return self.slurm_info[attribute]
+
+        for value in self.slurm_info.values():
+            if isinstance(value, Mapping) and attribute in value:
+                return value[attribute]
+
+        return None
+
+
+def _stat_signature(path: str) -> tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+
+def get_system_config(config_path: str | None = None) -> SystemConfig:
+    """
+    Get the process-wide SystemConfig for a config file.
+
+    The file is only parsed again when its mtime, inode or size changed since
+    the last call.
+
+    Args:
+        config_path (str, optional): Path to the configuration file.
+            If None, uses systemConfig/conf.yaml.
+
+    Returns:
+        SystemConfig: The parsed configuration
+
+    Raises:
+        yaml.YAMLError: If the file is not valid YAML
+    """
+    path = os.path.abspath(config_path or DEFAULT_CONFIG_PATH)
+    signature = _stat_signature(path)
+
+    cached = _SYSTEM_CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        _SYSTEM_CONFIG_STATS["hits"] += 1
+        return cached[1]
+
+    with _SYSTEM_CONFIG_LOCK:
+        # Another thread may have reloaded it while we waited for the lock
+        cached = _SYSTEM_CONFIG_CACHE.get(path)
+        if cached is not None and cached[0] == signature:
+            _SYSTEM_CONFIG_STATS["hits"] += 1
+            return cached[1]
+
+        _SYSTEM_CONFIG_STATS["misses"] += 1
+        with open(path, "r") as stream:
+            data = yaml.safe_load(stream) or {}
+
+        system_config = SystemConfig.from_dict(data, path=path, version=signature)
+        _SYSTEM_CONFIG_CACHE[path] = (signature, system_config)
+        return system_config
+
+
+def clear_system_config_cache() -> None:
+    """Drop every cached SystemConfig (the next access re-parses the file)"""
+    with _SYSTEM_CONFIG_LOCK:
+        _SYSTEM_CONFIG_CACHE.clear()
+
+
+def system_config_cache_stats() -> dict:
+    """Hits and misses of get_system_config in this process
+
+    The counters are not locked on the hit path, concurrent threads may lose
+    an increment now and then, which is fine for monitoring.
+    """
+    return dict(_SYSTEM_CONFIG_STATS)
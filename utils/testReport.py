@@ -0,0 +1,122 @@
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+
+"""
+Results of `main.py --test` and their JUnit XML export.
+
+A ConfigTestResult is what a test worker sends back for one config file. It
+only carries plain values, so it can be pickled from a worker process.
+"""
+
+
+@dataclass
+class ConfigTestResult:
+    """Outcome of validating one test config
+
+    Attributes:
+        folder (str): Test folder (BasicConfigs, KnownWrong, ...)
+        file (str): Config file name
+        valid (bool): Validation result of the config
+        duration (float): Seconds spent validating (and running sbatch)
+        slurm_message (str): Slurm part of the result line, empty if Slurm was not run
+        slurm_failures (int): Generated scripts rejected by sbatch --test-only
+        error (str | None): Exception raised while testing, None if it ran through
+    """
+
+    folder: str
+    file: str
+    valid: bool = False
+    duration: float = 0.0
+    slurm_message: str = ""
+    slurm_failures: int = 0
+    error: str | None = None
+
+
+@dataclass
+class ConfigTestCase:
+    """A test config with its expectation from TestInfo.yaml
+
+    Attributes:
+        folder (str): Test folder
+        file (str): Config file name
+        path (str): Path of the config file
+        expected (bool | None): Expected validation result, None if TestInfo.yaml has no entry
+        description (str | None): Description from TestInfo.yaml
+        result (ConfigTestResult | None): Filled in once the test ran
+        passed (bool | None): Whether the result matched, None for skipped tests
+    """
+
+    folder: str
+    file: str
+    path: str
+    expected: bool | None = None
+    description: str | None = None
+    result: ConfigTestResult | None = field(default=None, repr=False)
+    passed: bool | None = None
+
+
+def write_junit_xml(cases: list[ConfigTestCase], path: str) -> None:
+    """Write the test results as JUnit XML, one testsuite per test folder
+
+    Args:
+        cases (list[ConfigTestCase]): Tests that ran, in report order
+        path (str): File to write
+    """
+    suites: dict[str, list[ConfigTestCase]] = {}
+    for case in cases:
+        suites.setdefault(case.folder, []).append(case)
+
+    root = ET.Element("testsuites", name="slurmify")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+
+    for folder, folder_cases in suites.items():
+        suite = ET.SubElement(root, "testsuite", name=folder)
+        counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+
+        for case in folder_cases:
+            result = case.result
+            duration = result.duration if result else 0.0
+            testcase = ET.SubElement(
+                suite,
+                "testcase",
+                classname=folder,
+                name=case.file,
+                time=f"{duration:.3f}",
+            )
+            counts["tests"] += 1
+            counts["time"] += duration
+
+            if result is not None and result.error is not None:
+                ET.SubElement(testcase, "error", message=result.error)
+                counts["errors"] += 1
+            elif case.passed is None:
+                ET.SubElement(
+                    testcase, "skipped", message="No expected result in TestInfo.yaml"
+                )
+                counts["skipped"] += 1
+            elif not case.passed or (result and result.slurm_failures):
+                expected = "valid" if case.expected else "invalid"
+                message = (
+                    f"Expected {expected}, got {'valid' if result.valid else 'invalid'}"
+                    if not case.passed
+                    else "sbatch --test-only rejected the generated script"
+                )
+                ET.SubElement(testcase, "failure", message=message).text = (
+                    case.description or ""
+                )
+                counts["failures"] += 1
+
+        for key, value in counts.items():
+            suite.set(key, f"{value:.3f}" if key == "time" else str(value))
+            totals[key] += value
+
+    for key, value in totals.items():
+        root.set(key, f"{value:.3f}" if key == "time" else str(value))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    ET.indent(root)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
@@ -16,7 +16,7 @@ def check_resources_types(module, resource_instance, validation_report):
         return False
 
     for attr_name, expected_type in expected_types.items():
-        print_debug(f"Checking {attr_name} against {expected_type}")
+        print_debug("Checking %s against %s", attr_name, expected_type)
         attr_value = getattr(resource_instance, attr_name)
 
         # Handle union types (like int | None)
@@ -57,7 +57,7 @@ def check_system_types(module, system_instance, validation_report):
         validation_report.add_error_entry(missing_expected_types_ErrorMsg("System"))
         return False
 
-    print_info(f"System expected types: {expected_types}")
+    print_info("System expected types: %s", expected_types)
 
     for attr_name, expected_type in expected_types.items():
 
@@ -77,7 +77,7 @@ def check_system_types(module, system_instance, validation_report):
                 and attr_value is None
             ):
                 continue
-            print_error(f"System.{attr_name} has incorrect type")
+            print_error("System.%s has incorrect type", attr_name)
             validation_report.add_error(
                 critical=True,
                 errormsg=[f"System.{attr_name} has incorrect type"],
@@ -89,11 +89,11 @@ def check_system_types(module, system_instance, validation_report):
 
             has_errors = True
 
-        print_info(f"Checking {attr_name} against {expected_type}")
+        print_info("Checking %s against %s", attr_name, expected_type)
         # Special handling for resources
         if isinstance(attr_value, Resources):
             if not check_resources_types(module, attr_value, validation_report):
-                print_error(f"Resources type check failed for {attr_name} in System")
+                print_error("Resources type check failed for %s in System", attr_name)
                 has_errors = True
             continue
 
@@ -121,7 +121,7 @@ def check_job_types(module, job_instance, validation_report):
 
     # Get expected types from the Job class, not the instance
     expected_types = get_expected_types(job_instance.__class__)
-    print_debug(f"Job expected types: {expected_types}")
+    print_debug("Job expected types: %s", expected_types)
 
     if expected_types is None:
         validation_report.add_error(
@@ -142,9 +142,9 @@ def check_job_types(module, job_instance, validation_report):
             continue
 
         attr_value = getattr(job_instance, attr_name)
-        print_debug(f"Checking {attr_name} against {expected_type}")
-        print_debug(f"Value: {attr_value}")
-        print_debug(f"Expected: {expected_type}")
+        print_debug("Checking %s against %s", attr_name, expected_type)
+        print_debug("Value: %s", attr_value)
+        print_debug("Expected: %s", expected_type)
 
         if attr_value is not None:
             pass
@@ -317,7 +317,7 @@ def check_class_parameter_types(module, validation_report):
         and callable(jobs_instance.get_jobs)
     ):
         jobs_jobs = jobs_instance.get_jobs()
-        print_debug(f"Jobs instance found: {jobs_instance}")
+        print_debug("Jobs instance found: %s", jobs_instance)
 
     if not jobs_jobs:
         validation_report.add_error_entry(
@@ -330,7 +330,7 @@ def check_class_parameter_types(module, validation_report):
 
     # Check each job
     for job in jobs_jobs:
-        print_warning(f"Checking job: {job}")
+        print_warning("Checking job: %s", job)
         has_errors = not check_job_types(module, job, validation_report) or has_errors
 
     return not has_errors
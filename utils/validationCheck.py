@@ -0,0 +1,228 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from utils import func
+from utils.config_info import Job, System
+from utils.moduleListHandler import get_module_list
+from utils.slurmifyValidationReport import ErrorEntry, SlurmifyValidationReport
+from utils.system_config import get_system_config
+
+"""
+Side-effect free validation.
+
+validate_job fixes the job while it checks it (a missing mode becomes
+"default", a GPU job on the cpu partition moves to gpu, ...), so checking the
+same Job twice can give two different reports. This module splits the two
+steps:
+
+    result = check_job(job)                # job is not modified
+    result.fixes                           # (validator, field, current, proposed)
+    fixed_job = apply_fixes(job, result.fixes)
+
+check_job runs the validators on a private copy of the job and records what
+they changed as proposed fixes. The result only depends on the input values,
+the system config and the module list, so it is cached by a hash of them:
+checking an equal job again returns the same CheckResult without running a
+validator.
+"""
+
+# Checked inputs kept, the oldest result is dropped first
+MAX_CACHED_CHECKS = 4096
+
+# input hash -> CheckResult
+_CHECK_CACHE: "OrderedDict[str, CheckResult]" = OrderedDict()
+_CHECK_LOCK = threading.Lock()
+# Lookups answered from the cache / that ran the validators, see check_cache_stats
+_CHECK_STATS = {"hits": 0, "misses": 0}
+
+
+@dataclass(frozen=True)
+class ProposedFix:
+    """A value a validator would change
+
+    Attributes:
+        validator (str): Name of the validator, e.g. validate_mode
+        field (str): Resources field
+        current (Any): Value before the validator ran
+        proposed (Any): Value the validator set
+    """
+
+    validator: str
+    field: str
+    current: Any
+    proposed: Any
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """Outcome of check_job, shared between equal inputs (do not modify)
+
+    Attributes:
+        input_hash (str): Hash of the checked values and the system config
+        result (bool): Return value of the validation, like validate_job
+        valid (bool): Whether the job has no critical error
+        errors (tuple[ErrorEntry]): Errors, warnings and infos of the validators
+        fixes (tuple[ProposedFix]): Changes the validators propose, in order
+    """
+
+    input_hash: str
+    result: bool
+    valid: bool
+    errors: tuple[ErrorEntry, ...]
+    fixes: tuple[ProposedFix, ...]
+
+    def to_report(self, job: Job) -> SlurmifyValidationReport:
+        """A validation report for job with the errors of this check"""
+        report = SlurmifyValidationReport(job.name, job)
+        for entry in self.errors:
+            report.add_error_entry(entry)
+        if not self.valid:
+            report.mark_invalid()
+        return report
+
+
+def _canonical(job: Job) -> tuple:
+    """The values of a job the validators read"""
+    resources = job.system.resources
+    return (
+        sorted(resources.to_dict().items()),
+        (
+            None
+            if job.modules is None
+            else [module.name for module in job.modules.get_modules()]
+        ),
+        None if job.logs is None else sorted(job.logs.to_dict().items()),
+        (
+            None
+            if job.environments is None
+            else [(env.name, env.commands) for env in job.environments]
+        ),
+    )
+
+
+def input_hash(job: Job, systemConfigPath: str | None = None) -> str:
+    """Hash of everything a check of job depends on
+
+    Args:
+        job (Job): The job
+        systemConfigPath (str, optional): System config, defaults to systemConfig/conf.yaml
+
+    Returns:
+        str: sha256 hex digest of the job values, the config version and
+            whether modules are checked against which module list
+    """
+    system_config = get_system_config(systemConfigPath)
+    # validate_modules checks the names against the module list
+    modules_version = None if func.skip_modules else get_module_list().version
+    data = repr(
+        (
+            _canonical(job),
+            system_config.path,
+            system_config.version,
+            func.skip_modules,
+            modules_version,
+        )
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _copy_job(job: Job) -> Job:
+    """Copy of job with its own System and Resources, the rest is shared"""
+    return Job(
+        name=job.name,
+        system=System(copy.copy(job.system.resources), name=job.system.name),
+        exec_command=job.exec_command,
+        environments=job.environments,
+        logs=job.logs,
+        modules=job.modules,
+    )
+
+
+def check_job(
+    job: Job, systemConfigPath: str | None = None, use_cache: bool = True
+) -> CheckResult:
+    """Validate a job without changing it
+
+    Args:
+        job (Job): The job to check, it is not modified
+        systemConfigPath (str, optional): System config, defaults to systemConfig/conf.yaml
+        use_cache (bool): Return the cached result of an equal input
+
+    Returns:
+        CheckResult: Errors and proposed fixes
+    """
+    key = input_hash(job, systemConfigPath)
+
+    if use_cache:
+        with _CHECK_LOCK:
+            cached = _CHECK_CACHE.get(key)
+            if cached is not None:
+                _CHECK_CACHE.move_to_end(key)
+                _CHECK_STATS["hits"] += 1
+                return cached
+            _CHECK_STATS["misses"] += 1
+
+    # The validators fix values in place, they only get to change the copy
+    working = _copy_job(job)
+    report = SlurmifyValidationReport(working.name, working)
+    fixes: list[tuple] = []
+
+    result = func.check_job_validity(
+        working, func.get_validation_info(systemConfigPath), report, fixes=fixes
+    )
+
+    check = CheckResult(
+        input_hash=key,
+        result=result,
+        valid=report.valid,
+        errors=tuple(report.errors),
+        fixes=tuple(ProposedFix(*fix) for fix in fixes),
+    )
+
+    if use_cache:
+        with _CHECK_LOCK:
+            _CHECK_CACHE[key] = check
+            while len(_CHECK_CACHE) > MAX_CACHED_CHECKS:
+                _CHECK_CACHE.popitem(last=False)
+
+    return check
+
+
+def apply_fixes(job: Job, fixes) -> Job:
+    """A new job with the proposed fixes applied, job is not modified
+
+    Args:
+        job (Job): The checked job
+        fixes (Iterable[ProposedFix]): Fixes from check_job, applied in order
+
+    Returns:
+        Job: Copy of job with its own System and Resources
+    """
+    fixed = _copy_job(job)
+    for fix in fixes:
+        setattr(fixed.system.resources, fix.field, fix.proposed)
+    return fixed
+
+
+def normalize_job(
+    job: Job, systemConfigPath: str | None = None
+) -> tuple[Job, CheckResult]:
+    """Check a job and return the fixed copy with the result"""
+    check = check_job(job, systemConfigPath)
+    return apply_fixes(job, check.fixes), check
+
+
+def clear_check_cache() -> None:
+    """Drop every cached check result"""
+    with _CHECK_LOCK:
+        _CHECK_CACHE.clear()
+
+
+def check_cache_stats() -> dict:
+    """Hits and misses of the check cache since the process started"""
+    with _CHECK_LOCK:
+        return dict(_CHECK_STATS)
@@ -0,0 +1,230 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from typing import Callable
+
+"""
+Warm validation daemon for the CLI (`main.py --daemon`).
+
+The daemon imports the validators and loads conf.yaml and the module list
+once, then listens on a Unix domain socket. A CLI invocation that finds the
+socket sends its arguments, its working directory and its stdin, stdout and
+stderr file descriptors. The daemon forks a child for every request. The
+child already has everything loaded. It writes straight to the caller's
+terminal and answers with the exit code. Forking also keeps requests apart,
+so globals like skip_modules or verbose printing do not leak between runs.
+
+If no daemon is listening, forward_to_daemon returns None and the CLI runs
+the command in-process as before.
+"""
+
+PROTOCOL_VERSION = 1
+MAX_MESSAGE_SIZE = 64 * 1024
+# Put in front of forwarded commands so the daemon child runs them in-process
+NO_DAEMON_FLAG = "--no-daemon"
+
+
+def is_supported() -> bool:
+    """Passing file descriptors over a socket needs AF_UNIX and fork"""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+
+def get_socket_path() -> str:
+    """Socket path from SLURMIFY_DAEMON_SOCKET, or a per-user default"""
+    path = os.getenv("SLURMIFY_DAEMON_SOCKET")
+    if path:
+        return path
+
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"slurmify-{os.getuid()}.sock")
+
+
+def forward_to_daemon(argv: list[str], socket_path: str | None = None) -> int | None:
+    """Run a CLI command in the daemon
+
+    Args:
+        argv (list[str]): Command line arguments (without the program name)
+        socket_path (str, optional): Socket of the daemon, see get_socket_path
+
+    Returns:
+        int | None: Exit code of the command, None if no daemon is running
+    """
+    if not is_supported():
+        return None
+
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    message = json.dumps(
+        {"version": PROTOCOL_VERSION, "argv": argv, "cwd": os.getcwd()}
+    ).encode()
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            socket.send_fds(client, [message], [0, 1, 2])
+
+            # The daemon writes the command output to our descriptors directly,
+            # the socket only carries the exit code back
+            response = client.makefile("rb").readline()
+    except OSError:
+        return None
+
+    if not response:
+        # The daemon went away before answering, run the command here
+        return None
+
+    return int(json.loads(response).get("exit_code", 1))
+
+
+class _DaemonRequestHandler(socketserver.BaseRequestHandler):
+    """Runs one forwarded CLI command, in a forked child of the daemon"""
+
+    def handle(self) -> None:
+        # The child is stopped like a normal CLI process, not like the daemon
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        message, fds, _, _ = socket.recv_fds(self.request, MAX_MESSAGE_SIZE, 3)
+        if not message:
+            return  # a probe from serve() checking if the daemon runs
+
+        try:
+            request = json.loads(message)
+            if request.get("version") != PROTOCOL_VERSION or len(fds) != 3:
+                exit_code = self._reject(
+                    fds, "Slurmify daemon: unsupported client, restart the daemon"
+                )
+            elif not self._same_user():
+                exit_code = self._reject(
+                    fds, "Slurmify daemon: request from another user refused"
+                )
+            else:
+                exit_code = self._run(request, fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        self.request.sendall(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+    def _same_user(self) -> bool:
+        if not hasattr(socket, "SO_PEERCRED"):
+            return True  # the socket file permissions still apply
+
+        credentials = self.request.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, 12
+        )
+        uid = int.from_bytes(credentials[4:8], sys.byteorder)
+        return uid == os.getuid()
+
+    def _reject(self, fds: list[int], reason: str) -> int:
+        # Tell the caller on its stderr if it sent one, otherwise log it here
+        if fds:
+            os.write(fds[-1], f"{reason}\n".encode())
+        else:
+            print(reason, file=sys.stderr)
+        return 1
+
+    def _run(self, request: dict, fds: list[int]) -> int:
+        # Anything the daemon still buffered belongs to its own output
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+
+        os.chdir(request["cwd"])
+
+        try:
+            self.server.command([NO_DAEMON_FLAG, *request["argv"]])
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            import traceback
+
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+        return exit_code
+
+
+class _DaemonServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, command: Callable[[list[str]], None]):
+        self.command = command
+        super().__init__(socket_path, _DaemonRequestHandler)
+
+
+def warm_up() -> None:
+    """Import and load everything a validation needs, forked children inherit it"""
+    import utils.func  # noqa: F401 - imports the validators
+    import utils.slurmifyLoader  # noqa: F401
+    from utils.moduleListHandler import get_module_list
+    from utils.system_config import get_system_config
+
+    get_system_config()
+    module_list = get_module_list()
+    module_list.index
+
+
+def serve(command: Callable[[list[str]], None], socket_path: str | None = None) -> None:
+    """Run the daemon in the foreground until it is interrupted
+
+    Args:
+        command (Callable): Runs the CLI for an argument list (main.main)
+        socket_path (str, optional): Socket to listen on, see get_socket_path
+
+    Raises:
+        RuntimeError: If the platform is not supported or a daemon already runs
+    """
+    if not is_supported():
+        raise RuntimeError("The daemon needs Unix domain sockets and fork")
+
+    socket_path = socket_path or get_socket_path()
+
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)  # left over from a daemon that died
+            else:
+                raise RuntimeError(f"A Slurmify daemon is already running on {socket_path}")
+
+    warm_up()
+
+    # Only the owner may connect
+    old_umask = os.umask(0o177)
+    try:
+        server = _DaemonServer(socket_path, command)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Clean up the socket on kill as well as on Ctrl-C
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Slurmify daemon listening on {socket_path}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("Slurmify daemon stopped", flush=True)
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+
+"""
+Per-stage timings of a validation.
+
+Every SlurmifyValidationReport has a ValidationTrace. The validation wraps its
+stages in spans (loading, type check, each validator of validate_system, the
+module check, script generation), so it is possible to see which stage is slow
+for a given config:
+
+    with report.span("validate_modules"):
+        validate_modules(job, report)
+
+A span costs two perf_counter_ns calls and one small object. The spans of
+several reports can be written as Chrome trace JSON, which chrome://tracing
+and https://ui.perfetto.dev open.
+"""
+
+
+class TraceSpan:
+    """A finished span
+
+    Attributes:
+        name (str): Stage name
+        start (int): perf_counter_ns at the start of the stage
+        duration (int): Duration in nanoseconds
+        depth (int): Nesting level, 0 for top-level stages
+        args (dict): Extra values shown with the span
+    """
+
+    def __init__(self, name: str, start: int, duration: int, depth: int, args: dict):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.depth = depth
+        self.args = args
+
+
+class _SpanTimer:
+    """Context manager returned by ValidationTrace.span"""
+
+    def __init__(self, trace: "ValidationTrace", name: str, args: dict):
+        self.trace = trace
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.depth = self.trace._depth
+        self.trace._depth += 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter_ns() - self.start
+        self.trace._depth -= 1
+        self.trace.spans.append(
+            TraceSpan(self.name, self.start, duration, self.depth, self.args)
+        )
+        return False
+
+
+class ValidationTrace:
+    """Collects the spans of one validation"""
+
+    def __init__(self):
+        self.spans: list[TraceSpan] = []
+        self._depth = 0
+
+    def span(self, name: str, **args) -> _SpanTimer:
+        """Time the enclosed block as a stage called name"""
+        return _SpanTimer(self, name, args)
+
+    def extend(self, other: "ValidationTrace") -> None:
+        """Add the spans of another trace, e.g. when reports are merged"""
+        self.spans.extend(other.spans)
+
+    def origin(self) -> int | None:
+        """perf_counter_ns of the earliest span, None if nothing was recorded"""
+        return min((span.start for span in self.spans), default=None)
+
+    def to_list(self, origin: int | None = None) -> list[dict]:
+        """The spans in start order, with times in milliseconds
+
+        Args:
+            origin (int, optional): perf_counter_ns that start_ms is relative
+                to, defaults to the start of the first span
+
+        Returns:
+            list[dict]: {name, start_ms, duration_ms, depth, args} per span
+        """
+        if origin is None:
+            origin = self.origin()
+
+        return [
+            {
+                "name": span.name,
+                "start_ms": round((span.start - origin) / 1e6, 3),
+                "duration_ms": round(span.duration / 1e6, 3),
+                "depth": span.depth,
+                "args": span.args,
+            }
+            for span in sorted(self.spans, key=lambda s: (s.start, s.depth))
+        ]
+
+    def durations(self) -> dict[str, float]:
+        """Total milliseconds per stage name"""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration / 1e6
+        return totals
+
+
+def chrome_trace(traces: list[tuple[str, ValidationTrace]]) -> dict:
+    """Build a Chrome trace from named traces, one row per trace
+
+    Args:
+        traces (list[tuple[str, ValidationTrace]]): (row name, trace) pairs,
+            e.g. the config loading and one row per job
+
+    Returns:
+        dict: Trace in the Chrome trace event format
+    """
+    pid = os.getpid()
+    origin = min(
+        (trace.origin() for _, trace in traces if trace.spans), default=0
+    )
+    events = []
+
+    for tid, (name, trace) in enumerate(traces, 1):
+        events.append(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        )
+        for span in trace.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "slurmify",
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": (span.start - origin) / 1000,
+                    "dur": span.duration / 1000,
+                    "args": span.args,
+                }
+            )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(traces: list[tuple[str, ValidationTrace]], path: str) -> None:
+    """Write named traces as Chrome trace JSON, see chrome_trace"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, "w") as file:
+        json.dump(chrome_trace(traces), file, indent=1)
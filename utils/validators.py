@@ -1,3 +1,5 @@
+from typing import Callable
+
 from utils.moduleListHandler import ModuleList, get_module_list
 from utils.printers import print_error, print_warning, print_info, print_debug
 from utils.config_info import Job
@@ -5,14 +7,18 @@ from utils.config_getters import (
     calculate_max_cpus,
     calculate_max_gpus,
     calculate_max_nodes,
+    get_array_limits,
     get_system_partition_details,
     get_valid_modes,
     get_valid_partitions,
     is_gpu_partition,
     get_min_nodes_for_cpus,
+    get_partition_limits,
     is_valid_partition,
 )
 from utils.slurmifyValidationReport import SlurmifyValidationReport
+from utils.jobArray import parse_array_spec
+from utils.system_config import parse_time_to_seconds
 
 validation_relaxed = True  # If true the script will continue even if there are errors
 
@@ -20,7 +26,7 @@ validation_relaxed = True  # If true the script will continue even if there are
 def validate_account(job: Job, report: SlurmifyValidationReport) -> bool:
     """Validates that the job has an account specified"""
     if job.system.resources.account is None:
-        print_error(f"Error: Job {job.system.name} has no account specified")
+        print_error("Error: Job %s has no account specified", job.system.name)
         report.add_error(
             critical=True, errormsg=["No account specified"], info=["Not yet added"]
         )
@@ -40,7 +46,7 @@ def validate_gpu(
 
     # Check that gpus is a number
     if not isinstance(gpu, int) and gpu is not None:
-        print_error(f"Error: Job {job.name} requested {gpu} GPUs, must be a number")
+        print_error("Error: Job %s requested %s GPUs, must be a number", job.name, gpu)
 
         report.add_error(
             critical=True,
@@ -56,7 +62,8 @@ def validate_gpu(
 
     if system_constraints is None:
         print_error(
-            f"Error: Partition '{partition}' Missing system constraints. Contact admin"
+            "Error: Partition '%s' Missing system constraints. Contact admin",
+            partition,
         )
 
         report.add_error(
@@ -71,12 +78,16 @@ def validate_gpu(
     if not is_gpu_partition(partition, validation_info):
         job.system.resources.partitions = "gpu"
 
-    max_gpus = calculate_max_gpus(mode, validation_info)
+    limits = get_partition_limits(partition, mode, validation_info)
+    if limits is not None:
+        max_gpus = limits.max_gpus
+    else:
+        max_gpus = calculate_max_gpus(mode, validation_info)
 
     # print_info(f"The total number of gpus that can be used is: {max_gpus}")
 
     if gpu > max_gpus:
-        print_error(f"Job {job.name} requested {gpu} GPUs, maximum is {max_gpus}")
+        print_error("Job %s requested %s GPUs, maximum is %s", job.name, gpu, max_gpus)
 
         report.add_error(
             critical=True,
@@ -85,8 +96,8 @@ def validate_gpu(
 
         return False
     elif gpu < 1:
-        print_error(f"Job {job.name} requested {gpu} GPUs, minimum is 1")
-        print_error(f"Continuing with 1 GPUs")
+        print_error("Job %s requested %s GPUs, minimum is 1", job.name, gpu)
+        print_error("Continuing with 1 GPUs")
 
         report.add_error(
             critical=False,
@@ -122,16 +133,16 @@ def validate_partition(
         and gpus > 0
         and not is_gpu_partition(partition, validation_info)
     ):
-        print_debug(f"=============================================================")
-        print_error(f"Partition '{partition}' does not support GPUs")
-        print_warning(f"   Automatically switching to GPU partition")
+        print_debug("=============================================================")
+        print_error("Partition '%s' does not support GPUs", partition)
+        print_warning("   Automatically switching to GPU partition")
         print_info(
-            f"  -> Please specify a GPU partition in the job configuration like this:"
+            "  -> Please specify a GPU partition in the job configuration like this:"
         )
-        print_info(f"  -> system=System(")
-        print_info(f"  ->   resources=Resources(...")
-        print_info(f"  ->     partitions='gpu')")
-        print_debug(f"=============================================================")
+        print_info("  -> system=System(")
+        print_info("  ->   resources=Resources(...")
+        print_info("  ->     partitions='gpu')")
+        print_debug("=============================================================")
 
         report.add_error(
             critical=False,
@@ -152,14 +163,14 @@ def validate_partition(
         partition = "gpu"
 
     if partition == "gpu" and (gpus == None or gpus == 0):
-        print_error(f"Job {job.name} requested GPU partition but no GPUs")
-        print_warning(f"Continuing with cpu partition")
+        print_error("Job %s requested GPU partition but no GPUs", job.name)
+        print_warning("Continuing with cpu partition")
         print_info(
-            f"Please specify the number of GPUs in the job configuration like this:"
+            "Please specify the number of GPUs in the job configuration like this:"
         )
-        print_info(f"  system=System(")
-        print_info(f"     resources=Resources(...")
-        print_info(f"       gpu=1)")
+        print_info("  system=System(")
+        print_info("     resources=Resources(...")
+        print_info("       gpu=1)")
 
         report.add_error(
             critical=False,
@@ -179,9 +190,9 @@ def validate_partition(
     valid_partitions = get_valid_partitions(validation_info)
 
     if not is_valid_partition(partition, validation_info):
-        print_error(f"Job {job.name} requested invalid partition '{partition}'")
-        print_info(f"    Valid partitions are: {', '.join(valid_partitions)}")
-        print_warning(f"    Automatically switching to cpu partition for now")
+        print_error("Job %s requested invalid partition '%s'", job.name, partition)
+        print_info("    Valid partitions are: %s", ', '.join(valid_partitions))
+        print_warning("    Automatically switching to cpu partition for now")
 
         report.add_error(
             critical=False,
@@ -210,11 +221,13 @@ def validate_nodes(
     if nodes is None:
         nodes = 1
         job.system.resources.nodes = nodes
-        print_warning(f"Job {job.name} has no nodes specified")
+        print_warning("Job %s has no nodes specified", job.name)
 
     # Check that node is a number This sould be already handled now MAYBE REMOVE
     if not isinstance(nodes, int):
-        print_error(f"Error: Job {job.name} requested {nodes} nodes, must be a number")
+        print_error(
+            "Error: Job %s requested %s nodes, must be a number", job.name, nodes
+        )
         report.add_error(
             critical=True,
             errormsg=[f"Requested {nodes} nodes, must be a number"],
@@ -228,8 +241,10 @@ def validate_nodes(
     )
 
     if nodes < min_nodes:
-        print_error(f"Job {job.name} requested {nodes} nodes, minimum is {min_nodes}")
-        print_warning(f"Continuing with {min_nodes} nodes")
+        print_error(
+            "Job %s requested %s nodes, minimum is %s", job.name, nodes, min_nodes
+        )
+        print_warning("Continuing with %s nodes", min_nodes)
 
         report.add_error(
             critical=False,
@@ -240,11 +255,17 @@ def validate_nodes(
         job.system.resources.nodes = min_nodes
         nodes = min_nodes
 
-    max_nodes = calculate_max_nodes(mode, partition, validation_info)
+    limits = get_partition_limits(partition, mode, validation_info)
+    if limits is not None:
+        max_nodes = limits.max_nodes
+    else:
+        max_nodes = calculate_max_nodes(mode, partition, validation_info)
 
     if nodes > ntasks:
-        print_error(f"Job {job.name} requested {nodes} nodes, but ntasks is {ntasks}")
-        print_warning(f"Continuing with {ntasks} nodes")
+        print_error(
+            "Job %s requested %s nodes, but ntasks is %s", job.name, nodes, ntasks
+        )
+        print_warning("Continuing with %s nodes", ntasks)
 
         report.add_error(
             critical=False,
@@ -256,7 +277,9 @@ def validate_nodes(
         nodes = ntasks
 
     if nodes > max_nodes:
-        print_error(f"Job {job.name} requested {nodes} nodes, maximum is {max_nodes}")
+        print_error(
+            "Job %s requested %s nodes, maximum is %s", job.name, nodes, max_nodes
+        )
         report.add_error(
             critical=True,
             errormsg=[f"Requested {nodes} nodes, maximum is {max_nodes}"],
@@ -269,8 +292,8 @@ def validate_nodes(
         )
         return False
     elif nodes < 1:
-        print_error(f"Job {job.name} requested {nodes} nodes, minimum is 1")
-        print_warning(f"Continuing with 1 node")
+        print_error("Job %s requested %s nodes, minimum is 1", job.name, nodes)
+        print_warning("Continuing with 1 node")
 
         report.add_error(
             critical=False,
@@ -300,19 +323,19 @@ def validate_mode(
         mode = "default"
 
     if mode not in valid_modes:
-        print_debug(f"==============================================================")
-        print_error(f"Job {job.system.name} requested invalid mode '{mode}'")
+        print_debug("==============================================================")
+        print_error("Job %s requested invalid mode '%s'", job.system.name, mode)
 
-        print_warning(f"Automatically switching to default mode")
-        print_info(f"Valid modes are: {', '.join(valid_modes)}")
+        print_warning("Automatically switching to default mode")
+        print_info("Valid modes are: %s", ', '.join(valid_modes))
 
         ## Tell the user how and where to change
-        print_info(f"Please specify a valid mode in the job configuration like this:")
-        print_info(f"  system=System(")
-        print_info(f"     resources=Resources(...")
-        print_info(f"       mode='default')")
+        print_info("Please specify a valid mode in the job configuration like this:")
+        print_info("  system=System(")
+        print_info("     resources=Resources(...")
+        print_info("       mode='default')")
 
-        print_debug(f"==============================================================")
+        print_debug("==============================================================")
 
         report.add_error(
             critical=False,
@@ -334,56 +357,6 @@ def validate_mode(
     return True
 
 
-def parse_time_to_seconds(time_str: str) -> int:
-    """
-    Parse different SLURM time formats and convert to seconds
-    Supported formats:
-    - M (minutes)
-    - M:S (minutes:seconds)
-    - H:M:S (hours:minutes:seconds)
-    - D-H (days:hours)
-    - D-H:M (days:hours:minutes)
-    - D-H:M:S (days:hours:minutes:seconds)
-    """
-    try:
-        # Check if it's just minutes (single integer)
-        if time_str.isdigit():
-            return int(time_str) * 60
-
-        # Check if it contains days (D-H format)
-        if "-" in time_str:
-            days_part, time_part = time_str.split("-")
-            days = int(days_part)
-
-            # Handle different time part formats after the day
-            time_components = time_part.split(":")
-
-            if len(time_components) == 1:  # D-H format
-                hours = int(time_components[0])
-                return (days * 24 * 3600) + (hours * 3600)
-            elif len(time_components) == 2:  # D-H:M format
-                hours, minutes = map(int, time_components)
-                return (days * 24 * 3600) + (hours * 3600) + (minutes * 60)
-            elif len(time_components) == 3:  # D-H:M:S format
-                hours, minutes, seconds = map(int, time_components)
-                return (days * 24 * 3600) + (hours * 3600) + (minutes * 60) + seconds
-
-        # Handle time formats without days
-        time_components = time_str.split(":")
-
-        if len(time_components) == 2:  # M:S format
-            minutes, seconds = map(int, time_components)
-            return (minutes * 60) + seconds
-        elif len(time_components) == 3:  # H:M:S format
-            hours, minutes, seconds = map(int, time_components)
-            return (hours * 3600) + (minutes * 60) + seconds
-
-        raise ValueError(f"Unrecognized time format: {time_str}")
-
-    except Exception as e:
-        raise ValueError(f"Error parsing time '{time_str}': {str(e)}")
-
-
 def validate_time(
     job: Job, validation_info: dict, report: SlurmifyValidationReport
 ) -> bool:
@@ -403,17 +376,26 @@ def validate_time(
 
     if mode in constraints:
         max_time_str = constraints[mode]
+        limits = get_partition_limits(
+            job.system.resources.partitions, mode, validation_info
+        )
 
         try:
             # Convert both times to seconds for comparison
             requested_seconds = parse_time_to_seconds(time)
-            max_seconds = parse_time_to_seconds(max_time_str)
+            if limits is not None and limits.max_time_seconds is not None:
+                max_seconds = limits.max_time_seconds
+            else:
+                max_seconds = parse_time_to_seconds(max_time_str)
 
             if requested_seconds > max_seconds:
                 print_error(
-                    f"Error: Job {job.name} requested {time} runtime in '{mode}' mode"
+                    "Error: Job %s requested %s runtime in '%s' mode",
+                    job.name,
+                    time,
+                    mode,
                 )
-                print_error(f"Maximum time for '{mode}' is {max_time_str}")
+                print_error("Maximum time for '%s' is %s", mode, max_time_str)
 
                 report.add_error(
                     critical=True,
@@ -424,7 +406,7 @@ def validate_time(
                 return False
 
         except ValueError as e:
-            print_error(f"Error validating time: {str(e)}")
+            print_error("Error validating time: %s", str(e))
 
             report.add_error(
                 critical=True,
@@ -446,12 +428,18 @@ def validate_cpus(
     nodes = job.system.resources.nodes
 
     max_cpus = calculate_max_cpus(
-        cpus_per_task, partition, nodes, ntasks, validation_info, report
+        cpus_per_task,
+        partition,
+        nodes,
+        ntasks,
+        validation_info,
+        report,
+        limits=get_partition_limits(partition, mode, validation_info),
     )
 
     if max_cpus == None:
         print_error(
-            f"Error: The selected amount of cpus is not possible with the current configuration"
+            "Error: The selected amount of cpus is not possible with the current configuration"
         )
 
         return False
@@ -463,8 +451,8 @@ def validate_ntasks(job: Job, report: SlurmifyValidationReport) -> bool:
     # specified but 1 node the total amount of cores will double and so needs to be checked
 
     if job.system.resources.ntasks is None:
-        print_error(f"Error: Job {job.name} has no ntasks specified")
-        print_error(f"Continuing with 1 ntask")
+        print_error("Error: Job %s has no ntasks specified", job.name)
+        print_error("Continuing with 1 ntask")
 
         report.add_error(
             critical=False,
@@ -480,8 +468,8 @@ def validate_ntasks(job: Job, report: SlurmifyValidationReport) -> bool:
         not isinstance(job.system.resources.ntasks, int)
         or job.system.resources.ntasks < 1
     ):
-        print_error(f"Error: Job {job.name} has invalid ntasks specified")
-        print_error(f"Continuing with 1 ntask")
+        print_error("Error: Job %s has invalid ntasks specified", job.name)
+        print_error("Continuing with 1 ntask")
 
         report.add_error(
             critical=False,
@@ -495,10 +483,215 @@ def validate_ntasks(job: Job, report: SlurmifyValidationReport) -> bool:
     return True
 
 
-def validate_system(
+def validate_array(
     job: Job, validation_info: dict, report: SlurmifyValidationReport
 ) -> bool:
-    """Main validation function that calls specialized validators"""
+    """Validates the job array against the array limits of its QOS mode"""
+    array = job.system.resources.array
+    mode = job.system.resources.mode
+
+    if array is None:
+        return True
+
+    try:
+        spec = parse_array_spec(array)
+    except ValueError as e:
+        print_error("Error: Job %s has an invalid array: %s", job.name, str(e))
+
+        report.add_error(
+            critical=True,
+            errormsg=[f"Invalid array '{array}'"],
+            info=[
+                str(e),
+                "Use task indices and ranges like '0-99', '1,3,5-9:2' or '0-99%10'",
+            ],
+        )
+
+        return False
+
+    max_array_size, max_jobs = get_array_limits(mode, validation_info)
+
+    if max_array_size is not None and spec.max_index >= max_array_size:
+        print_error(
+            "Error: Job %s requested array index %s, maximum is %s",
+            job.name,
+            spec.max_index,
+            max_array_size - 1,
+        )
+
+        report.add_error(
+            critical=True,
+            errormsg=[f"Requested array index {spec.max_index}"],
+            info=[f"Array indices must be lower than {max_array_size}"],
+        )
+
+        return False
+
+    if max_jobs is not None and spec.count > max_jobs:
+        if spec.throttle is None or spec.throttle > max_jobs:
+            print_warning(
+                "Job %s: '%s' mode runs at most %s jobs per user",
+                job.name,
+                mode,
+                max_jobs,
+            )
+            print_warning("Limiting the array to %s tasks at once", max_jobs)
+
+            report.add_error(
+                critical=False,
+                errormsg=[f"'{mode}' mode runs at most {max_jobs} jobs per user"],
+                warning=[f"Limited the array to {max_jobs} tasks at once"],
+            )
+
+            job.system.resources.array = str(spec.with_throttle(max_jobs))
+            return validation_relaxed
+
+    return True
+
+
+# The validators of validate_system in the order they run, with the Resources
+# fields each one reads and the ones it may rewrite when it fixes a value.
+# The name labels the validator's timing span.
+SYSTEM_VALIDATORS: list[tuple[str, Callable, frozenset[str], frozenset[str]]] = [
+    (
+        "validate_account",
+        lambda j, v, r: validate_account(j, r),
+        frozenset({"account"}),
+        frozenset(),
+    ),  # GOOD
+    (
+        "validate_partition",
+        validate_partition,
+        frozenset({"partitions", "gpu"}),
+        frozenset({"partitions"}),
+    ),  # GOOD
+    (
+        "validate_mode",
+        validate_mode,
+        frozenset({"mode"}),
+        frozenset({"mode"}),
+    ),  # GOOD
+    (
+        "validate_ntasks",
+        lambda j, v, r: validate_ntasks(j, r),
+        frozenset({"ntasks"}),
+        frozenset({"ntasks"}),
+    ),  # GOOD
+    (
+        "validate_nodes",
+        validate_nodes,
+        frozenset({"nodes", "mode", "ntasks", "partitions", "cores"}),
+        frozenset({"nodes"}),
+    ),  # GOOD (Check if works with gpu)
+    (
+        "validate_gpu",
+        validate_gpu,
+        frozenset({"gpu", "mode", "partitions"}),
+        frozenset({"gpu", "partitions"}),
+    ),  # Nearly done (Need to check --gpus-per-task)
+    (
+        "validate_cpus",
+        validate_cpus,
+        frozenset({"cores", "mode", "partitions", "ntasks", "nodes"}),
+        frozenset(),
+    ),  # GOOD
+    (
+        "validate_time",
+        validate_time,
+        frozenset({"time", "mode", "partitions"}),
+        frozenset({"time", "mode"}),
+    ),  # GOOD
+    (
+        "validate_array",
+        validate_array,
+        frozenset({"array", "mode"}),
+        frozenset({"array"}),
+    ),
+]
+
+
+def affected_validators(fields) -> list[str]:
+    """Names of the system validators whose result can change with fields
+
+    A validator is affected when it reads one of the fields, or a field that
+    an affected validator may rewrite.
+
+    Args:
+        fields (Iterable[str]): Names of Resources fields
+
+    Returns:
+        list[str]: Validator names, in the order validate_system runs them
+    """
+    changed = set(fields)
+    affected: set[str] = set()
+
+    grown = True
+    while grown:
+        grown = False
+        for name, _, reads, writes in SYSTEM_VALIDATORS:
+            if name not in affected and reads & changed:
+                affected.add(name)
+                changed |= writes
+                grown = True
+
+    return [name for name, *_ in SYSTEM_VALIDATORS if name in affected]
+
+
+def run_system_validators(
+    job: Job,
+    validation_info: dict,
+    report: SlurmifyValidationReport,
+    names=None,
+    fixes: list | None = None,
+) -> list[bool]:
+    """Run the system validators on a job, each in its own timing span
+
+    Args:
+        job (Job): The job, fixed values are written back to it
+        validation_info (dict): constraints, system_constraints and constraint_table
+        report (SlurmifyValidationReport): Report the errors are added to
+        names (Iterable[str], optional): Only run these validators, defaults to all
+        fixes (list, optional): Gets a (validator, field, old value, new value)
+            tuple for every value a validator changed
+
+    Returns:
+        list[bool]: Result of each validator that ran
+    """
+    selected = None if names is None else set(names)
+    resources = job.system.resources
+
+    results = []
+    for name, validator, _, writes in SYSTEM_VALIDATORS:
+        if selected is not None and name not in selected:
+            continue
+
+        if fixes is not None:
+            before = [getattr(resources, field, None) for field in writes]
+
+        with report.span(name):
+            results.append(validator(job, validation_info, report))
+
+        if fixes is not None:
+            for field, old in zip(writes, before):
+                new = getattr(resources, field, None)
+                if new != old:
+                    fixes.append((name, field, old, new))
+    return results
+
+
+def validate_system(
+    job: Job,
+    validation_info: dict,
+    report: SlurmifyValidationReport,
+    names=None,
+    fixes: list | None = None,
+) -> bool:
+    """Main validation function that calls specialized validators
+
+    names (Iterable[str], optional) restricts it to these system validators,
+    fixes (list, optional) collects the values they changed, see
+    run_system_validators
+    """
     print_debug("#################################################################")
     print_debug("\n")
 
@@ -507,22 +700,8 @@ def validate_system(
     print_info(("Job: ", job.name))
     print_info("-------------------------------------------------------------")
 
-    # List of all validators
     # Account validation is not performed
-    validators = [
-        lambda j, v, r: validate_account(j, r),  # GOOD
-        lambda j, v, r: validate_partition(j, v, r),  # GOOD
-        lambda j, v, r: validate_mode(j, v, r),  # GOOD
-        lambda j, v, r: validate_ntasks(j, r),  # GOOD
-        lambda j, v, r: validate_nodes(j, v, r),  # GOOD (Check if works with gpu)
-        lambda j, v, r: validate_gpu(
-            j, v, r
-        ),  # Nearly done (Need to check --gpus-per-task)
-        lambda j, v, r: validate_cpus(j, v, r),  # GOOD
-        lambda j, v, r: validate_time(j, v, r),  # GOOD
-    ]
-    # Run all validators and collect results
-    results = [validator(job, validation_info, report) for validator in validators]
+    results = run_system_validators(job, validation_info, report, names, fixes)
 
     result = all(results)
     print_debug("\n")
@@ -548,10 +727,8 @@ def validate_modules(job: Job, report: SlurmifyValidationReport) -> bool:
     requested_modules = job.modules.get_modules()
     module_list: ModuleList = get_module_list()
 
-    module_names = module_list.get_modules()
-
     for module in requested_modules:
-        print_debug(f"Checking module: {module}")
+        print_debug("Checking module: %s", module)
 
         # Module names have a specific format, ToolName/Version
         # There are a few that are a little different like env/smth/version
@@ -563,13 +740,13 @@ def validate_modules(job: Job, report: SlurmifyValidationReport) -> bool:
             moduleVersion = split[1] if len(split) > 1 else None
             environment = split[2] if len(split) > 2 else None
 
-            if moduleName not in module_names:
-                print_error(f"Module name '{moduleName}' is not valid")
+            if not module_list.has_module(moduleName):
+                print_error("Module name '%s' is not valid", moduleName)
                 # print_error(f"Available modules are: {', '.join(module_names)}")
 
-                search_module = module_list.search_modules_with_versions(moduleName)
+                search_module = module_list.suggest_modules(moduleName)
 
-                if search_module is None:
+                if not search_module:
                     report.add_error(
                         critical=True,
                         errormsg=[f"Module name '{moduleName}' is not valid"],
@@ -592,12 +769,13 @@ def validate_modules(job: Job, report: SlurmifyValidationReport) -> bool:
 
             available_versions = module_list.get_module_versions(moduleName)
             if moduleVersion not in available_versions:
-                print_error(f"Module version '{moduleVersion}' is not valid")
+                print_error("Module version '%s' is not valid", moduleVersion)
                 report.add_error(
                     critical=True,
                     errormsg=[f"Module version '{moduleVersion}' is not valid"],
                     info=[
-                        f"Available versions for '{moduleName}': {', '.join(available_versions)}"
+                        f"Did you mean: {', '.join(module_list.suggest_versions(moduleName, moduleVersion))}",
+                        f"Available versions for '{moduleName}': {', '.join(available_versions)}",
                     ],
                 )
 
@@ -606,14 +784,14 @@ def validate_modules(job: Job, report: SlurmifyValidationReport) -> bool:
             ## TODO: ENVIRONEMTS env are currently boken since the module list generator doesnt take them into account so they dont exist in the list !!!
 
         except Exception as e:
-            print_error(f"Error: {e}")
-            print_error(f"Module name '{module}' is not valid")
+            print_error("Error: %s", e)
+            print_error("Module name '%s' is not valid", module)
             return False
 
         # Check if the module name is valid
-        print_debug(f"Module name: {moduleName}")
-        print_debug(f"Module version: {moduleVersion}")
-        print_debug(f"Module environment: {environment}")
+        print_debug("Module name: %s", moduleName)
+        print_debug("Module version: %s", moduleVersion)
+        print_debug("Module environment: %s", environment)
 
     return True
 